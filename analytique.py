@@ -0,0 +1,153 @@
+# analytique.py
+# Statistiques de ventes sur l'historique des commandes validées.
+# Les lignes de commande sont chargées en colonnes (array.array : une valeur machine
+# par ligne, sans objet Python) ; le jour, le produit et le client sont remplacés
+# par un code entier (leur position dans jours / produits / clients). Les agrégats
+# sont calculés par np.bincount sur ces colonnes si NumPy est installé (sans copie
+# des données), sinon par une simple boucle sur les colonnes.
+import array
+import datetime
+import heapq
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est facultatif
+    np = None
+
+
+class VentesColonnes:
+    """Lignes des commandes validées, une colonne par champ."""
+
+    def __init__(self):
+        self.jours = []      # code -> "AAAA-MM-JJ"
+        self.produits = []   # code -> référence produit
+        self.clients = []    # code -> ID client
+        self._codes_jour, self._codes_produit, self._codes_client = {}, {}, {}
+        self.code_jour = array.array('i')
+        self.code_produit = array.array('i')
+        self.code_client = array.array('i')
+        self.quantite = array.array('q')
+        self.montant = array.array('d')  # prix de vente x quantité
+        self.nb_commandes = 0
+
+    def __len__(self):
+        return len(self.quantite)
+
+    @staticmethod
+    def _coder(codes, libelles, valeur):
+        code = codes.get(valeur)
+        if code is None:
+            code = codes[valeur] = len(libelles)
+            libelles.append(valeur)
+        return code
+
+    def ajouter_commandes(self, commandes):
+        """Ajoute les lignes d'un itérable de dicts de commandes (sans filtrer le statut)."""
+        # Méthodes liées à des variables locales : cette boucle traite des millions de lignes
+        codes_produit, coder = self._codes_produit, self._coder
+        ajouter_jour, ajouter_client = self.code_jour.append, self.code_client.append
+        ajouter_produit, ajouter_quantite, ajouter_montant = (self.code_produit.append, self.quantite.append,
+                                                              self.montant.append)
+        for commande in commandes:
+            jour = coder(self._codes_jour, self.jours, commande['date_creation'][:10])
+            client = coder(self._codes_client, self.clients, commande['id_client'])
+            for item in commande.get('produits_commandes', ()):
+                produit = codes_produit.get(item['ref_produit'])
+                if produit is None:
+                    produit = coder(codes_produit, self.produits, item['ref_produit'])
+                quantite = item['quantite']
+                ajouter_jour(jour)
+                ajouter_client(client)
+                ajouter_produit(produit)
+                ajouter_quantite(quantite)
+                ajouter_montant(item['prix_vente'] * quantite)
+            self.nb_commandes += 1
+
+    # --- Agrégats ---
+    def _sommer(self, codes, valeurs, taille):
+        """Somme des valeurs par code : liste de longueur taille."""
+        if np is not None and len(codes):
+            totaux = np.bincount(np.frombuffer(codes, dtype=np.int32),
+                                 weights=np.frombuffer(valeurs, dtype=np.float64 if valeurs.typecode == 'd' else np.int64),
+                                 minlength=taille)
+            return totaux.tolist() if valeurs.typecode == 'd' else totaux.round().astype(np.int64).tolist()
+        totaux = [0.0 if valeurs.typecode == 'd' else 0] * taille
+        for code, valeur in zip(codes, valeurs):
+            totaux[code] += valeur
+        return totaux
+
+    def chiffre_affaires(self):
+        if np is not None and len(self.montant):
+            return float(np.frombuffer(self.montant, dtype=np.float64).sum())
+        return sum(self.montant)
+
+    def chiffre_affaires_par_jour(self):
+        """[(jour, montant)] dans l'ordre chronologique."""
+        return sorted(zip(self.jours, self._sommer(self.code_jour, self.montant, len(self.jours))))
+
+    def chiffre_affaires_par_produit(self):
+        """[(référence, montant)], du plus grand au plus petit."""
+        totaux = self._sommer(self.code_produit, self.montant, len(self.produits))
+        return sorted(zip(self.produits, totaux), key=lambda e: e[1], reverse=True)
+
+    def chiffre_affaires_par_client(self):
+        """[(ID client, montant)], du plus grand au plus petit."""
+        totaux = self._sommer(self.code_client, self.montant, len(self.clients))
+        return sorted(zip(self.clients, totaux), key=lambda e: e[1], reverse=True)
+
+    def quantites_par_produit(self):
+        """{référence: quantité vendue}."""
+        return dict(zip(self.produits, self._sommer(self.code_produit, self.quantite, len(self.produits))))
+
+    def meilleures_ventes(self, nombre=10):
+        """Les produits les plus vendus (en quantité) : [(référence, quantité, montant)]."""
+        quantites = self._sommer(self.code_produit, self.quantite, len(self.produits))
+        montants = self._sommer(self.code_produit, self.montant, len(self.produits))
+        codes = heapq.nlargest(nombre, range(len(self.produits)), key=quantites.__getitem__)
+        return [(self.produits[c], quantites[c], montants[c]) for c in codes]
+
+    def nb_jours(self):
+        """Nombre de jours calendaires entre la première et la dernière vente."""
+        if not self.jours:
+            return 0
+        premier, dernier = min(self.jours), max(self.jours)
+        return (datetime.date.fromisoformat(dernier) - datetime.date.fromisoformat(premier)).days + 1
+
+    def rotation_stocks(self, stocks):
+        """Rotation de chaque produit à partir de {référence: stock actuel}.
+
+        Retourne [(référence, quantité vendue, stock, rotation, jours de couverture)],
+        rotation = quantité vendue / stock actuel (le stock moyen n'est pas historisé),
+        couverture = jours de ventes au rythme moyen couverts par le stock (None sans vente).
+        """
+        vendues = self.quantites_par_produit()
+        nb_jours = self.nb_jours() or 1
+        resultat = []
+        for reference, stock in stocks.items():
+            quantite = vendues.get(reference, 0)
+            rotation = quantite / stock if stock else None
+            couverture = stock / (quantite / nb_jours) if quantite else None
+            resultat.append((reference, quantite, stock, rotation, couverture))
+
+        def cle(ligne):
+            # Les produits qui tournent le plus vite d'abord ; stock épuisé après des ventes : en tête
+            if ligne[3] is None:
+                return float("inf") if ligne[1] else 0.0
+            return ligne[3]
+
+        resultat.sort(key=cle, reverse=True)
+        return resultat
+
+
+def charger_ventes(commandes, date_debut=None, date_fin=None):
+    """Charge en colonnes les lignes des commandes validées d'un itérable de dicts.
+
+    date_debut / date_fin ("AAAA-MM-JJ") : période incluse.
+    """
+    ventes = VentesColonnes()
+    ventes.ajouter_commandes(
+        commande for commande in commandes
+        if commande.get('statut') == "Validée"
+        and (date_debut is None or commande['date_creation'][:10] >= date_debut)
+        and (date_fin is None or commande['date_creation'][:10] <= date_fin))
+    return ventes
@@ -0,0 +1,1097 @@
+# benchmark.py
+# Mesures de performance sur des jeux de données générés dans un dossier temporaire.
+# Utilisation : python benchmark.py demarrage --commandes 100000
+# Suite complète et suivi des régressions entre versions :
+#   python benchmark.py suite --sortie resultats/avant.json
+#   python benchmark.py suite --reference resultats/avant.json
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import data_manager
+from generer_donnees import ARTICLES, QUALIFICATIFS, generer_donnees, generer_historique, iter_commandes
+
+
+@contextlib.contextmanager
+def dossier_temporaire():
+    """Exécute le bloc dans un dossier temporaire (les chemins de data_manager sont relatifs)."""
+    dossier_initial = os.getcwd()
+    with tempfile.TemporaryDirectory() as dossier:
+        os.chdir(dossier)
+        try:
+            yield dossier
+        finally:
+            os.chdir(dossier_initial)
+
+
+def chronometrer(fonction, *args):
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return time.perf_counter() - debut, resultat
+
+
+def mesurer_operations(operation, liste_arguments):
+    """Chronomètre chaque appel ; retourne la distribution des durées (les refus métier sont comptés à part)."""
+    from exceptions import ErreurGestion
+    durees, refus = [], 0
+    for args in liste_arguments:
+        debut = time.perf_counter()
+        try:
+            operation(*args)
+        except ErreurGestion:
+            refus += 1
+        durees.append(time.perf_counter() - debut)
+    if not durees:
+        return {"nombre": 0}
+    durees.sort()
+    total = sum(durees)
+    return {
+        "nombre": len(durees),
+        "refus": refus,
+        "operations_par_s": round(len(durees) / total) if total else None,
+        "moyenne_us": round(total / len(durees) * 1e6, 1),
+        "p50_us": round(durees[len(durees) // 2] * 1e6, 1),
+        "p99_us": round(durees[int(0.99 * (len(durees) - 1))] * 1e6, 1),
+        "max_us": round(durees[-1] * 1e6, 1),
+    }
+
+
+def bench_demarrage(arguments):
+    """Temps de démarrage : chargement complet des commandes contre chargement paresseux."""
+    from services import ServiceCommercial
+    from models import Produit, Client, Commande
+
+    def chargement_complet():
+        # Comportement historique : toutes les commandes sont construites au démarrage
+        return ([Produit.from_dict(p) for p in data_manager.charger_collection("produit")[0]],
+                [Client.from_dict(c) for c in data_manager.charger_collection("client")[0]],
+                [Commande.from_dict(cmd) for cmd in data_manager.iter_commandes_partitions()])
+
+    with dossier_temporaire():
+        generer_historique(arguments.produits, arguments.clients, arguments.commandes)
+        t_complet, _ = chronometrer(chargement_complet)
+        t_premier, service = chronometrer(ServiceCommercial)  # Construit l'index des commandes
+        service.fermer()
+        t_paresseux, service = chronometrer(ServiceCommercial)
+        service.fermer()
+    return {
+        "commandes": arguments.commandes,
+        "chargement_complet_s": round(t_complet, 4),
+        "premier_demarrage_s": round(t_premier, 4),
+        "demarrage_paresseux_s": round(t_paresseux, 4),
+        "gain": round(t_complet / t_paresseux, 1) if t_paresseux else None,
+    }
+
+
+class _ObjetAvecDict:
+    """Disposition précédente des modèles (attributs dans un __dict__, lignes de commande en dict)."""
+
+    def __init__(self, data):
+        self.__dict__.update(data)
+        if 'produits_commandes' in data:
+            self.produits_commandes = [dict(item) for item in data['produits_commandes']]
+
+
+def mesurer_memoire(fabrique, donnees):
+    """Octets alloués par enregistrement pour construire les objets."""
+    gc.collect()
+    tracemalloc.start()
+    objets = [fabrique(d) for d in donnees]
+    taille = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objets
+    return round(taille / len(donnees), 1)
+
+
+def bench_memoire(arguments):
+    """Empreinte mémoire par enregistrement : modèles à __slots__ contre objets à __dict__."""
+    from models import Produit, Client, Commande
+    produits, clients, commandes = generer_donnees(arguments.produits, arguments.clients, arguments.commandes)
+    resultat = {}
+    for nom, classe, donnees in (("produit", Produit, produits), ("client", Client, clients),
+                                 ("commande", Commande, commandes)):
+        avant = mesurer_memoire(_ObjetAvecDict, donnees)
+        apres = mesurer_memoire(classe.from_dict, donnees)
+        resultat[nom] = {"avec_dict_octets": avant, "slots_octets": apres, "reduction": round(1 - apres / avant, 2)}
+    return resultat
+
+
+def bench_import(arguments):
+    """Débit de l'import en lot de commandes depuis un fichier CSV."""
+    from services import ServiceCommercial
+    from import_commandes import lire_commandes
+    alea = random.Random(7)
+    with dossier_temporaire():
+        generer_historique(arguments.produits, arguments.clients, 0)
+        produits, clients, _ = generer_donnees(arguments.produits, arguments.clients, 0)
+        with open("commandes_web.csv", "w", encoding="utf-8") as f:
+            f.write("commande,id_client,ref_produit,quantite\n")
+            for i in range(arguments.commandes):
+                id_client = alea.choice(clients)['id_client']
+                for p in alea.sample(produits, alea.randint(1, 5)):
+                    f.write(f"WEB-{i},{id_client},{p['reference']},{alea.randint(1, 3)}\n")
+        service = ServiceCommercial()
+        rapport = service.importer_commandes(lire_commandes("commandes_web.csv"))
+        t_sauvegarde, _ = chronometrer(service.sauvegarder)
+        service.fermer()
+    return {
+        "commandes": arguments.commandes,
+        "validees": len(rapport.acceptees),
+        "rejetees": len(rapport.rejetees),
+        "duree_import_s": round(rapport.duree, 4),
+        "commandes_par_seconde": round(rapport.debit()),
+        "sauvegarde_s": round(t_sauvegarde, 4),
+    }
+
+
+def verifier_invariants_stock(service, stocks_initiaux):
+    """Contrôle la cohérence stock / réservations / commandes. Retourne la liste des écarts."""
+    valide, reserve = {}, {}
+    for commande in service.lister_commandes():
+        cible = valide if commande.statut == "Validée" else reserve if commande.statut == "En Cours" else None
+        if cible is not None:
+            for ref, quantite in commande.quantites_par_produit().items():
+                cible[ref] = cible.get(ref, 0) + quantite
+    ecarts = []
+    for ref, produit in service.depot.produits.items():
+        attendu = stocks_initiaux[ref] - valide.get(ref, 0)
+        if produit.stock < 0 or produit.stock != attendu:
+            ecarts.append(f"{ref}: stock {produit.stock}, attendu {attendu}")
+        if produit.reserve != reserve.get(ref, 0) or produit.reserve > produit.stock:
+            ecarts.append(f"{ref}: réservé {produit.reserve}, attendu {reserve.get(ref, 0)} (stock {produit.stock})")
+    return ecarts
+
+
+def bench_concurrence(arguments):
+    """Test de charge : des threads créent, remplissent, valident et annulent des commandes en parallèle.
+
+    Les mêmes commandes sont validées par plusieurs threads à la fois et les produits sont
+    peu nombreux, donc très disputés. Vérifie ensuite les invariants du stock, en mémoire
+    puis après rechargement depuis le disque (ordre du journal).
+    Exemple : python benchmark.py concurrence --produits 20 --commandes 2000 --threads 16
+    """
+    from services import ServiceCommercial
+    from exceptions import ErreurGestion
+    with dossier_temporaire():
+        generer_historique(arguments.produits, arguments.clients, 0)
+        if data_manager.BACKEND_STOCKAGE == "sqlite":
+            from stockage import migrer_json_vers_sqlite
+            with contextlib.redirect_stdout(None):
+                migrer_json_vers_sqlite()
+        service = ServiceCommercial()
+        stocks_initiaux = {ref: p.stock for ref, p in service.depot.produits.items()}
+        refs, clients = list(service.depot.produits), list(service.depot.clients)
+        creees = []  # Numéros partagés entre les threads, pour valider les commandes des autres
+        refus = []   # Opérations refusées (stock insuffisant, commande déjà validée...)
+        par_thread = max(1, arguments.commandes // arguments.threads)
+
+        def tenter(operation, *args):
+            try:
+                operation(*args)
+            except ErreurGestion as e:
+                refus.append(type(e).__name__)
+
+        def travailleur(graine):
+            alea = random.Random(graine)
+            for _ in range(par_thread):
+                numero = service.creer_commande(alea.choice(clients)).numero_commande
+                creees.append(numero)
+                for ref in alea.sample(refs, min(len(refs), alea.randint(1, 3))):
+                    tenter(service.ajouter_ligne, numero, ref, alea.randint(1, 20))
+                tirage = alea.random()
+                if tirage < 0.1:
+                    tenter(service.annuler, alea.choice(creees))
+                else:
+                    # Validation concurrente : souvent une commande d'un autre thread
+                    tenter(service.valider, numero if tirage < 0.6 else alea.choice(creees))
+                    tenter(service.valider, numero)
+
+        service.statistiques()  # Compteurs calculés avant la charge, puis tenus à jour par les threads
+        threads = [threading.Thread(target=travailleur, args=(i,)) for i in range(arguments.threads)]
+        debut = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duree = time.perf_counter() - debut
+        ecarts = verifier_invariants_stock(service, stocks_initiaux)
+        ecarts += [f"compteurs, {e}" for e in service.verifier_statistiques()]
+        service.fermer()
+        relu = ServiceCommercial()  # Rejoue le journal écrit par les threads
+        ecarts += [f"après rechargement, {e}" for e in verifier_invariants_stock(relu, stocks_initiaux)]
+        relu.fermer()
+    statuts, motifs_refus = {}, {}
+    for resume in service.depot.resumes.values():
+        statuts[resume.statut] = statuts.get(resume.statut, 0) + 1
+    for motif in refus:
+        motifs_refus[motif] = motifs_refus.get(motif, 0) + 1
+    return {
+        "threads": arguments.threads,
+        "commandes": len(creees),
+        "statuts": statuts,
+        "refus": motifs_refus,
+        "duree_s": round(duree, 4),
+        "commandes_par_seconde": round(len(creees) / duree) if duree else None,
+        "invariants_ok": not ecarts,
+        "ecarts": ecarts[:10],
+    }
+
+
+async def requete_http(lecteur, ecrivain, methode, chemin, donnees=None):
+    """Envoie une requête sur une connexion persistante. Retourne (code HTTP, corps JSON décodé)."""
+    corps = json.dumps(donnees).encode('utf-8') if donnees is not None else b""
+    ecrivain.write(f"{methode} {chemin} HTTP/1.1\r\nHost: localhost\r\n"
+                   f"Content-Length: {len(corps)}\r\n\r\n".encode('latin-1') + corps)
+    await ecrivain.drain()
+    statut = int((await lecteur.readline()).split()[1])
+    longueur = 0
+    while True:
+        ligne = await lecteur.readline()
+        if ligne in (b"\r\n", b""):
+            break
+        nom, _, valeur = ligne.decode('latin-1').partition(":")
+        if nom.lower() == "content-length":
+            longueur = int(valeur)
+    reponse = await lecteur.readexactly(longueur)
+    return statut, json.loads(reponse) if reponse[:1] in (b"{", b"[") else reponse.decode('utf-8')
+
+
+async def charge_http(port, arguments, refs, clients):
+    latences, codes = [], {}
+    par_connexion = max(1, arguments.commandes // arguments.connexions)
+
+    async def client(graine):
+        alea = random.Random(graine)
+        lecteur, ecrivain = await asyncio.open_connection("127.0.0.1", port)
+
+        async def appeler(methode, chemin, donnees=None):
+            debut = time.perf_counter()
+            statut, reponse = await requete_http(lecteur, ecrivain, methode, chemin, donnees)
+            latences.append(time.perf_counter() - debut)
+            codes[statut] = codes.get(statut, 0) + 1
+            return statut, reponse
+
+        for _ in range(par_connexion):
+            statut, commande = await appeler("POST", "/commandes", {"id_client": alea.choice(clients)})
+            numero = commande['numero_commande']
+            for ref in alea.sample(refs, min(len(refs), alea.randint(1, 3))):
+                await appeler("POST", f"/commandes/{numero}/lignes", {"ref_produit": ref, "quantite": alea.randint(1, 3)})
+            await appeler("POST", f"/commandes/{numero}/validation")
+            await appeler("GET", f"/commandes/{numero}")
+            await appeler("GET", f"/produits?page={alea.randint(1, 10)}&taille=20")
+        ecrivain.close()
+
+    debut = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(arguments.connexions)))
+    return latences, codes, time.perf_counter() - debut
+
+
+def bench_http(arguments):
+    """Test de charge de l'API HTTP (serveur_http.py) avec un client asyncio local.
+
+    Chaque connexion persistante enchaîne : création de commande, ajout de lignes,
+    validation, lecture de la commande et d'une page de produits. Mesure le débit
+    (requêtes/s) et les latences p50/p99.
+    Exemple : python benchmark.py http --commandes 2000 --connexions 32
+    """
+    from services import ServiceCommercial
+    from serveur_http import ServeurHTTP
+    with dossier_temporaire():
+        generer_historique(arguments.produits, arguments.clients, 0)
+        service = ServiceCommercial()
+        refs, clients = list(service.depot.produits), list(service.depot.clients)
+        # Le serveur tourne dans sa propre boucle d'événements, dans un autre thread que le client
+        serveur = ServeurHTTP(service, arguments.threads)
+        boucle = asyncio.new_event_loop()
+        ecoute = boucle.run_until_complete(serveur.demarrer(port=0))
+        fil = threading.Thread(target=boucle.run_forever, daemon=True)
+        fil.start()
+        try:
+            latences, codes, duree = asyncio.run(charge_http(ecoute.sockets[0].getsockname()[1], arguments, refs, clients))
+        finally:
+            boucle.call_soon_threadsafe(boucle.stop)
+            fil.join()
+            ecoute.close()
+            boucle.run_until_complete(ecoute.wait_closed())
+            boucle.close()
+            serveur.fermer()
+            service.fermer()
+    latences.sort()
+    return {
+        "connexions": arguments.connexions,
+        "requetes": len(latences),
+        "codes_http": {str(code): nombre for code, nombre in sorted(codes.items())},
+        "duree_s": round(duree, 4),
+        "requetes_par_seconde": round(len(latences) / duree) if duree else None,
+        "latence_p50_ms": round(latences[len(latences) // 2] * 1000, 2),
+        "latence_p99_ms": round(latences[int(0.99 * (len(latences) - 1))] * 1000, 2),
+    }
+
+
+def bench_partitions(arguments):
+    """Commandes partitionnées par mois : sauvegarde après quelques commandes du mois en cours
+    contre la réécriture d'un fichier unique, ventes d'un mois contre lecture de tout l'historique,
+    et taille des partitions archivées.
+    """
+    import analytique
+    from services import ServiceCommercial
+    resultat = {"commandes": arguments.commandes, "mois_non_archives": data_manager.MOIS_NON_ARCHIVES}
+    with dossier_temporaire():
+        generer_historique(arguments.produits, arguments.clients, arguments.commandes)
+        t_premier, service = chronometrer(ServiceCommercial)  # Construit les index des partitions
+        service.fermer()
+        t_demarrage, service = chronometrer(ServiceCommercial)
+        resultat["premier_demarrage_s"] = round(t_premier, 4)
+        resultat["demarrage_s"] = round(t_demarrage, 4)
+        mois = data_manager.partitions()
+        resultat["partitions"] = len(mois)
+        tailles = {"archivees": 0, "decompressees": 0}
+        for m in mois:
+            fichier = data_manager.trouver_partition(m)
+            if data_manager.est_compresse(fichier):
+                tailles["archivees"] += os.path.getsize(fichier)
+                with data_manager.ouvrir_partition(fichier) as f:
+                    tailles["decompressees"] += len(f.getvalue())
+        resultat["taille_archivees_octets"] = tailles["archivees"]
+        resultat["taille_decompressees_octets"] = tailles["decompressees"]
+
+        # Quelques commandes du mois en cours, puis sauvegarde : seule sa partition est réécrite
+        alea = random.Random(17)
+        refs = [ref for ref, produit in service.depot.produits.items() if produit.disponible() > 100]
+        clients = list(service.depot.clients)
+        for _ in range(min(arguments.operations, 100)):
+            commande = service.creer_commande(alea.choice(clients))
+            service.ajouter_ligne(commande.numero_commande, alea.choice(refs), 1)
+            service.valider(commande.numero_commande)
+        t_sauvegarde, _ = chronometrer(service.sauvegarder)
+        # Ancienne sauvegarde : toutes les commandes réécrites dans un seul fichier
+        t_fichier_unique, _ = chronometrer(lambda: data_manager.sauvegarder_donnees_json_flux(
+            os.path.join(data_manager.DATA_DIR, "fichier_unique.json"), service.stockage.iter_commandes(), controle=True))
+        resultat["sauvegarde_partitions_s"] = round(t_sauvegarde, 4)
+        resultat["sauvegarde_fichier_unique_s"] = round(t_fichier_unique, 4)
+
+        # Ventes d'un mois : seule sa partition est lue
+        periode = (f"{mois[len(mois) // 2]}-01", f"{mois[len(mois) // 2]}-31")
+        t_mois, ventes_mois = chronometrer(service.ventes, *periode)
+        t_complet, ventes_completes = chronometrer(lambda: analytique.charger_ventes(
+            service.stockage.iter_commandes(), *periode))
+        resultat["ventes_mois_s"] = round(t_mois, 4)
+        resultat["ventes_tout_l_historique_s"] = round(t_complet, 4)
+        resultat["lignes_du_mois"] = len(ventes_mois)
+        attendu = service.statistiques()
+        service.fermer()
+        service = ServiceCommercial()
+        resultat["invariants_ok"] = (service.statistiques() == attendu and len(ventes_mois) == len(ventes_completes)
+                                     and ventes_mois.meilleures_ventes(10) == ventes_completes.meilleures_ventes(10))
+        service.fermer()
+    return resultat
+
+
+def bench_repartition(arguments):
+    """Débit des validations de commandes : instance unique contre déploiement réparti
+    (repartition.py) avec 1, 2, 4... fragments, jusqu'à --processus (par défaut : un par cœur).
+
+    Les mêmes commandes (préparées avant la mesure) sont validées par --threads threads.
+    Le gain dépend du nombre de cœurs : sur une machine à un cœur, les fragments se partagent le processeur.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import repartition
+    from services import ServiceCommercial
+    maximum = max(2, arguments.processus or os.cpu_count() or 1)
+    resultat = {"threads": arguments.threads, "coeurs": os.cpu_count(), "validations": arguments.operations}
+    ecarts = []
+
+    def valider_tout(valider, numeros):
+        with ThreadPoolExecutor(max_workers=arguments.threads) as executeur:
+            debut = time.perf_counter()
+            list(executeur.map(valider, numeros))
+            return time.perf_counter() - debut
+
+    with dossier_temporaire():
+        generer_historique(arguments.produits, arguments.clients, arguments.commandes)
+        service = ServiceCommercial()
+        # Commandes de une à trois lignes sur des produits assez fournis pour qu'aucune ne soit refusée
+        alea = random.Random(23)
+        refs = [ref for ref, produit in service.depot.produits.items() if produit.disponible() > 50]
+        clients = list(service.depot.clients)
+        plan = [(alea.choice(clients), alea.sample(refs, alea.randint(1, 3))) for _ in range(arguments.operations)]
+        service.fermer()
+
+        def preparer(creer_commande, ajouter_ligne):
+            numeros = []
+            for id_client, lignes in plan:
+                numero = creer_commande(id_client)
+                for ref in lignes:
+                    ajouter_ligne(numero, ref, 1)
+                numeros.append(numero)
+            return numeros
+
+        nb_fragments = 1
+        while nb_fragments <= maximum:
+            # Les données de data/ ne sont pas modifiées : chaque mesure repart du même état
+            shutil.rmtree(repartition.dossier_repartition(), ignore_errors=True)
+            repartition.repartir_donnees(nb_fragments)
+            routeur = repartition.Routeur()
+            validees = routeur.statistiques()['commandes'].get("Validée", {"nombre": 0})['nombre']
+            numeros = preparer(lambda id_client: routeur.creer_commande(id_client)['numero_commande'],
+                               routeur.ajouter_ligne)
+            duree = valider_tout(routeur.valider, numeros)
+            attendu = routeur.statistiques()
+            if attendu['commandes']['Validée']['nombre'] != validees + len(numeros):
+                ecarts.append(f"{nb_fragments} fragments : validations manquantes")
+            if any(produit['stock'] < 0 for produit in routeur.lister_produits()):
+                ecarts.append(f"{nb_fragments} fragments : stock négatif")
+            routeur.fermer()
+            routeur = repartition.Routeur()  # Relu depuis les fichiers de chaque processus
+            if routeur.statistiques() != attendu:
+                ecarts.append(f"{nb_fragments} fragments : statistiques différentes après redémarrage")
+            routeur.fermer()
+            resultat[f"fragments_{nb_fragments}_validations_par_s"] = round(len(numeros) / duree) if duree else None
+            nb_fragments *= 2
+
+        # Référence : une seule instance dans ce processus, mêmes commandes
+        service = ServiceCommercial()
+        numeros = preparer(lambda id_client: service.creer_commande(id_client).numero_commande, service.ajouter_ligne)
+        duree = valider_tout(service.valider, numeros)
+        resultat["instance_unique_validations_par_s"] = round(len(numeros) / duree) if duree else None
+        service.fermer()
+    resultat["invariants_ok"] = not ecarts
+    resultat["ecarts"] = ecarts
+    return resultat
+
+
+def bench_affichage(arguments):
+    """Listes du menu : liste complète des commandes contre une page filtrée (rendu.py),
+    puis la même page relue depuis le cache et après modification d'un produit affiché.
+    """
+    from rendu import decouper_page
+    from services import ServiceCommercial
+    with dossier_temporaire():
+        generer_historique(arguments.produits, arguments.clients, arguments.commandes)
+        ServiceCommercial().fermer()  # Construit l'index des commandes
+        service = ServiceCommercial()
+        depot = service.depot
+        id_client = next(iter(depot.clients))
+
+        def liste_complete():
+            # Ancienne liste : toutes les commandes chargées et mises en forme
+            return [cmd.afficher_commande(depot.clients, depot.produits) for cmd in service.lister_commandes()]
+
+        def page(numero, **filtres):
+            resumes, _ = decouper_page(service.iter_resumes_commandes(**filtres), numero)
+            return [service.texte_commande(r.numero_commande) for r in resumes]
+
+        t_page, textes = chronometrer(lambda: page(50, statut="Validée"))
+        t_cache, textes_cache = chronometrer(lambda: page(50, statut="Validée"))
+        t_client, _ = chronometrer(lambda: page(1, id_client=id_client, date_debut="2025-03-01", date_fin="2025-06-30"))
+        commande = service.commande(next(service.iter_resumes_commandes(statut="Validée")).numero_commande)
+        service.modifier_produit(commande.produits_commandes[0].ref_produit, nom="Produit renommé")
+        t_apres, textes_apres = chronometrer(lambda: page(1, statut="Validée"))
+        t_complete, tous = chronometrer(liste_complete)
+        resultat = {
+            "commandes": len(tous),
+            "liste_complete_s": round(t_complete, 4),
+            "page_ms": round(t_page * 1000, 3),
+            "page_en_cache_ms": round(t_cache * 1000, 3),
+            "page_client_periode_ms": round(t_client * 1000, 3),
+            "page_apres_modification_ms": round(t_apres * 1000, 3),
+            "textes_en_cache": len(service.rendus),
+            "invariants_ok": textes == textes_cache and "Produit renommé" in textes_apres[0],
+        }
+        service.fermer()
+    return resultat
+
+
+def bench_recherche(arguments):
+    """Recherche de produits : index inversé (recherche.py) contre le parcours complet du catalogue."""
+    from models import Produit
+    from recherche import IndexRecherche
+    produits, _, _ = generer_donnees(arguments.produits, 0, 0)
+    produits = [Produit.from_dict(p) for p in produits]
+    alea = random.Random(3)
+    # Recherches typiques au comptoir : un mot, un début de mot, deux mots, sans accents
+    termes = []
+    for _ in range(arguments.recherches):
+        article, qualificatif = alea.choice(ARTICLES), alea.choice(QUALIFICATIFS)
+        termes.append(alea.choice([article, article[:3], f"{article} {qualificatif}",
+                                   article.lower().replace("è", "e").replace("é", "e").replace("É", "E")]))
+
+    def parcours():
+        # Ancienne méthode : nom en minuscules et recherche de sous-chaîne pour chaque produit
+        for terme in termes:
+            t = terme.lower()
+            [p for p in produits if t in p.nom.lower() or t == p.reference.lower()]
+
+    t_construction, index = chronometrer(IndexRecherche, produits)
+    t_parcours, _ = chronometrer(parcours)
+    t_index, _ = chronometrer(lambda: [index.rechercher(terme, 20) for terme in termes])
+    t_index_tout, _ = chronometrer(lambda: [index.rechercher(terme, None) for terme in termes])
+    return {
+        "produits": arguments.produits,
+        "recherches": len(termes),
+        "construction_index_s": round(t_construction, 4),
+        "parcours_us_par_recherche": round(t_parcours / len(termes) * 1e6, 1),
+        "index_us_par_recherche": round(t_index / len(termes) * 1e6, 1),
+        "index_sans_limite_us_par_recherche": round(t_index_tout / len(termes) * 1e6, 1),
+        "gain": round(t_parcours / t_index, 1) if t_index else None,
+    }
+
+
+def bench_recus(arguments):
+    """Génération en masse des reçus : un par un (menu) contre lots dans un pool de processus."""
+    import shutil
+    from services import ServiceCommercial
+    resultat = {"commandes": arguments.commandes, "coeurs": os.cpu_count()}
+    with dossier_temporaire():
+        generer_historique(arguments.produits, arguments.clients, arguments.commandes)
+        service = ServiceCommercial()
+        numeros = service.selectionner_commandes(statut="Validée")
+        resultat["recus"] = len(numeros)
+        t_un_par_un, _ = chronometrer(lambda: [service.generer_recu(num) for num in numeros])
+        resultat["un_par_un_recus_par_s"] = round(len(numeros) / t_un_par_un)
+        service.fermer()
+        # Nouveau service : les commandes ne sont pas déjà chargées en mémoire
+        for nom, processus, archive in (("lot_1_processus", 1, None), ("lot_pool", arguments.processus, None),
+                                        ("archive_pool", arguments.processus, "recus.zip")):
+            shutil.rmtree(data_manager.RECUS_DIR, ignore_errors=True)
+            service = ServiceCommercial()
+            rapport = service.generer_recus(statut="Validée", archive=archive, processus=processus)
+            service.fermer()
+            resultat[f"{nom}_recus_par_s"] = round(rapport.debit())
+    for nom in ("lot_1_processus", "lot_pool"):
+        resultat[f"gain_{nom}"] = round(resultat[f"{nom}_recus_par_s"] / resultat["un_par_un_recus_par_s"], 1)
+    return resultat
+
+
+def bench_compteurs(arguments):
+    """Totaux tenus à jour par différence : grande commande et compteurs de l'application.
+
+    Vérifie aussi, après une série d'opérations aléatoires, que les compteurs sont égaux
+    à un recalcul complet.
+    """
+    from models import Commande, LigneCommande
+    from services import ServiceCommercial
+    from exceptions import ErreurGestion
+
+    def ajout_historique(commande, ref, quantite, prix):
+        # Comportement précédent : recherche linéaire de la ligne puis recalcul complet du total
+        for item in commande.produits_commandes:
+            if item.ref_produit == ref:
+                item.quantite += quantite
+                commande.calculer_total()
+                return
+        commande.produits_commandes.append(LigneCommande(ref, quantite, prix))
+        commande.calculer_total()
+
+    lignes = [(f"PROD-{i:08X}", 1 + i % 5, 1.0 + i % 97) for i in range(arguments.lignes)]
+    avant, apres = Commande("A", "", ""), Commande("B", "", "")
+    t_avant, _ = chronometrer(lambda: [ajout_historique(avant, *ligne) for ligne in lignes])
+    t_apres, _ = chronometrer(lambda: [apres.ajouter_produit(*ligne) for ligne in lignes])
+    resultat = {
+        "lignes": arguments.lignes,
+        "grande_commande_recalcul_s": round(t_avant, 4),
+        "grande_commande_difference_s": round(t_apres, 4),
+        "totaux_egaux": abs(avant.total - apres.total) < 1e-6,
+    }
+
+    alea = random.Random(11)
+    with dossier_temporaire():
+        generer_historique(arguments.produits, arguments.clients, arguments.commandes)
+        service = ServiceCommercial()
+        t_premier, _ = chronometrer(service.statistiques)
+        t_compteurs, _ = chronometrer(lambda: [service.statistiques() for _ in range(1000)])
+        t_recalcul, _ = chronometrer(service.depot.recalculer_compteurs)
+        refs, clients = list(service.depot.produits), list(service.depot.clients)
+        numeros = service.selectionner_commandes(statut="Validée")[:200]
+        for _ in range(2000):
+            try:
+                tirage = alea.random()
+                if tirage < 0.4:
+                    commande = service.creer_commande(alea.choice(clients))
+                    for ref in alea.sample(refs, 3):
+                        service.ajouter_ligne(commande.numero_commande, ref, alea.randint(1, 3))
+                    numeros.append(commande.numero_commande)
+                elif tirage < 0.7:
+                    service.valider(alea.choice(numeros))
+                elif tirage < 0.85:
+                    service.annuler(alea.choice(numeros))
+                else:
+                    service.modifier_produit(alea.choice(refs), prix_unitaire=round(alea.uniform(1, 500), 2))
+            except ErreurGestion:
+                pass
+        ecarts = service.verifier_statistiques()
+        service.fermer()
+    resultat.update({
+        "commandes": arguments.commandes,
+        "premier_calcul_compteurs_s": round(t_premier, 4),
+        "statistiques_us": round(t_compteurs / 1000 * 1e6, 1),
+        "recalcul_complet_s": round(t_recalcul, 4),
+        "invariants_ok": not ecarts,
+        "ecarts": ecarts[:10],
+    })
+    return resultat
+
+
+def bench_analytique(arguments):
+    """Statistiques de ventes : colonnes (analytique.py, avec et sans NumPy) contre objets Commande."""
+    import analytique
+    from models import Commande
+    from services import ServiceCommercial
+    with dossier_temporaire():
+        # Historique écrit en flux : des millions de lignes sans tout garder en mémoire
+        produits, clients, _ = generer_donnees(arguments.produits, arguments.clients, 0)
+        data_manager.sauvegarder_donnees_json(data_manager.PRODUITS_FILE, produits)
+        data_manager.sauvegarder_donnees_json(data_manager.CLIENTS_FILE, clients)
+        data_manager.sauvegarder_donnees_json_flux(
+            data_manager.COMMANDES_FILE, iter_commandes(random.Random(42), produits, clients, arguments.commandes))
+
+        def objets():
+            # Sans colonnes : un objet Commande par commande et des dicts de totaux
+            par_jour, par_produit, par_client, quantites = {}, {}, {}, {}
+            # Ancien fichier unique réparti en partitions mensuelles par le service
+            for data in data_manager.iter_commandes_partitions():
+                commande = Commande.from_dict(data)
+                if commande.statut != "Validée":
+                    continue
+                commande.calculer_total()
+                jour = commande.date_creation[:10]
+                par_jour[jour] = par_jour.get(jour, 0.0) + commande.total
+                par_client[commande.id_client] = par_client.get(commande.id_client, 0.0) + commande.total
+                for item in commande.produits_commandes:
+                    par_produit[item.ref_produit] = par_produit.get(item.ref_produit, 0.0) + item.prix_vente * item.quantite
+                    quantites[item.ref_produit] = quantites.get(item.ref_produit, 0) + item.quantite
+            return sorted(quantites.values(), reverse=True)[:10]
+
+        def agreger(ventes):
+            stocks = {p['reference']: p['stock'] for p in produits}
+            return (ventes.chiffre_affaires_par_jour(), ventes.chiffre_affaires_par_produit(),
+                    ventes.chiffre_affaires_par_client(), ventes.meilleures_ventes(10), ventes.rotation_stocks(stocks))
+
+        service = ServiceCommercial()
+        t_chargement, ventes = chronometrer(service.ventes)
+        service.fermer()
+        t_objets, top_objets = chronometrer(objets)
+        resultat = {
+            "commandes": arguments.commandes,
+            "lignes_validees": len(ventes),
+            "numpy": analytique.np is not None,
+            "chargement_colonnes_s": round(t_chargement, 4),
+        }
+        if analytique.np is not None:
+            t_numpy, agregats = chronometrer(agreger, ventes)
+            resultat["agregats_numpy_s"] = round(t_numpy, 4)
+        numpy, analytique.np = analytique.np, None
+        try:
+            t_boucle, agregats = chronometrer(agreger, ventes)
+        finally:
+            analytique.np = numpy
+        resultat["agregats_sans_numpy_s"] = round(t_boucle, 4)
+        resultat["objets_s"] = round(t_objets, 4)
+        resultat["memes_meilleures_ventes"] = [quantite for _, quantite, _ in agregats[3]] == top_objets
+    return resultat
+
+
+def bench_formats(arguments):
+    """Ecriture et relecture des fichiers de données dans chaque format (data_manager.FORMATS_INSTANTANE)."""
+    from models import Produit, Client
+    from services import ServiceCommercial
+    produits, clients, commandes = generer_donnees(arguments.produits, arguments.clients, arguments.commandes)
+    alea = random.Random(3)
+    resultat = {"produits": len(produits), "clients": len(clients), "commandes": len(commandes),
+                "orjson": data_manager.orjson is not None}
+    variantes = [(nom, nom, data_manager.orjson) for nom in data_manager.FORMATS_INSTANTANE]
+    if data_manager.orjson is not None:
+        variantes.insert(2, ("json-compact-sans-orjson", "json-compact", None))
+    format_initial, orjson_initial = data_manager.FORMAT_INSTANTANE, data_manager.orjson
+    # Partitions non compressées : seul le format est comparé (voir le scénario partitions)
+    mois_initial, data_manager.MOIS_NON_ARCHIVES = data_manager.MOIS_NON_ARCHIVES, 0
+    reference = None
+    try:
+        for nom, format_instantane, orjson in variantes:
+            data_manager.FORMAT_INSTANTANE, data_manager.orjson = format_instantane, orjson
+            mesures = {}
+            with dossier_temporaire():
+                t_produits, _ = chronometrer(data_manager.sauvegarder_collection, "produit", produits)
+                t_clients, _ = chronometrer(data_manager.sauvegarder_collection, "client", clients)
+                t_commandes, partitions = chronometrer(data_manager.sauvegarder_commandes, commandes)
+                mesures["ecriture_s"] = {"produits": round(t_produits, 4), "clients": round(t_clients, 4),
+                                         "commandes": round(t_commandes, 4)}
+                mesures["taille_octets"] = {type_entite: os.path.getsize(data_manager.chemin_collection(type_entite))
+                                            for type_entite in ("produit", "client")}
+                mesures["taille_octets"]["commande"] = sum(os.path.getsize(fichier) for fichier, _ in partitions.values())
+
+                # Relecture en objets, avec le constructeur utilisé par le service au démarrage
+                creer_produit = (Produit.depuis_instantane if format_instantane == "binaire"
+                                 else Produit.from_dict)
+                t_produits, objets_produits = chronometrer(
+                    lambda: [creer_produit(p) for p in data_manager.charger_collection("produit")[0]])
+                t_clients, objets_clients = chronometrer(
+                    lambda: [Client.from_dict(c) for c in data_manager.charger_collection("client")[0]])
+                t_commandes, relues = chronometrer(lambda: list(data_manager.iter_commandes_partitions()))
+                mesures["lecture_s"] = {"produits": round(t_produits, 4), "clients": round(t_clients, 4),
+                                        "commandes": round(t_commandes, 4)}
+                lecteurs = [(data_manager.ouvrir_partition(fichier), positions) for fichier, positions in partitions.values()]
+                tirages = [alea.choice(lecteurs) for _ in range(arguments.operations)]
+                mesures["lecture_commande"] = mesurer_operations(
+                    data_manager.lire_commande, [(f, alea.choice(positions)) for f, positions in tirages])
+                for f, _ in lecteurs:
+                    f.close()
+                donnees = ([p.to_dict() for p in objets_produits], [c.to_dict() for c in objets_clients], relues)
+                if reference is None:
+                    reference = donnees
+                mesures["identique"] = donnees == reference
+
+                t_premier, service = chronometrer(ServiceCommercial)  # Construit l'index des commandes
+                service.fermer()
+                t_demarrage, service = chronometrer(ServiceCommercial)
+                service.fermer()
+                mesures["premier_demarrage_s"] = round(t_premier, 4)
+                mesures["demarrage_s"] = round(t_demarrage, 4)
+            resultat[nom] = mesures
+    finally:
+        data_manager.FORMAT_INSTANTANE, data_manager.orjson = format_initial, orjson_initial
+        data_manager.MOIS_NON_ARCHIVES = mois_initial
+    resultat["invariants_ok"] = all(resultat[nom]["identique"] for nom, _, _ in variantes)
+    return resultat
+
+
+def bench_sauvegarde(arguments):
+    """Latence des opérations pendant les sauvegardes : compaction dans le thread appelant
+    (au-delà de JOURNAL_SEUIL_COMPACTION entrées) contre sauvegarde en arrière-plan.
+
+    Exemple : python benchmark.py sauvegarde --commandes 200000 --operations 2000
+    """
+    from services import ServiceCommercial
+    resultat = {"commandes": arguments.commandes, "operations": arguments.operations}
+    with dossier_temporaire():
+        generer_historique(arguments.produits, arguments.clients, arguments.commandes)
+        ServiceCommercial().fermer()  # Construit l'index des commandes
+        for nom, intervalle in (("compaction_en_ligne", 0), ("sauvegarde_auto", 0.5)):
+            service = ServiceCommercial()
+            sauvegarde_auto = service.demarrer_sauvegarde_auto(intervalle)
+            alea = random.Random(11)
+            refs, clients = list(service.depot.produits), list(service.depot.clients)
+
+            def commande_validee(id_client, ref):
+                commande = service.creer_commande(id_client)
+                service.ajouter_ligne(commande.numero_commande, ref, 1)
+                service.valider(commande.numero_commande)
+
+            mesures = mesurer_operations(commande_validee, [(alea.choice(clients), alea.choice(refs))
+                                                            for _ in range(arguments.operations)])
+            attendu = service.statistiques()
+            t_fermeture, _ = chronometrer(service.fermer)  # Dernière sauvegarde
+            if sauvegarde_auto is not None:
+                mesures["sauvegardes"] = sauvegarde_auto.nb_sauvegardes
+            mesures["fermeture_s"] = round(t_fermeture, 4)
+            service = ServiceCommercial()
+            mesures["relu_identique"] = service.statistiques() == attendu
+            service.fermer()
+            resultat[nom] = mesures
+    resultat["invariants_ok"] = all(resultat[nom]["relu_identique"] for nom in ("compaction_en_ligne", "sauvegarde_auto"))
+    return resultat
+
+
+def bench_surete(arguments):
+    """Sûreté des fichiers de données : surcoût de la somme de contrôle et des générations
+    à l'écriture des commandes, puis démarrage après corruption des fichiers actuels
+    (reprise sur la génération précédente).
+    """
+    import instantane
+    from services import ServiceCommercial
+    produits, clients, commandes = generer_donnees(arguments.produits, arguments.clients, arguments.commandes)
+    resultat = {"commandes": len(commandes), "generations": data_manager.GENERATIONS_CONSERVEES}
+    format_initial = data_manager.FORMAT_INSTANTANE
+    mois_initial, data_manager.MOIS_NON_ARCHIVES = data_manager.MOIS_NON_ARCHIVES, 0
+    premier_mois = data_manager.mois_de(commandes[0]['date_creation'])
+    try:
+        for format_instantane in data_manager.FORMATS_INSTANTANE:
+            data_manager.FORMAT_INSTANTANE = format_instantane
+            mesures = {}
+            with dossier_temporaire():
+                # Toutes les commandes dans une partition (réécrite ensuite par les sauvegardes complètes)
+                chemin = data_manager.chemin_partition(premier_mois)
+
+                def ecrire(controle):
+                    if format_instantane == "binaire":
+                        return data_manager._ecrire_par_remplacement(
+                            chemin, lambda f: instantane.ecrire_commandes(f, commandes), controle)
+                    return data_manager.sauvegarder_donnees_json_flux(chemin, commandes, controle)
+
+                for nom, controle in (("sans_controle", False), ("avec_controle", True)):
+                    mesures[f"ecriture_{nom}_s"] = round(min(chronometrer(ecrire, controle)[0] for _ in range(3)), 4)
+                mesures["surcout_pct"] = round((mesures["ecriture_avec_controle_s"] / mesures["ecriture_sans_controle_s"]
+                                                - 1) * 100, 1)
+
+                # Deux sauvegardes complètes : la génération 1 est identique aux fichiers actuels
+                for _ in range(2):
+                    data_manager.sauvegarder_collection("produit", produits)
+                    data_manager.sauvegarder_collection("client", clients)
+                    data_manager.sauvegarder_commandes(commandes)
+                t_demarrage, service = chronometrer(ServiceCommercial)
+                attendu = service.statistiques()
+                service.fermer()
+                # Ecritures interrompues : fichiers tronqués, index de la partition périmé
+                for fichier in (data_manager.chemin_collection("produit"), chemin):
+                    with open(fichier, 'r+b') as f:
+                        f.truncate(os.path.getsize(fichier) // 2)
+                with contextlib.redirect_stdout(io.StringIO()) as messages:
+                    t_reprise, service = chronometrer(ServiceCommercial)
+                mesures["demarrage_s"] = round(t_demarrage, 4)
+                mesures["demarrage_reprise_s"] = round(t_reprise, 4)
+                mesures["reprises_signalees"] = messages.getvalue().count("reprise de la version précédente")
+                mesures["reprise_identique"] = service.statistiques() == attendu
+                service.fermer()
+            resultat[format_instantane] = mesures
+    finally:
+        data_manager.FORMAT_INSTANTANE = format_initial
+        data_manager.MOIS_NON_ARCHIVES = mois_initial
+    resultat["invariants_ok"] = all(resultat[f]["reprise_identique"] for f in data_manager.FORMATS_INSTANTANE)
+    return resultat
+
+
+def bench_suppression(arguments):
+    """Suppressions de produits et de clients : contrôle par parcours des commandes contre les
+    comptes tenus à jour par le dépôt, et suppression en lot contre une à une.
+    """
+    from exceptions import ErreurGestion
+    from services import ServiceCommercial
+    with dossier_temporaire():
+        generer_historique(arguments.produits, arguments.clients, arguments.commandes)
+        ServiceCommercial().fermer()  # Construit l'index des commandes
+        service = ServiceCommercial()
+        depot = service.depot
+        alea = random.Random(5)
+        refs, clients = alea.sample(list(depot.produits), min(100, len(depot.produits))), list(depot.clients)[:100]
+
+        def parcours():
+            # Ancien contrôle : toutes les commandes (et leurs lignes) pour chaque suppression
+            for ref in refs:
+                any(r.statut != "Annulée" and ref in r.refs for r in depot.resumes.values())
+            for id_client in clients:
+                any(r.statut != "Annulée" and r.id_client == id_client for r in depot.resumes.values())
+
+        def comptes():
+            for ref in refs:
+                depot.nb_commandes_actives_produit(ref)
+            for id_client in clients:
+                depot.nb_commandes_actives_client(id_client)
+
+        t_construction, _ = chronometrer(comptes)  # Premier appel : construction des index
+        t_parcours, _ = chronometrer(parcours)
+        t_comptes, _ = chronometrer(comptes)
+        nouveaux = [[service.ajouter_produit(f"Article à retirer {i}", 1.0, 0).reference for i in range(arguments.lignes)]
+                    for _ in range(2)]
+
+        def un_par_un():
+            for reference in nouveaux[0]:
+                try:
+                    service.supprimer_produit(reference)
+                except ErreurGestion:
+                    pass
+
+        t_un_par_un, _ = chronometrer(un_par_un)
+        t_lot, (supprimes, refus) = chronometrer(service.supprimer_produits, nouveaux[1] + refs)
+        resultat = {
+            "commandes": len(depot.resumes),
+            "controles": len(refs) + len(clients),
+            "construction_index_s": round(t_construction, 4),
+            "parcours_us_par_controle": round(t_parcours / (len(refs) + len(clients)) * 1e6, 1),
+            "comptes_us_par_controle": round(t_comptes / (len(refs) + len(clients)) * 1e6, 3),
+            "suppressions": arguments.lignes,
+            "un_par_un_s": round(t_un_par_un, 4),
+            "lot_s": round(t_lot, 4),
+            "refus_lot": len(refus),
+        }
+        service.fermer()
+        service = ServiceCommercial()
+        resultat["invariants_ok"] = (len(supprimes) == arguments.lignes
+                                     and not any(r in service.depot.produits for liste in nouveaux for r in liste)
+                                     and all(service.depot.nb_commandes_actives_client(c) == len(service.depot.commandes_actives_client(c))
+                                             for c in clients))
+        service.fermer()
+    return resultat
+
+
+def bench_suite(arguments):
+    """Parcours complet sur un jeu de données généré : démarrage, recherche, création,
+    validation et annulation de commandes, reçus et sauvegarde.
+
+    Exemple : python benchmark.py suite --commandes 1000000 --sortie resultats/v2.json
+    """
+    from services import ServiceCommercial
+    alea = random.Random(5)
+    resultat = {"produits": arguments.produits, "clients": arguments.clients, "commandes": arguments.commandes}
+    with dossier_temporaire():
+        t_generation, _ = chronometrer(generer_historique, arguments.produits, arguments.clients, arguments.commandes)
+        t_premier, service = chronometrer(ServiceCommercial)  # Reconstruit l'index des commandes
+        service.fermer()
+        t_demarrage, service = chronometrer(ServiceCommercial)
+        resultat.update({"generation_s": round(t_generation, 4), "premier_demarrage_s": round(t_premier, 4),
+                         "demarrage_s": round(t_demarrage, 4)})
+
+        t_index, _ = chronometrer(lambda: service.recherche)
+        termes = [(alea.choice([alea.choice(ARTICLES), f"{alea.choice(ARTICLES)} {alea.choice(QUALIFICATIFS)}"]),)
+                  for _ in range(arguments.operations)]
+        resultat["index_recherche_s"] = round(t_index, 4)
+        resultat["recherche"] = mesurer_operations(service.rechercher_produits, termes)
+
+        refs, clients = list(service.depot.produits), list(service.depot.clients)
+        numeros = []
+
+        def creer(id_client, lignes):
+            commande = service.creer_commande(id_client)
+            numeros.append(commande.numero_commande)
+            for ref, quantite in lignes:
+                service.ajouter_ligne(commande.numero_commande, ref, quantite)
+
+        resultat["creation"] = mesurer_operations(creer, [
+            (alea.choice(clients), [(ref, alea.randint(1, 3)) for ref in alea.sample(refs, min(len(refs), 3))])
+            for _ in range(arguments.operations)])
+        # Une commande sur deux validée, l'autre annulée ; puis annulation de commandes validées
+        a_valider, a_annuler = numeros[::2], numeros[1::2]
+        resultat["validation"] = mesurer_operations(service.valider, [(num,) for num in a_valider])
+        resultat["annulation_en_cours"] = mesurer_operations(service.annuler, [(num,) for num in a_annuler])
+        historiques = service.selectionner_commandes(statut="Validée")[:arguments.operations]
+        resultat["recu"] = mesurer_operations(service.generer_recu, [(num,) for num in historiques])
+        resultat["annulation_validee"] = mesurer_operations(service.annuler, [(num,) for num in historiques])
+        t_sauvegarde, _ = chronometrer(service.sauvegarder)
+        resultat["sauvegarde_s"] = round(t_sauvegarde, 4)
+        rapport = service.generer_recus(statut="Validée", processus=arguments.processus)
+        resultat["recus_en_masse"] = {"nombre": rapport.nombre, "duree_s": round(rapport.duree, 4),
+                                      "recus_par_s": round(rapport.debit())}
+        service.fermer()
+    return resultat
+
+
+def aplatir(resultat, prefixe=""):
+    """{"creation": {"p99_us": 12}} -> {"creation.p99_us": 12} (valeurs numériques seulement)."""
+    valeurs = {}
+    for cle, valeur in resultat.items():
+        if isinstance(valeur, dict):
+            valeurs.update(aplatir(valeur, f"{prefixe}{cle}."))
+        elif isinstance(valeur, (int, float)) and not isinstance(valeur, bool):
+            valeurs[prefixe + cle] = valeur
+    return valeurs
+
+
+def comparer(reference, resultat, seuil=0.10):
+    """Compare deux résultats d'un même scénario. Retourne les lignes à afficher et le nombre de régressions.
+
+    Durées (_s, _us, _ms) : plus bas est meilleur ; débits (_par_s) et gains : plus haut est meilleur.
+    """
+    avant, apres = aplatir(reference), aplatir(resultat)
+    lignes, regressions = [], 0
+    for cle in avant.keys() & apres.keys():
+        if cle.endswith("_par_s") or cle.endswith("gain") or cle.startswith("gain"):
+            sens = 1
+        elif cle.endswith(("_s", "_us", "_ms")):
+            sens = -1
+        else:
+            continue
+        if not avant[cle]:
+            continue
+        variation = (apres[cle] - avant[cle]) / avant[cle]
+        regression = sens * variation < -seuil
+        regressions += regression
+        lignes.append(f"{'REGRESSION ' if regression else '           '}{cle:<40} "
+                      f"{avant[cle]:>12} -> {apres[cle]:>12} ({variation:+.0%})")
+    return sorted(lignes), regressions
+
+
+def informations_execution(arguments):
+    """Contexte enregistré avec les résultats, pour comparer deux versions sur la même machine."""
+    import platform
+    import subprocess
+    try:
+        version = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        version = None
+    return {
+        "scenario": arguments.scenario,
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "version": version,
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "coeurs": os.cpu_count(),
+        "parametres": {cle: valeur for cle, valeur in vars(arguments).items() if cle not in ("sortie", "reference")},
+    }
+
+
+SCENARIOS = {
+    "affichage": bench_affichage,
+    "analytique": bench_analytique,
+    "compteurs": bench_compteurs,
+    "concurrence": bench_concurrence,
+    "demarrage": bench_demarrage,
+    "formats": bench_formats,
+    "http": bench_http,
+    "import": bench_import,
+    "memoire": bench_memoire,
+    "partitions": bench_partitions,
+    "recherche": bench_recherche,
+    "recus": bench_recus,
+    "repartition": bench_repartition,
+    "sauvegarde": bench_sauvegarde,
+    "suite": bench_suite,
+    "suppression": bench_suppression,
+    "surete": bench_surete,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de la gestion commerciale.")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--produits", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--commandes", type=int, default=100000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--connexions", type=int, default=32, help="Clients simultanés du scénario http")
+    parser.add_argument("--recherches", type=int, default=1000, help="Nombre de recherches du scénario recherche")
+    parser.add_argument("--lignes", type=int, default=5000, help="Lignes de la grande commande du scénario compteurs")
+    parser.add_argument("--processus", type=int, default=None, help="Processus des scénarios recus et repartition (par défaut : un par cœur)")
+    parser.add_argument("--operations", type=int, default=1000, help="Opérations de chaque type des scénarios suite et repartition")
+    parser.add_argument("--sortie", help="Enregistre le résultat (avec la version et les paramètres) dans ce fichier JSON")
+    parser.add_argument("--reference", help="Résultat JSON d'une version précédente à comparer")
+    arguments = parser.parse_args(argv)
+    # Lu avant l'exécution : une erreur de chemin ne fait pas perdre une longue mesure
+    reference = None
+    if arguments.reference:
+        with open(arguments.reference, encoding='utf-8') as f:
+            reference = json.load(f)
+    informations = informations_execution(arguments)
+    resultat = SCENARIOS[arguments.scenario](arguments)
+    print(json.dumps(resultat, indent=4, ensure_ascii=False))
+    if arguments.sortie:
+        os.makedirs(os.path.dirname(os.path.abspath(arguments.sortie)), exist_ok=True)
+        with open(arguments.sortie, 'w', encoding='utf-8') as f:
+            json.dump(dict(informations, resultat=resultat), f, indent=4, ensure_ascii=False)
+    code_retour = 0
+    if reference is not None:
+        if reference.get("scenario") != arguments.scenario:
+            print(f"Attention : la référence est un résultat du scénario {reference.get('scenario')}.")
+        lignes, regressions = comparer(reference.get("resultat", {}), resultat)
+        print(f"\nComparaison avec {arguments.reference} (version {reference.get('version')}) :")
+        for ligne in lignes:
+            print(ligne)
+        print(f"{regressions} régression(s) de plus de 10 %.")
+        code_retour = 2 if regressions else 0
+    if resultat.get("invariants_ok") is False:
+        code_retour = 1
+    sys.exit(code_retour)
+
+
+if __name__ == "__main__":
+    main()
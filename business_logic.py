@@ -1,27 +1,90 @@
 # business_logic.py
-import uuid
-import datetime
-from models import Produit, Client, Commande # Importer les classes du fichier models.py
-import data_manager # Importer les fonctions de data_manager.py
+# Interface en ligne de commande : lit les saisies, appelle la couche de services
+# (services.py) et affiche les résultats ou les erreurs.
+from services import ServiceCommercial # Opérations métier, sans saisie ni affichage
+from exceptions import ErreurGestion, StockInsuffisant, StatutInvalide # Erreurs métier levées par les services
+from rendu import decouper_page, TAILLE_PAGE
 
 class GestionCommercialeApp:
-    def __init__(self):
-        # Charger les données en utilisant les fonctions de data_manager
-        # et convertir les dictionnaires en objets de nos classes
-        self.produits = [Produit.from_dict(p) for p in data_manager.charger_donnees_json(data_manager.PRODUITS_FILE)]
-        self.clients = [Client.from_dict(c) for c in data_manager.charger_donnees_json(data_manager.CLIENTS_FILE)]
-        self.commandes = [Commande.from_dict(cmd) for cmd in data_manager.charger_donnees_json(data_manager.COMMANDES_FILE)]
+    def __init__(self, service=None):
+        # Charge les données depuis le support de stockage configuré dans data_manager
+        self.service = service or ServiceCommercial()
 
     def sauvegarder_tout(self):
-        data_manager.sauvegarder_donnees_json(data_manager.PRODUITS_FILE, [p.to_dict() for p in self.produits])
-        data_manager.sauvegarder_donnees_json(data_manager.CLIENTS_FILE, [c.to_dict() for c in self.clients])
-        data_manager.sauvegarder_donnees_json(data_manager.COMMANDES_FILE, [cmd.to_dict() for cmd in self.commandes])
+        # Les modifications sont déjà persistées : la sauvegarde se limite à la compaction
+        self.service.sauvegarder()
         print("Données sauvegardées.")
 
+    def importer_commandes(self, commandes_entrantes):
+        rapport = self.service.importer_commandes(commandes_entrantes)
+        rapport.afficher()
+        return rapport
+
+    def exporter_commandes(self, chemin, statut=None):
+        nombre = self.service.exporter_commandes(chemin, statut)
+        print(f"{nombre} commande(s) exportée(s) dans {chemin}.")
+
+    def afficher_statistiques(self):
+        stats = self.service.statistiques()
+        print("\n--- Tableau de bord ---")
+        print(f"Valeur du stock : {stats['valeur_stock']:.2f} MAD")
+        print(f"Commandes en cours : {stats['commandes_en_cours']}")
+        print(f"Chiffre d'affaires (commandes validées) : {stats['chiffre_affaires']:.2f} MAD")
+        for statut, valeurs in stats['commandes'].items():
+            print(f"  {statut} : {valeurs['nombre']} commande(s), {valeurs['montant']:.2f} MAD")
+
+    def generer_recus(self, date_debut=None, date_fin=None, statut="Validée", id_client=None,
+                      archive=None, processus=None):
+        try:
+            rapport = self.service.generer_recus(date_debut, date_fin, statut, id_client, archive, processus)
+        except ErreurGestion as e:
+            print(f"Erreur: {e}")
+            return None
+        rapport.afficher()
+        return rapport
+
+    def supprimer_produits(self, references):
+        supprimes, refus = self.service.supprimer_produits(references)
+        print(f"{len(supprimes)} produit(s) supprimé(s), {len(refus)} conservé(s).")
+        for reference, motif in refus:
+            print(f"  - {reference} conservé : {motif}")
+        return supprimes, refus
+
+    def rapport_ventes(self, date_debut=None, date_fin=None, nombre=10):
+        ventes = self.service.ventes(date_debut, date_fin)
+        produits, clients = self.service.depot.produits, self.service.depot.clients
+
+        def nom_produit(ref):
+            return produits[ref].nom if ref in produits else "Produit Inconnu"
+
+        def nom_client(id_client):
+            client = clients.get(id_client)
+            return f"{client.prenom} {client.nom}" if client else "Client Inconnu"
+
+        print(f"\n--- Rapport des Ventes ({date_debut or 'début'} -> {date_fin or 'fin'}) ---")
+        print(f"{ventes.nb_commandes} commande(s) validée(s), {len(ventes)} ligne(s), "
+              f"chiffre d'affaires : {ventes.chiffre_affaires():.2f} MAD")
+        print("\nChiffre d'affaires par jour :")
+        for jour, montant in ventes.chiffre_affaires_par_jour():
+            print(f"  {jour} : {montant:.2f} MAD")
+        print(f"\nMeilleures ventes (top {nombre}) :")
+        for ref, quantite, montant in ventes.meilleures_ventes(nombre):
+            print(f"  {nom_produit(ref)} ({ref}) : {quantite} vendu(s), {montant:.2f} MAD")
+        print(f"\nMeilleurs clients (top {nombre}) :")
+        for id_client, montant in ventes.chiffre_affaires_par_client()[:nombre]:
+            print(f"  {nom_client(id_client)} ({id_client}) : {montant:.2f} MAD")
+        print(f"\nRotation des stocks (top {nombre}) :")
+        stocks = {ref: p.stock for ref, p in produits.items()}
+        for ref, quantite, stock, rotation, couverture in ventes.rotation_stocks(stocks)[:nombre]:
+            rotation = f"{rotation:.2f}" if rotation is not None else "stock épuisé"
+            couverture = f"{couverture:.0f} jour(s)" if couverture is not None else "-"
+            print(f"  {nom_produit(ref)} ({ref}) : {quantite} vendu(s), stock {stock}, "
+                  f"rotation {rotation}, couverture {couverture}")
+        return ventes
+
     # --- Gestion des Produits ---
     def ajouter_produit(self):
         print("\n--- Ajouter un Produit ---")
-        reference = "PROD-" + str(uuid.uuid4())[:8].upper()
         nom = input("Nom du produit : ")
         while not nom:
             nom = input("Le nom ne peut pas être vide. Nom du produit : ")
@@ -46,28 +109,38 @@ class GestionCommercialeApp:
                 print("Veuillez entrer un nombre entier valide pour le stock.")
                 stock = -1
 
-        if any(p.reference == reference for p in self.produits):
-             print(f"Erreur : Un produit avec la référence {reference} existe déjà.")
-             return
-
         try:
-            nouveau_produit = Produit(reference, nom, prix, stock)
-            self.produits.append(nouveau_produit)
-            print(f"Produit '{nom}' ajouté avec succès (Réf: {reference}).")
-        except ValueError as e:
+            produit = self.service.ajouter_produit(nom, prix, stock)
+            print(f"Produit '{nom}' ajouté avec succès (Réf: {produit.reference}).")
+        except ErreurGestion as e:
             print(f"Erreur lors de la création du produit: {e}")
 
+    def _afficher_pages(self, parcourir, afficher, separateur=None):
+        """Affiche une liste page par page. parcourir() retourne un nouvel itérateur sur les éléments."""
+        page = 1
+        while True:
+            elements, suivante = decouper_page(parcourir(), page, TAILLE_PAGE)
+            for element in elements:
+                print(afficher(element))
+                if separateur:
+                    print(separateur)
+            if page == 1 and not suivante:
+                return
+            choix = input(f"Page {page} - [Entrée] suivante, [p] précédente, [q] retour : ").strip().lower()
+            if choix == 'q' or (choix == '' and not suivante):
+                return
+            page = max(1, page - 1) if choix == 'p' else page + 1
+
     def afficher_produits(self):
         print("\n--- Liste des Produits ---")
-        if not self.produits:
+        if not self.service.depot.produits:
             print("Aucun produit disponible.")
             return
-        for p in self.produits:
-            print(p.afficher_details())
+        self._afficher_pages(lambda: iter(self.service.lister_produits()), self.service.texte_produit)
 
     def rechercher_produit(self):
-        terme = input("Rechercher produit par nom ou référence : ").lower()
-        trouves = [p for p in self.produits if terme in p.nom.lower() or terme == p.reference.lower()]
+        terme = input("Rechercher produit par nom ou référence : ")
+        trouves = self.service.rechercher_produits(terme)
         if not trouves:
             print("Aucun produit trouvé.")
         else:
@@ -76,8 +149,9 @@ class GestionCommercialeApp:
     
     def modifier_produit_menu(self):
         ref = input("Référence du produit à modifier : ")
-        produit = next((p for p in self.produits if p.reference == ref), None)
-        if not produit:
+        try:
+            produit = self.service.produit(ref)
+        except ErreurGestion:
             print("Produit non trouvé.")
             return
 
@@ -96,101 +170,73 @@ class GestionCommercialeApp:
                 print("Prix invalide. Modification du prix annulée.")
                 n_prix = None
         
-        produit.modifier_produit(nom=n_nom, prix_unitaire=n_prix)
-        print("Produit modifié.")
+        try:
+            self.service.modifier_produit(ref, nom=n_nom, prix_unitaire=n_prix)
+            print("Produit modifié.")
+        except ErreurGestion as e:
+            print(f"Erreur: {e}")
 
     def supprimer_produit(self):
         ref = input("Référence du produit à supprimer : ")
-        for cmd in self.commandes:
-            if cmd.statut != "Annulée":
-                for item_cmd in cmd.produits_commandes:
-                    if item_cmd['ref_produit'] == ref:
-                        print(f"Erreur: Produit {ref} est dans la commande {cmd.numero_commande}. Suppression annulée.")
-                        return
-        
-        produit_index = -1
-        for i, p in enumerate(self.produits):
-            if p.reference == ref:
-                produit_index = i
-                break
-        
-        if produit_index != -1:
-            del self.produits[produit_index]
+        try:
+            self.service.supprimer_produit(ref)
             print(f"Produit {ref} supprimé.")
-        else:
-            print("Produit non trouvé.")
+        except ErreurGestion as e:
+            print(f"Erreur: {e} Suppression annulée.")
 
     # --- Gestion des Clients ---
     def ajouter_client(self):
         print("\n--- Ajouter un Client ---")
-        id_client = "CLI-" + str(uuid.uuid4())[:8].upper()
         nom = input("Nom de famille : ")
         prenom = input("Prénom : ")
         adresse = input("Adresse : ")
         telephone = input("Téléphone (optionnel) : ")
         email = input("Email (optionnel) : ")
 
-        if any(c.id_client == id_client for c in self.clients):
-            print(f"Erreur: Un client avec l'ID {id_client} existe déjà.")
-            return
-
-        nouveau_client = Client(id_client, nom, prenom, adresse, telephone, email)
-        self.clients.append(nouveau_client)
-        print(f"Client '{prenom} {nom}' ajouté (ID: {id_client}).")
+        try:
+            client = self.service.ajouter_client(nom, prenom, adresse, telephone, email)
+            print(f"Client '{prenom} {nom}' ajouté (ID: {client.id_client}).")
+        except ErreurGestion as e:
+            print(f"Erreur: {e}")
 
     def afficher_clients(self):
         print("\n--- Liste des Clients ---")
-        if not self.clients:
+        clients = self.service.lister_clients()
+        if not clients:
             print("Aucun client enregistré.")
             return
-        for c in self.clients:
+        for c in clients:
             print(c.afficher_details())
             print("-" * 20)
 
     def supprimer_client(self):
         id_cli = input("ID du client à supprimer : ")
-        for cmd in self.commandes:
-            if cmd.id_client == id_cli and cmd.statut != "Annulée":
-                print(f"Erreur: Client {id_cli} a des commandes actives (ex: {cmd.numero_commande}). Suppression annulée.")
-                return
-
-        client_index = -1
-        for i, c in enumerate(self.clients):
-            if c.id_client == id_cli:
-                client_index = i
-                break
-        
-        if client_index != -1:
-            del self.clients[client_index]
+        try:
+            self.service.supprimer_client(id_cli)
             print(f"Client {id_cli} supprimé.")
-        else:
-            print("Client non trouvé.")
+        except ErreurGestion as e:
+            print(f"Erreur: {e} Suppression annulée.")
             
     # --- Gestion des Commandes ---
     def creer_commande(self):
         print("\n--- Créer une Commande ---")
         id_client = input("ID du client pour la commande : ")
-        client_existe = any(c.id_client == id_client for c in self.clients)
-        if not client_existe:
+        try:
+            commande = self.service.creer_commande(id_client)
+        except ErreurGestion:
             print("Client non trouvé. Veuillez d'abord ajouter le client.")
             return
-
-        num_commande = "CMD-" + datetime.datetime.now().strftime("%Y%m%d") + "-" + str(uuid.uuid4())[:4].upper()
-        date_creation = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        nouvelle_commande = Commande(num_commande, date_creation, id_client)
-        self.commandes.append(nouvelle_commande)
-        print(f"Commande {num_commande} créée. Ajoutez des produits.")
+        print(f"Commande {commande.numero_commande} créée. Ajoutez des produits.")
 
     def ajouter_produit_commande(self):
         num_cmd = input("Numéro de la commande (doit être 'En Cours') : ")
-        commande = next((cmd for cmd in self.commandes if cmd.numero_commande == num_cmd and cmd.statut == "En Cours"), None)
-        if not commande:
+        commande = self.service.depot.get_commande(num_cmd)
+        if not commande or commande.statut != "En Cours":
             print("Commande non trouvée ou n'est pas 'En Cours'.")
             return
 
         ref_prod = input("Référence du produit à ajouter : ")
-        produit = next((p for p in self.produits if p.reference == ref_prod), None)
+        produit = self.service.depot.get_produit(ref_prod)
         if not produit:
             print("Produit non trouvé.")
             return
@@ -198,126 +244,80 @@ class GestionCommercialeApp:
         quantite = 0
         while quantite <= 0:
             try:
-                quantite_str = input(f"Quantité pour {produit.nom} (Stock: {produit.stock}) : ")
+                quantite_str = input(f"Quantité pour {produit.nom} (Disponible: {produit.disponible()}) : ")
                 quantite = int(quantite_str)
                 if quantite <= 0: print("La quantité doit être positive.")
             except ValueError:
                 print("Veuillez entrer un nombre entier.")
                 quantite = 0
         
-        if produit.stock < quantite:
+        try:
+            self.service.ajouter_ligne(num_cmd, ref_prod, quantite)
+        except StockInsuffisant:
             print("Stock insuffisant.")
             return
-
-        if commande.ajouter_produit(ref_prod, quantite, produit.prix_unitaire):
-            print(f"{quantite} x {produit.nom} ajouté(s) à la commande {num_cmd}.")
-        else:
-            print(f"Échec de l'ajout du produit à la commande {num_cmd}.")
+        except ErreurGestion as e:
+            print(f"Échec de l'ajout du produit à la commande {num_cmd} : {e}")
+            return
+        print(f"{quantite} x {produit.nom} ajouté(s) à la commande {num_cmd}.")
 
     def afficher_commandes(self):
         print("\n--- Liste des Commandes ---")
-        if not self.commandes:
+        if not self.service.depot.resumes:
             print("Aucune commande enregistrée.")
             return
-        for cmd in self.commandes:
-            # Passer les listes de clients et produits actuelles pour l'affichage
-            print(cmd.afficher_commande(self.clients, self.produits))
-            print("-" * 20)
+        statut = input("Statut (En Cours, Validée, Annulée) [Entrée pour toutes] : ") or None
+        id_client = input("ID du client [Entrée pour tous] : ") or None
+        date_debut = input("Du (AAAA-MM-JJ) [Entrée pour ignorer] : ") or None
+        date_fin = input("Au (AAAA-MM-JJ) [Entrée pour ignorer] : ") or None
+
+        def parcourir():
+            return self.service.iter_resumes_commandes(id_client, statut, date_debut, date_fin)
+
+        try:
+            premiere = next(parcourir(), None)
+        except ErreurGestion as e:  # Date mal saisie
+            print(f"Erreur: {e}")
+            return
+        if premiere is None:
+            print("Aucune commande ne correspond.")
+            return
+        # Seules les commandes de la page affichée sont chargées et mises en forme
+        self._afficher_pages(parcourir, lambda resume: self.service.texte_commande(resume.numero_commande), "-" * 20)
 
     def valider_commande(self):
         num_cmd = input("Numéro de la commande à valider : ")
-        commande = next((cmd for cmd in self.commandes if cmd.numero_commande == num_cmd), None)
-        if not commande:
-            print("Commande non trouvée.")
-            return
-        if commande.statut != "En Cours":
-            print(f"La commande est déjà '{commande.statut}'.")
+        try:
+            self.service.valider(num_cmd)
+        except StatutInvalide as e:
+            print(e)
             return
-        if not commande.produits_commandes:
-            print("Impossible de valider une commande vide.")
+        except ErreurGestion as e:
+            print(f"Erreur: {e}")
+            if isinstance(e, StockInsuffisant):
+                print(f"Validation de la commande {num_cmd} annulée en raison de problèmes de stock ou de produit.")
             return
-
-        stocks_ok = True
-        produits_affectes_stock = [] # Garder une trace pour rollback si un item échoue
-
-        for item_cmd in commande.produits_commandes:
-            produit = next((p for p in self.produits if p.reference == item_cmd['ref_produit']), None)
-            if not produit:
-                print(f"Erreur: Produit {item_cmd['ref_produit']} de la commande n'existe plus.")
-                stocks_ok = False
-                break # Sortir de la boucle des items
-            
-            # Vérifier le stock avant de tenter la mise à jour
-            if produit.stock < item_cmd['quantite']:
-                print(f"Stock insuffisant pour {produit.nom} (demandé: {item_cmd['quantite']}, dispo: {produit.stock}).")
-                stocks_ok = False
-                break # Sortir de la boucle des items
-            
-            # Ajouter à la liste des produits dont le stock sera mis à jour
-            produits_affectes_stock.append({'objet_produit': produit, 'quantite_retiree': item_cmd['quantite']})
-
-        if stocks_ok:
-            # Si tous les stocks sont OK, alors on procède aux mises à jour
-            for maj_stock_info in produits_affectes_stock:
-                try:
-                    maj_stock_info['objet_produit'].mettre_a_jour_stock(-maj_stock_info['quantite_retiree'])
-                except ValueError as e: # Au cas où la mise à jour du stock elle-même échoue (ne devrait pas si vérif avant)
-                    print(f"Erreur interne lors de la mise à jour du stock pour {maj_stock_info['objet_produit'].nom}: {e}")
-                    # Ici, il faudrait une logique de rollback pour les produits déjà mis à jour,
-                    # ce qui est complexe pour une version junior. On s'arrête et on signale.
-                    print("Arrêt de la validation. Certains stocks pourraient être incohérents.")
-                    return # Quitter la fonction de validation
-
-            commande.statut = "Validée"
-            print(f"Commande {num_cmd} validée. Stocks mis à jour.")
-        else:
-            print(f"Validation de la commande {num_cmd} annulée en raison de problèmes de stock ou de produit.")
+        print(f"Commande {num_cmd} validée. Stocks mis à jour.")
 
 
     def annuler_commande(self):
         num_cmd = input("Numéro de la commande à annuler : ")
-        commande = next((cmd for cmd in self.commandes if cmd.numero_commande == num_cmd), None)
-        if not commande:
-            print("Commande non trouvée.")
+        try:
+            statut_precedent = self.service.annuler(num_cmd)
+        except ErreurGestion as e:
+            print(f"Erreur: {e} Annulation abandonnée.")
             return
-        
-        statut_precedent = commande.statut
-        commande.statut = "Annulée"
 
         if statut_precedent == "Validée":
-            for item_cmd in commande.produits_commandes:
-                produit = next((p for p in self.produits if p.reference == item_cmd['ref_produit']), None)
-                if produit:
-                    try:
-                        produit.mettre_a_jour_stock(item_cmd['quantite']) # Rajouter au stock
-                    except ValueError as e: # Si la restauration du stock échoue (ne devrait pas arriver)
-                         print(f"Avertissement: Erreur lors de la restauration du stock pour {produit.nom}: {e}")
             print(f"Commande {num_cmd} annulée. Stocks restaurés.")
         else:
             print(f"Commande {num_cmd} annulée.")
             
     def generer_recu_commande(self):
         num_cmd = input("Numéro de la commande pour le reçu : ")
-        commande = next((cmd for cmd in self.commandes if cmd.numero_commande == num_cmd), None)
-        if not commande:
-            print("Commande non trouvée.")
+        try:
+            chemin = self.service.generer_recu(num_cmd)
+        except ErreurGestion as e:
+            print(f"Erreur: {e}")
             return
-
-        client = next((c for c in self.clients if c.id_client == commande.id_client), None)
-        client_nom = f"{client.prenom} {client.nom}" if client else "Client Inconnu"
-        
-        contenu_recu = f"--- REÇU COMMANDE ---\n"
-        contenu_recu += f"Numéro: {commande.numero_commande}\n"
-        contenu_recu += f"Date: {commande.date_creation}\n"
-        contenu_recu += f"Client: {client_nom} (ID: {commande.id_client})\n"
-        contenu_recu += f"Statut: {commande.statut}\n"
-        contenu_recu += "Produits:\n"
-        for item in commande.produits_commandes:
-            produit = next((p for p in self.produits if p.reference == item['ref_produit']), None)
-            nom_produit = produit.nom if produit else "Produit Inconnu"
-            contenu_recu += f"  - {nom_produit} x {item['quantite']} @ {item['prix_vente']:.2f} MAD\n"
-        contenu_recu += f"TOTAL: {commande.total:.2f} MAD\n"
-        contenu_recu += "-----------------------\n"
-        
-        nom_fichier = f"recu_{commande.numero_commande.replace('-', '_')}.txt"
-        data_manager.sauvegarder_recu_txt(nom_fichier, contenu_recu)
\ No newline at end of file
+        print(f"Reçu sauvegardé : {chemin}")
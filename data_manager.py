@@ -1,23 +1,108 @@
 # data_manager.py
+import contextlib
+import datetime
+import gc
+import gzip
+import io
+import itertools
 import json
 import os
+import re
+import zlib
+
+import instantane
+import instrumentation
+
+try:
+    import orjson  # Facultatif : lecture et écriture plus rapides du JSON compact
+except ImportError:
+    orjson = None
 
 # --- Configuration des chemins (peut être importé depuis un fichier config si besoin) ---
 DATA_DIR = "data"
 PRODUITS_FILE = os.path.join(DATA_DIR, "produits.json")
 CLIENTS_FILE = os.path.join(DATA_DIR, "clients.json")
+# Ancien fichier unique des commandes (et son index) : réparti en partitions mensuelles au premier chargement
 COMMANDES_FILE = os.path.join(DATA_DIR, "commandes.json")
+COMMANDES_INDEX_FILE = os.path.join(DATA_DIR, "commandes_index.json")
+# Commandes partitionnées par mois de création : commandes/AAAA-MM.json (ou .bin), chacune
+# avec son index AAAA-MM.index.json (résumés + détail des commandes "En Cours") lu au démarrage
+COMMANDES_DIR = os.path.join(DATA_DIR, "commandes")
 RECUS_DIR = os.path.join(DATA_DIR, "recus")
+JOURNAL_FILE = os.path.join(DATA_DIR, "journal.log")
+# Nombre d'entrées du journal au-delà duquel on réécrit les fichiers de données
+JOURNAL_SEUIL_COMPACTION = 500
+# Intervalle (secondes) de la sauvegarde en arrière-plan du menu et du serveur (0 : désactivée)
+INTERVALLE_SAUVEGARDE_AUTO = float(os.environ.get("GESTION_SAUVEGARDE_AUTO", "60"))
+
+# --- Choix du support de stockage : "json" (fichiers + journal) ou "sqlite" ---
+BACKEND_STOCKAGE = os.environ.get("GESTION_STOCKAGE", "json")
+SQLITE_FILE = os.path.join(DATA_DIR, "gestion.db")
+
+# --- Format des fichiers de données du support "json" ---
+# "json" : indenté, lisible et modifiable à la main ; "json-compact" : un enregistrement
+# compact par ligne ; "binaire" : fichiers .bin (voir instantane.py), les plus rapides
+# à écrire et à relire. Les fichiers d'un autre format sont convertis à la sauvegarde suivante.
+FORMATS_INSTANTANE = ("json", "json-compact", "binaire")
+FORMAT_INSTANTANE = os.environ.get("GESTION_FORMAT", "json")
+
+# --- Sûreté des fichiers de données ---
+# Chaque fichier de données est accompagné d'une somme de contrôle (<fichier>.crc : CRC-32
+# et taille) ; les versions précédentes sont gardées sous <fichier>.1, <fichier>.2...
+# Au chargement, un fichier illisible ou dont la somme ne correspond pas est remplacé
+# par la génération intacte la plus récente.
+GENERATIONS_CONSERVEES = int(os.environ.get("GESTION_GENERATIONS", "2"))
+SUFFIXE_SOMME = ".crc"
+
+# --- Archivage des commandes ---
+# Les partitions des MOIS_NON_ARCHIVES derniers mois (mois en cours compris) restent non
+# compressées ; les plus anciennes sont réécrites compressées (AAAA-MM.json.gz) à la
+# sauvegarde suivante. 0 : aucune partition compressée.
+MOIS_NON_ARCHIVES = int(os.environ.get("GESTION_MOIS_ACTIFS", "2"))
+NIVEAU_COMPRESSION = 6
+# Archive tronquée ou abîmée (gzip.BadGzipFile n'existe qu'à partir de Python 3.8 ; OSError avant)
+_ERREURS_ARCHIVE = (EOFError, getattr(gzip, "BadGzipFile", OSError), zlib.error)
+_MOTIF_PARTITION = re.compile(r"(\d{4}-\d{2})\.(?:json|bin)(?:\.gz)?(?:\.\d+)?")
+
+def utiliser_dossier(dossier):
+    """Place tous les fichiers de données dans dossier au lieu de data/ (processus d'un déploiement réparti)."""
+    global DATA_DIR, PRODUITS_FILE, CLIENTS_FILE, COMMANDES_FILE, COMMANDES_INDEX_FILE, COMMANDES_DIR
+    global RECUS_DIR, JOURNAL_FILE, SQLITE_FILE
+    DATA_DIR = dossier
+    PRODUITS_FILE = os.path.join(dossier, "produits.json")
+    CLIENTS_FILE = os.path.join(dossier, "clients.json")
+    COMMANDES_FILE = os.path.join(dossier, "commandes.json")
+    COMMANDES_INDEX_FILE = os.path.join(dossier, "commandes_index.json")
+    COMMANDES_DIR = os.path.join(dossier, "commandes")
+    RECUS_DIR = os.path.join(dossier, "recus")
+    JOURNAL_FILE = os.path.join(dossier, "journal.log")
+    SQLITE_FILE = os.path.join(dossier, "gestion.db")
+
+@contextlib.contextmanager
+def chargement_massif():
+    """Suspend le ramasse-miettes pendant la création de nombreux objets sans cycles (chargement au démarrage)."""
+    actif = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if actif:
+            gc.enable()
 
 def initialiser_dossiers():
     """S'assure que les dossiers de données existent."""
     os.makedirs(DATA_DIR, exist_ok=True)
     os.makedirs(RECUS_DIR, exist_ok=True)
+    os.makedirs(COMMANDES_DIR, exist_ok=True)
 
+@instrumentation.mesure("donnees.charger_json")
 def charger_donnees_json(fichier_path):
     """Charge les données depuis un fichier JSON."""
     initialiser_dossiers() # S'assurer que le dossier data existe avant de lire
     try:
+        if orjson is not None:
+            with open(fichier_path, 'rb') as f:
+                return orjson.loads(f.read())
         with open(fichier_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     except FileNotFoundError:
@@ -26,21 +111,499 @@ def charger_donnees_json(fichier_path):
         print(f"Erreur: Le fichier {fichier_path} est corrompu. Retourne une liste vide.")
         return []
 
-def sauvegarder_donnees_json(fichier_path, donnees):
-    """Sauvegarde les données dans un fichier JSON."""
-    initialiser_dossiers() # S'assurer que le dossier data existe avant d'écrire
+@instrumentation.mesure("donnees.sauvegarder_json")
+def sauvegarder_donnees_json(fichier_path, donnees, compact=False, controle=False):
+    """Sauvegarde les données dans un fichier JSON (compact=True : sans indentation ni espaces).
+
+    Le fichier est écrit à côté puis renommé : une interruption laisse l'ancien fichier intact.
+    controle=True : fichier de données, avec somme de contrôle et générations précédentes.
+    Retourne le chemin du fichier, ou None en cas d'erreur.
+    """
+    def ecrire(f):
+        if compact and orjson is not None:
+            f.write(orjson.dumps(donnees))
+        elif compact:
+            f.write(json.dumps(donnees, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+        else:
+            f.write(json.dumps(donnees, indent=4, ensure_ascii=False).encode('utf-8'))
+        return fichier_path
+    return _ecrire_par_remplacement(fichier_path, ecrire, controle)
+
+def iter_donnees_json(fichier_path, taille_bloc=1 << 16):
+    """Lit une liste JSON enregistrement par enregistrement, sans charger tout le fichier."""
+    decodeur = json.JSONDecoder()
+    try:
+        if est_compresse(fichier_path):
+            f = gzip.open(fichier_path, 'rt', encoding='utf-8')
+        else:
+            f = open(fichier_path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return
+    with f:
+        tampon, pos, fin_fichier = "", 0, False
+        debut_liste = True
+        while True:
+            # Sauter les blancs et les séparateurs entre enregistrements
+            while pos < len(tampon) and tampon[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(tampon) and debut_liste:
+                if tampon[pos] != "[":
+                    print(f"Erreur: Le fichier {fichier_path} ne contient pas une liste JSON.")
+                    return
+                pos += 1
+                debut_liste = False
+                continue
+            if pos < len(tampon) and tampon[pos] == "]":
+                return
+            try:
+                if pos >= len(tampon):
+                    raise json.JSONDecodeError("Fin du tampon", tampon, pos)
+                enregistrement, pos = decodeur.raw_decode(tampon, pos)
+            except json.JSONDecodeError:
+                if fin_fichier:
+                    if tampon[pos:].strip():
+                        print(f"Erreur: Le fichier {fichier_path} est corrompu. Lecture interrompue.")
+                    return
+                # Enregistrement incomplet : on complète le tampon avec le bloc suivant
+                try:
+                    bloc = f.read(taille_bloc)
+                except _ERREURS_ARCHIVE:
+                    print(f"Erreur: Le fichier {fichier_path} est corrompu. Lecture interrompue.")
+                    return
+                fin_fichier = not bloc
+                tampon, pos = tampon[pos:] + bloc, 0
+                continue
+            yield enregistrement
+
+def _encoder_compact(enregistrement):
+    if orjson is not None:
+        return orjson.dumps(enregistrement)
+    return json.dumps(enregistrement, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def _generation(fichier_path, numero):
+    return f"{fichier_path}.{numero}" if numero else fichier_path
+
+def generations(fichier_path):
+    """Le fichier puis ses générations précédentes, de la plus récente à la plus ancienne."""
+    return [_generation(fichier_path, n) for n in range(GENERATIONS_CONSERVEES + 1)]
+
+def _synchroniser_dossier(fichier_path):
+    """Force l'écriture sur disque des renommages faits dans le dossier du fichier (sans effet sous Windows)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    descripteur = os.open(os.path.dirname(fichier_path) or ".", os.O_RDONLY | os.O_DIRECTORY)
     try:
-        with open(fichier_path, 'w', encoding='utf-8') as f:
-            json.dump(donnees, f, indent=4, ensure_ascii=False)
+        os.fsync(descripteur)
+    finally:
+        os.close(descripteur)
+
+def _conserver_generations(fichier_path):
+    """Décale les générations (.1 -> .2...) et garde le fichier actuel et sa somme comme génération 1."""
+    if GENERATIONS_CONSERVEES <= 0 or not os.path.exists(fichier_path):
+        return
+    for numero in range(GENERATIONS_CONSERVEES, 0, -1):
+        for suffixe in ("", SUFFIXE_SOMME):
+            source = _generation(fichier_path, numero - 1) + suffixe
+            cible = _generation(fichier_path, numero) + suffixe
+            if not os.path.exists(source):
+                # Pas de fichier (ou de somme) à décaler : l'ancien ne doit pas rester associé à l'autre
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(cible)
+                continue
+            if numero == 1:
+                # Lien plutôt que renommage : le fichier actuel reste en place jusqu'à son remplacement
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(cible)
+                try:
+                    os.link(source, cible)
+                    continue
+                except OSError:  # Système de fichiers sans liens
+                    pass
+            os.replace(source, cible)
+
+def _somme(f):
+    """(taille, CRC-32) du contenu du fichier f, ouvert en binaire."""
+    f.seek(0)
+    taille, crc = 0, 0
+    for bloc in iter(lambda: f.read(1 << 20), b""):
+        crc = zlib.crc32(bloc, crc)
+        taille += len(bloc)
+    return taille, crc
+
+def _ecrire_somme(fichier_path, taille, crc):
+    chemin_temporaire = fichier_path + SUFFIXE_SOMME + ".tmp"
+    with open(chemin_temporaire, 'w', encoding='ascii') as f:
+        f.write(f"{crc:08x} {taille}\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(chemin_temporaire, fichier_path + SUFFIXE_SOMME)
+
+def lire_somme(fichier_path):
+    """(taille, CRC-32) enregistrés pour le fichier, ou None sans somme de contrôle lisible."""
+    try:
+        with open(fichier_path + SUFFIXE_SOMME, 'r', encoding='ascii') as f:
+            crc, taille = f.read().split()
+        return int(taille), int(crc, 16)
+    except (OSError, ValueError):
+        return None
+
+def _ecrire_par_remplacement(fichier_path, ecrire, controle=False):
+    """Appelle ecrire(f) sur un fichier binaire écrit à côté puis renommé. Retourne son résultat (None en cas d'erreur).
+
+    Le contenu est forcé sur disque (fsync) avant le renommage. controle=True : les générations
+    précédentes sont conservées et la somme de contrôle du nouveau fichier est écrite.
+    """
+    initialiser_dossiers()
+    chemin_temporaire = fichier_path + ".tmp"
+    try:
+        with open(chemin_temporaire, 'w+b') as f:
+            resultat = ecrire(f)
+            f.flush()
+            os.fsync(f.fileno())
+            if controle:
+                # Relu par grands blocs (depuis le cache du système) : moins coûteux qu'un calcul à chaque écriture
+                taille, crc = _somme(f)
+        if controle:
+            _conserver_generations(fichier_path)
+        os.replace(chemin_temporaire, fichier_path)
+        if controle:
+            _ecrire_somme(fichier_path, taille, crc)
+        _synchroniser_dossier(fichier_path)
     except IOError:
         print(f"Erreur: Impossible d'écrire dans le fichier {fichier_path}.")
+        return None
+    return resultat
+
+@instrumentation.mesure("donnees.sauvegarder_json_flux")
+def sauvegarder_donnees_json_flux(fichier_path, enregistrements, controle=False):
+    """Ecrit une liste JSON à partir d'un itérable, un enregistrement compact par ligne.
+
+    Le fichier est d'abord écrit à côté puis renommé : l'itérable peut donc lire l'ancien fichier.
+    Retourne la position (en octets) de chaque enregistrement dans le fichier.
+    """
+    return _ecrire_par_remplacement(fichier_path, lambda f: _ecrire_liste_flux(f, enregistrements), controle)
+
+def _ecrire_liste_flux(f, enregistrements):
+    positions = []
+    f.write(b"[\n")
+    separateur = b""
+    for enregistrement in enregistrements:
+        f.write(separateur)
+        positions.append(f.tell())
+        f.write(_encoder_compact(enregistrement))
+        separateur = b",\n"
+    f.write(b"\n]\n")
+    return positions
+
+def _compresser(ecrire):
+    """Fonction d'écriture passée à _ecrire_par_remplacement, compressée en gzip.
+
+    Les positions retournées (f.tell()) sont celles du contenu décompressé.
+    """
+    def ecrire_compresse(f):
+        with gzip.GzipFile(filename="", fileobj=f, mode='wb', compresslevel=NIVEAU_COMPRESSION, mtime=0) as archive:
+            return ecrire(archive)
+    return ecrire_compresse
+
+@instrumentation.mesure("donnees.lire_enregistrement")
+def lire_enregistrement_json(f, position):
+    """Relit l'enregistrement écrit par sauvegarder_donnees_json_flux à la position donnée (f ouvert en binaire)."""
+    f.seek(position)
+    ligne = f.readline().rstrip(b",\r\n")
+    return orjson.loads(ligne) if orjson is not None else json.loads(ligne)
+
+# --- Fichiers des collections, au format FORMAT_INSTANTANE ---
+def chemin_collection(type_entite, format_instantane=None):
+    """Fichier de la collection ("produit", "client" ou "commande") dans le format donné (par défaut celui configuré)."""
+    chemin = {"produit": PRODUITS_FILE, "client": CLIENTS_FILE, "commande": COMMANDES_FILE}[type_entite]
+    if (format_instantane or FORMAT_INSTANTANE) == "binaire":
+        return os.path.splitext(chemin)[0] + ".bin"
+    return chemin
+
+def _sans_generation(fichier_path):
+    nom, extension = os.path.splitext(fichier_path)
+    return nom if extension[1:].isdigit() else fichier_path
+
+def est_compresse(fichier_path):
+    """Vrai pour une partition archivée (.gz) ou l'une de ses générations (.gz.1...)."""
+    return _sans_generation(fichier_path).endswith(".gz")
+
+def est_binaire(fichier_path):
+    """Vrai pour un fichier .bin (ou .bin.gz) ou l'une de ses générations (.bin.1...)."""
+    chemin = _sans_generation(fichier_path)
+    if chemin.endswith(".gz"):
+        chemin = chemin[:-3]
+    return chemin.endswith(".bin")
+
+def trouver_fichier(type_entite):
+    """Fichier de la collection au format configuré, ou à défaut celui d'un autre format (pas encore converti)."""
+    for format_instantane in (FORMAT_INSTANTANE, "json", "binaire"):
+        chemin = chemin_collection(type_entite, format_instantane)
+        # Un fichier absent mais dont une génération existe : interruption entre deux renommages
+        if any(os.path.exists(g) for g in generations(chemin)):
+            return chemin
+    return chemin_collection(type_entite)
+
+def _supprimer_avec_generations(fichier_path):
+    for fichier in generations(fichier_path):
+        for suffixe in ("", SUFFIXE_SOMME):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(fichier + suffixe)
+
+def _supprimer_autres_formats(type_entite):
+    chemin = chemin_collection(type_entite)
+    for format_instantane in ("json", "binaire"):
+        autre = chemin_collection(type_entite, format_instantane)
+        if autre != chemin:
+            _supprimer_avec_generations(autre)
+
+def somme_intacte(fichier_path, contenu=None):
+    """Compare le fichier (ou son contenu déjà lu) à sa somme de contrôle.
+
+    Retourne True si elle correspond, False sinon, None si le fichier n'a pas de somme.
+    """
+    somme = lire_somme(fichier_path)
+    if somme is None:
+        return None
+    if contenu is not None:
+        return somme == (len(contenu), zlib.crc32(contenu))
+    with open(fichier_path, 'rb') as f:
+        return somme == _somme(f)
+
+def _signaler_reprise(fichier_path, generation):
+    print(f"Erreur: Le fichier {fichier_path} est absent ou corrompu : reprise de la version précédente "
+          f"{generation} (les modifications sauvegardées depuis peuvent manquer).")
+
+def _lire_collection_controlee(fichier_path, type_entite):
+    """Liste de dicts lue dans le fichier, ou None s'il est illisible ou corrompu."""
+    with open(fichier_path, 'rb') as f:
+        contenu = f.read()
+    intacte = somme_intacte(fichier_path, contenu)
+    if est_binaire(fichier_path):
+        if intacte is False:
+            return None
+        try:
+            return instantane.lire_collection(io.BytesIO(contenu), type_entite)
+        except instantane.FormatInvalide:
+            return None
+    try:
+        donnees = orjson.loads(contenu) if orjson is not None else json.loads(contenu)
+    except ValueError:  # JSONDecodeError, orjson.JSONDecodeError, UnicodeDecodeError
+        return None
+    if not isinstance(donnees, list):
+        return None
+    if intacte is False:
+        # JSON valide mais différent de ce que l'application a écrit : modifié à la main
+        print(f"Avertissement: Le fichier {fichier_path} a été modifié en dehors de l'application.")
+    return donnees
+
+@instrumentation.mesure("donnees.charger_collection")
+def charger_collection(type_entite):
+    """Charge les produits ou les clients (JSON ou binaire). Retourne (liste de dicts, fichier lu).
+
+    Si le fichier est illisible ou corrompu, la génération intacte la plus récente est lue.
+    """
+    initialiser_dossiers()
+    chemin = trouver_fichier(type_entite)
+    for fichier in generations(chemin):
+        try:
+            donnees = _lire_collection_controlee(fichier, type_entite)
+        except FileNotFoundError:
+            continue
+        if donnees is not None:
+            if fichier != chemin:
+                _signaler_reprise(chemin, fichier)
+            return donnees, fichier
+    if os.path.exists(chemin):
+        # Mis de côté pour réparation : la sauvegarde suivante ne doit pas l'écraser
+        os.replace(chemin, chemin + ".corrompu")
+        print(f"Erreur: Le fichier {chemin} est corrompu, sans version précédente lisible : "
+              f"il est renommé en {chemin}.corrompu. Retourne une liste vide.")
+    return [], chemin
+
+def _liste_json_complete(fichier_path):
+    with open(fichier_path, 'rb') as f:
+        f.seek(max(os.path.getsize(fichier_path) - 64, 0))
+        return f.read().rstrip().endswith(b"]")
+
+def fichier_intact(fichier_path):
+    """Le fichier ou, s'il est absent ou corrompu, sa génération intacte la plus récente (pour une relecture complète)."""
+    for fichier in generations(fichier_path):
+        if not os.path.exists(fichier):
+            continue
+        # Un JSON modifié à la main reste lisible s'il est complet (liste terminée)
+        if somme_intacte(fichier) is not False or (not est_binaire(fichier) and not est_compresse(fichier)
+                                                   and _liste_json_complete(fichier)):
+            if fichier != fichier_path:
+                _signaler_reprise(fichier_path, fichier)
+            return fichier
+    return fichier_path
+
+@instrumentation.mesure("donnees.sauvegarder_collection")
+def sauvegarder_collection(type_entite, enregistrements):
+    """Ecrit les produits ou les clients (liste de dicts) au format configuré. Retourne le fichier écrit (None en cas d'erreur)."""
+    chemin = chemin_collection(type_entite)
+    if FORMAT_INSTANTANE == "binaire":
+        ecrit = _ecrire_par_remplacement(chemin, lambda f: instantane.ecrire_collection(f, type_entite, enregistrements),
+                                         controle=True)
+    elif FORMAT_INSTANTANE == "json-compact":
+        ecrit = sauvegarder_donnees_json_flux(chemin, enregistrements, controle=True)
+    else:
+        ecrit = sauvegarder_donnees_json(chemin, enregistrements, controle=True)
+    if ecrit is None:
+        return None
+    _supprimer_autres_formats(type_entite)
+    return chemin
+
+# --- Commandes, partitionnées par mois de création ---
+def mois_de(date_creation):
+    """Partition (AAAA-MM) d'une commande, d'après sa date de création."""
+    return date_creation[:7]
+
+def mois_dans_periode(mois, date_debut=None, date_fin=None):
+    """Vrai si le mois peut contenir des commandes de la période (dates "AAAA-MM-JJ" incluses)."""
+    return (date_debut is None or mois >= date_debut[:7]) and (date_fin is None or mois <= date_fin[:7])
+
+def est_archive(mois):
+    """Vrai si la partition du mois est plus ancienne que les MOIS_NON_ARCHIVES derniers mois."""
+    if MOIS_NON_ARCHIVES <= 0:
+        return False
+    aujourd_hui = datetime.date.today()
+    annee, numero = int(mois[:4]), int(mois[5:7])
+    return (aujourd_hui.year - annee) * 12 + aujourd_hui.month - numero >= MOIS_NON_ARCHIVES
+
+def chemin_partition(mois, format_instantane=None, archive=None):
+    """Fichier des commandes du mois dans le format donné, compressé si archive (par défaut selon son âge)."""
+    extension = ".bin" if (format_instantane or FORMAT_INSTANTANE) == "binaire" else ".json"
+    if archive is None:
+        archive = est_archive(mois)
+    return os.path.join(COMMANDES_DIR, mois + extension + (".gz" if archive else ""))
+
+def chemin_index_partition(mois):
+    return os.path.join(COMMANDES_DIR, f"{mois}.index.json")
+
+def _variantes_partition(mois):
+    attendu = chemin_partition(mois)
+    variantes = [chemin_partition(mois, format_instantane, archive)
+                 for format_instantane in ("json", "binaire") for archive in (False, True)]
+    return [attendu] + [chemin for chemin in variantes if chemin != attendu]
+
+def partitions():
+    """Mois (AAAA-MM) ayant un fichier de commandes, du plus ancien au plus récent."""
+    try:
+        noms = os.listdir(COMMANDES_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted({trouve.group(1) for trouve in map(_MOTIF_PARTITION.fullmatch, noms) if trouve})
+
+def trouver_partition(mois):
+    """Fichier du mois au format et à la compression attendus, ou à défaut celui d'une autre variante (pas encore réécrit)."""
+    for chemin in _variantes_partition(mois):
+        if any(os.path.exists(g) for g in generations(chemin)):
+            return chemin
+    return chemin_partition(mois)
+
+@instrumentation.mesure("donnees.sauvegarder_partition")
+def sauvegarder_partition(mois, commandes):
+    """Ecrit en flux les commandes (itérable de dicts) du mois, au format configuré.
+
+    Retourne le fichier écrit et la position de chaque commande (dans le contenu décompressé
+    pour une partition archivée), ou (fichier, None) en cas d'erreur.
+    """
+    chemin = chemin_partition(mois)
+    if est_binaire(chemin):
+        ecrire = lambda f: instantane.ecrire_commandes(f, commandes)
+    else:
+        ecrire = lambda f: _ecrire_liste_flux(f, commandes)
+    if est_compresse(chemin):
+        ecrire = _compresser(ecrire)
+    positions = _ecrire_par_remplacement(chemin, ecrire, controle=True)
+    if positions is not None:
+        # Après l'écriture : l'itérable a pu lire l'ancienne variante
+        for autre in _variantes_partition(mois)[1:]:
+            _supprimer_avec_generations(autre)
+    return chemin, positions
+
+def supprimer_partition(mois):
+    """Supprime le fichier du mois (toutes variantes et générations) et son index."""
+    for chemin in _variantes_partition(mois):
+        _supprimer_avec_generations(chemin)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(chemin_index_partition(mois))
+
+@instrumentation.mesure("donnees.sauvegarder_commandes")
+def sauvegarder_commandes(commandes):
+    """Ecrit en flux les commandes (itérable de dicts, dans l'ordre chronologique) dans les partitions de leur mois.
+
+    Retourne {mois: (fichier, positions)} (positions None en cas d'erreur).
+    """
+    ecrits = {}
+    for mois, groupe in itertools.groupby(commandes, key=lambda cmd: mois_de(cmd['date_creation'])):
+        if mois in ecrits:
+            raise ValueError(f"Commandes non triées par date : le mois {mois} a déjà été écrit.")
+        ecrits[mois] = sauvegarder_partition(mois, groupe)
+    return ecrits
+
+def supprimer_fichier_unique_commandes():
+    """Supprime l'ancien fichier unique des commandes (tous formats et générations) et son index."""
+    for format_instantane in ("json", "binaire"):
+        _supprimer_avec_generations(chemin_collection("commande", format_instantane))
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(COMMANDES_INDEX_FILE)
+
+def ouvrir_partition(fichier_path):
+    """Ouvre un fichier de commandes pour relire des commandes par position (voir lire_commande).
+
+    Une partition archivée est décompressée en mémoire.
+    """
+    if not est_compresse(fichier_path):
+        return open(fichier_path, 'rb')
+    with gzip.open(fichier_path, 'rb') as f:
+        lecteur = io.BytesIO(f.read())
+    lecteur.name = fichier_path
+    return lecteur
+
+def lire_commande(f, position):
+    """Relit la commande écrite par sauvegarder_partition à la position donnée (f ouvert par ouvrir_partition)."""
+    if est_binaire(f.name):
+        return instantane.lire_commande(f, position)
+    return lire_enregistrement_json(f, position)
+
+def iter_commandes(fichier_path):
+    """Lit en flux toutes les commandes d'un fichier JSON ou binaire (compressé ou non)."""
+    if not est_binaire(fichier_path):
+        yield from iter_donnees_json(fichier_path)
+        return
+    try:
+        with gzip.open(fichier_path, 'rb') if est_compresse(fichier_path) else open(fichier_path, 'rb') as f:
+            yield from instantane.iter_commandes(f)
+    except FileNotFoundError:
+        return
+    except (instantane.FormatInvalide,) + _ERREURS_ARCHIVE:
+        print(f"Erreur: Le fichier {fichier_path} est corrompu. Lecture interrompue.")
+
+def iter_commandes_partitions(date_debut=None, date_fin=None):
+    """Lit en flux les commandes des seules partitions de la période (par mois : les dates ne sont pas filtrées)."""
+    for mois in partitions():
+        if mois_dans_periode(mois, date_debut, date_fin):
+            yield from iter_commandes(fichier_intact(trouver_partition(mois)))
+
+def signature_fichier(fichier_path):
+    """Taille et date de modification d'un fichier (None s'il n'existe pas)."""
+    try:
+        infos = os.stat(fichier_path)
+    except FileNotFoundError:
+        return None
+    return [infos.st_size, infos.st_mtime_ns]
 
 def sauvegarder_recu_txt(nom_fichier, contenu):
+    """Ecrit un reçu dans RECUS_DIR. Retourne son chemin, ou None en cas d'erreur."""
     initialiser_dossiers()
     chemin_complet = os.path.join(RECUS_DIR, nom_fichier)
     try:
         with open(chemin_complet, 'w', encoding='utf-8') as f:
             f.write(contenu)
-        print(f"Reçu sauvegardé : {chemin_complet}")
     except IOError:
-        print(f"Erreur lors de la sauvegarde du fichier : {chemin_complet}")
\ No newline at end of file
+        print(f"Erreur lors de la sauvegarde du fichier : {chemin_complet}")
+        return None
+    return chemin_complet
\ No newline at end of file
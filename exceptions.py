@@ -0,0 +1,32 @@
+# exceptions.py
+# Erreurs métier levées par la couche de services (services.py).
+# Elles dérivent toutes de ErreurGestion, elle-même sous-classe de ValueError :
+# le code qui attrapait ValueError continue de fonctionner.
+
+
+class ErreurGestion(ValueError):
+    """Erreur métier : le message est destiné à l'utilisateur."""
+
+
+class EntiteIntrouvable(ErreurGestion):
+    """Produit, client ou commande inexistant."""
+
+
+class EntiteExistante(ErreurGestion):
+    """Référence, ID ou numéro déjà utilisé."""
+
+
+class DonneeInvalide(ErreurGestion):
+    """Saisie incorrecte (prix, quantité, champ obligatoire vide...)."""
+
+
+class StockInsuffisant(ErreurGestion):
+    """Le stock disponible ne couvre pas la quantité demandée."""
+
+
+class StatutInvalide(ErreurGestion):
+    """Opération impossible dans le statut actuel de la commande."""
+
+
+class EntiteUtilisee(ErreurGestion):
+    """Suppression refusée : l'entité est référencée par une commande active."""
@@ -0,0 +1,129 @@
+# generer_donnees.py
+# Génération de jeux de données réalistes (produits, clients, commandes) pour
+# les benchmarks et les essais à grande échelle.
+# Les commandes sont produites une à une et écrites en flux : seuls les produits
+# et les clients sont gardés en mémoire (les commandes en tirent leurs lignes).
+# Utilisation : python generer_donnees.py --dossier essai --produits 10000 --clients 50000 --commandes 1000000
+import argparse
+import datetime
+import os
+import random
+import shutil
+import time
+
+import data_manager
+import repartition
+
+# Noms de produits réalistes (avec accents) pour les recherches
+ARTICLES = ["Stylo", "Cahier", "Crayon", "Règle", "Gomme", "Classeur", "Agrafeuse", "Étiquette",
+            "Enveloppe", "Trousse", "Pochette", "Câble", "Écran", "Clé USB", "Bloc-notes", "Chemise",
+            "Surligneur", "Feutre", "Ramette", "Calculatrice", "Pile", "Souris", "Clavier", "Lampe"]
+QUALIFICATIFS = ["bleu", "rouge", "noir", "vert", "épais", "léger", "grand format", "petit format",
+                 "recyclé", "métallique", "à spirale", "réutilisable", "ergonomique", "premium",
+                 "économique", "pastel", "fluo", "A4", "A5", "sans fil"]
+NOMS = ["Alaoui", "Benali", "El Idrissi", "Tazi", "Berrada", "Chraibi", "Bennani", "Fassi",
+        "Amrani", "Lahlou", "Ouazzani", "Sqalli", "Kettani", "Naciri", "Benjelloun", "Zniber"]
+PRENOMS = ["Sara", "Youssef", "Fatima", "Omar", "Khadija", "Mehdi", "Salma", "Hamza",
+           "Imane", "Karim", "Nadia", "Rachid", "Leila", "Anas", "Hind", "Yassine"]
+VILLES = ["Casablanca", "Rabat", "Marrakech", "Fès", "Tanger", "Agadir", "Meknès", "Oujda"]
+
+PREMIER_JOUR = datetime.date(2025, 1, 1)
+
+
+def iter_produits(alea, nb_produits):
+    for i in range(nb_produits):
+        yield {"reference": f"PROD-{i:08X}",
+               "nom": f"{alea.choice(ARTICLES)} {alea.choice(QUALIFICATIFS)} {alea.choice(QUALIFICATIFS)} {i}",
+               "prix_unitaire": round(alea.uniform(1, 500), 2), "stock": alea.randint(0, 1000)}
+
+
+def iter_clients(alea, nb_clients):
+    for i in range(nb_clients):
+        nom, prenom = alea.choice(NOMS), alea.choice(PRENOMS)
+        yield {"id_client": f"CLI-{i:08X}", "nom": nom, "prenom": prenom,
+               "adresse": f"{alea.randint(1, 200)} rue {alea.choice(NOMS)}, {alea.choice(VILLES)}",
+               "telephone": f"06{alea.randint(0, 99999999):08d}",
+               "email": f"{prenom}.{nom}{i}@exemple.ma".lower().replace(" ", "")}
+
+
+def iter_commandes(alea, produits, clients, nb_commandes, part_en_cours=0.02, nb_jours=365):
+    """Produit les commandes une à une, réparties sur nb_jours à partir de PREMIER_JOUR.
+
+    Environ part_en_cours commandes "En Cours", 8 % d'annulées, les autres validées.
+    """
+    for i in range(nb_commandes):
+        lignes = []
+        for p in alea.sample(produits, min(len(produits), alea.randint(1, 5))):
+            lignes.append({"ref_produit": p['reference'], "quantite": alea.randint(1, 10),
+                           "prix_vente": p['prix_unitaire']})
+        tirage = alea.random()
+        statut = "En Cours" if tirage < part_en_cours else ("Annulée" if tirage < 0.1 else "Validée")
+        jour = PREMIER_JOUR + datetime.timedelta(days=i * nb_jours // max(nb_commandes, 1))
+        yield {"numero_commande": f"CMD-{jour:%Y%m%d}-{i:08X}", "date_creation": f"{jour} 10:00:00",
+               "id_client": alea.choice(clients)['id_client'], "produits_commandes": lignes,
+               "total": sum(l['prix_vente'] * l['quantite'] for l in lignes), "statut": statut}
+
+
+def generer_donnees(nb_produits, nb_clients, nb_commandes, part_en_cours=0.02, graine=42):
+    """Retourne des listes de dicts produits/clients/commandes réalistes (petits volumes)."""
+    alea = random.Random(graine)
+    produits = list(iter_produits(alea, nb_produits))
+    clients = list(iter_clients(alea, nb_clients))
+    commandes = list(iter_commandes(alea, produits, clients, nb_commandes, part_en_cours))
+    return produits, clients, commandes
+
+
+def generer_historique(nb_produits, nb_clients, nb_commandes, part_en_cours=0.02, graine=42):
+    """Ecrit des fichiers produits/clients/commandes réalistes dans data_manager.DATA_DIR (commandes en flux).
+
+    Les fichiers sont écrits au format data_manager.FORMAT_INSTANTANE.
+    """
+    alea = random.Random(graine)
+    produits = list(iter_produits(alea, nb_produits))
+    clients = list(iter_clients(alea, nb_clients))
+    data_manager.sauvegarder_collection("produit", produits)
+    data_manager.sauvegarder_collection("client", clients)
+    # Les partitions et index éventuellement présents décrivent d'anciennes commandes
+    shutil.rmtree(data_manager.COMMANDES_DIR, ignore_errors=True)
+    data_manager.supprimer_fichier_unique_commandes()
+    # Commandes produites dans l'ordre chronologique : une partition par mois, écrite en flux
+    data_manager.sauvegarder_commandes(iter_commandes(alea, produits, clients, nb_commandes, part_en_cours))
+
+
+def donnees_non_remplacables():
+    """Motifs interdisant de remplacer les données de data_manager.DATA_DIR (liste vide si aucun)."""
+    motifs = []
+    if os.path.exists(data_manager.JOURNAL_FILE) and os.path.getsize(data_manager.JOURNAL_FILE):
+        motifs.append(f"{data_manager.JOURNAL_FILE} contient des modifications non sauvegardées")
+    if os.path.exists(data_manager.JOURNAL_FILE + ".1"):
+        motifs.append(f"{data_manager.JOURNAL_FILE}.1 contient les modifications d'une sauvegarde interrompue")
+    if os.path.exists(data_manager.SQLITE_FILE):
+        motifs.append(f"{data_manager.SQLITE_FILE} contient les données du support SQLite")
+    if repartition.lire_configuration() is not None:
+        motifs.append(f"les données ont été réparties dans {repartition.dossier_repartition()}")
+    return motifs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère un jeu de données réaliste.")
+    parser.add_argument("--dossier", required=True,
+                        help="Dossier de sortie (data pour remplacer les données de l'application)")
+    parser.add_argument("--produits", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--commandes", type=int, default=100000)
+    parser.add_argument("--en-cours", type=float, default=0.02, help="Part des commandes laissées 'En Cours'")
+    parser.add_argument("--graine", type=int, default=42)
+    arguments = parser.parse_args(argv)
+    data_manager.utiliser_dossier(arguments.dossier)
+    motifs = donnees_non_remplacables()
+    if motifs:
+        parser.error(" ; ".join(motifs) + " : choisissez un autre --dossier.")
+    debut = time.perf_counter()
+    generer_historique(arguments.produits, arguments.clients, arguments.commandes,
+                       arguments.en_cours, arguments.graine)
+    print(f"{arguments.produits} produit(s), {arguments.clients} client(s) et {arguments.commandes} "
+          f"commande(s) générés dans {data_manager.DATA_DIR}/ en {time.perf_counter() - debut:.1f} s.")
+
+
+if __name__ == "__main__":
+    main()
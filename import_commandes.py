@@ -0,0 +1,85 @@
+# import_commandes.py
+# Lecture des fichiers de commandes de la boutique en ligne et contrôles avant import.
+# L'import lui-même est fait par ServiceCommercial.importer_commandes ; la commande
+# importer-commandes (GestionCommercialeApp) n'en affiche que le rapport.
+#
+# Formats acceptés :
+#   - JSON : liste de {"reference_externe": ..., "id_client": ..., "lignes": [{"ref_produit": ..., "quantite": ...}]}
+#   - CSV  : colonnes commande,id_client,ref_produit,quantite ; une ligne par produit,
+#            les lignes d'une même commande (colonne "commande") doivent se suivre.
+import csv
+import data_manager
+
+
+class RapportImport:
+    def __init__(self):
+        self.acceptees = []  # (reference_externe, numero_commande)
+        self.rejetees = []   # (reference_externe, motif)
+        self.duree = 0.0
+
+    def debit(self):
+        """Commandes traitées par seconde."""
+        total = len(self.acceptees) + len(self.rejetees)
+        return total / self.duree if self.duree else 0.0
+
+    def afficher(self):
+        print(f"{len(self.acceptees)} commande(s) validée(s), {len(self.rejetees)} rejetée(s) "
+              f"en {self.duree:.2f} s ({self.debit():.0f} commandes/s).")
+        for reference_externe, motif in self.rejetees:
+            print(f"  - Rejet {reference_externe} : {motif}")
+
+
+def lire_commandes(chemin):
+    """Produit les commandes d'un fichier .csv ou .json, une à une."""
+    if chemin.lower().endswith(".csv"):
+        return _lire_csv(chemin)
+    return _lire_json(chemin)
+
+
+def _lire_json(chemin):
+    for i, data in enumerate(data_manager.iter_donnees_json(chemin), 1):
+        yield {
+            "reference_externe": str(data.get('reference_externe', i)),
+            "id_client": data.get('id_client'),
+            "lignes": [(item.get('ref_produit'), item.get('quantite')) for item in data.get('lignes', [])],
+        }
+
+
+def _lire_csv(chemin):
+    with open(chemin, newline='', encoding='utf-8') as f:
+        courante = None
+        for ligne in csv.DictReader(f):
+            if courante is None or ligne['commande'] != courante['reference_externe']:
+                if courante is not None:
+                    yield courante
+                courante = {"reference_externe": ligne['commande'], "id_client": ligne['id_client'], "lignes": []}
+            courante['lignes'].append((ligne['ref_produit'], ligne['quantite']))
+        if courante is not None:
+            yield courante
+
+
+def verifier_commande_entrante(depot, entree):
+    """Contrôle une commande entrante sans rien modifier.
+
+    Retourne (motif de rejet ou None, {ref_produit: quantité totale demandée}).
+    """
+    if not depot.get_client(entree['id_client']):
+        return f"Client {entree['id_client']} inconnu.", None
+    if not entree['lignes']:
+        return "Commande vide.", None
+    demandes = {}
+    for ref_produit, quantite in entree['lignes']:
+        try:
+            quantite = int(quantite)
+        except (TypeError, ValueError):
+            return f"Quantité invalide pour {ref_produit}.", None
+        if quantite <= 0:
+            return f"La quantité pour {ref_produit} doit être positive.", None
+        demandes[ref_produit] = demandes.get(ref_produit, 0) + quantite
+    for ref_produit, quantite in demandes.items():
+        produit = depot.get_produit(ref_produit)
+        if not produit:
+            return f"Produit {ref_produit} inconnu.", None
+        if produit.disponible() < quantite:
+            return f"Stock insuffisant pour {produit.nom} (demandé: {quantite}, dispo: {produit.disponible()}).", None
+    return None, demandes
@@ -0,0 +1,170 @@
+# instantane.py
+# Format binaire des fichiers de données (GESTION_FORMAT=binaire).
+# Produits et clients sont écrits en colonnes : les nombres dans des tableaux
+# array.array relus d'un bloc, les textes d'une même colonne joints par "\0"
+# et décodés en une seule fois. Les commandes restent relisibles une à une :
+# chaque commande est un enregistrement (entête de taille fixe, textes joints,
+# puis quantité et prix de chaque ligne empaquetés par struct) dont la position
+# est gardée dans l'index des commandes.
+# Version 2 : nombre de lignes d'une commande sur 32 bits, et chaque colonne de
+# texte précédée d'un octet de présence par enregistrement (None des champs
+# facultatifs). Les fichiers de la version 1 restent lisibles.
+# Ces fichiers ne sont écrits que par l'application : leur contenu est relu sans
+# contrôle champ par champ (voir Produit.depuis_instantane).
+import array
+import struct
+import sys
+
+VERSION = 2
+VERSIONS_LISIBLES = (1, 2)
+MAGIQUE_COLLECTION = b"GCC"
+MAGIQUE_COMMANDES = b"GCO"
+SEPARATEUR = "\0"
+ABSENT_V1 = "\1"  # Valeur None d'une colonne de texte dans la version 1
+
+# Colonnes de chaque collection : (champ, type) ; 's' texte, 'd' réel, 'q' entier
+SCHEMAS = {
+    "produit": (("reference", 's'), ("nom", 's'), ("prix_unitaire", 'd'), ("stock", 'q')),
+    "client": (("id_client", 's'), ("nom", 's'), ("prenom", 's'), ("adresse", 's'),
+               ("telephone", 's'), ("email", 's')),
+}
+
+ENTETE_FICHIER = struct.Struct("<3sBBI")    # magique, version, petit-boutiste ?, nombre (0 : commandes en flux)
+TAILLE_BLOC = struct.Struct("<Q")
+# Commande : taille des textes (numéro, date, client, statut puis références des lignes), nombre de lignes, total
+ENTETES_COMMANDE = {1: struct.Struct("<IHd"), 2: struct.Struct("<IId")}
+ENTETE_COMMANDE = ENTETES_COMMANDE[VERSION]
+LIGNE = struct.Struct("<qd")                # quantité, prix de vente
+
+
+class FormatInvalide(ValueError):
+    pass
+
+
+def _joindre(valeurs):
+    texte = SEPARATEUR.join(valeurs).encode('utf-8')
+    if texte.count(b"\0") != max(len(valeurs) - 1, 0):
+        raise ValueError("Un texte contient le caractère nul : impossible de l'écrire au format binaire.")
+    return texte
+
+
+def _colonne_texte(valeurs):
+    # Octets de présence (0 : None), puis les textes joints
+    return bytes(v is not None for v in valeurs) + _joindre(["" if v is None else v for v in valeurs])
+
+
+def _separer(bloc, nombre, version):
+    if not nombre:
+        return []
+    if version == 1:
+        return [None if v == ABSENT_V1 else v for v in bloc.decode('utf-8').split(SEPARATEUR)]
+    presents, textes = bloc[:nombre], bloc[nombre:].decode('utf-8').split(SEPARATEUR)
+    if 0 in presents:
+        return [v if present else None for v, present in zip(textes, presents)]
+    return textes
+
+
+def _lire_entete(f, magique):
+    entete = f.read(ENTETE_FICHIER.size)
+    if len(entete) < ENTETE_FICHIER.size:
+        raise FormatInvalide("Fichier tronqué.")
+    lu, version, petit_boutiste, nombre = ENTETE_FICHIER.unpack(entete)
+    if lu != magique or version not in VERSIONS_LISIBLES:
+        raise FormatInvalide("Fichier d'un autre type ou d'une autre version.")
+    return version, bool(petit_boutiste), nombre
+
+
+def ecrire_collection(f, type_entite, enregistrements):
+    """Ecrit une liste de dicts (produits ou clients) en colonnes dans f (ouvert en binaire). Retourne leur nombre."""
+    f.write(ENTETE_FICHIER.pack(MAGIQUE_COLLECTION, VERSION, sys.byteorder == "little", len(enregistrements)))
+    for champ, type_colonne in SCHEMAS[type_entite]:
+        valeurs = [e.get(champ) for e in enregistrements]
+        if type_colonne == 's':
+            bloc = _colonne_texte(valeurs)
+        else:
+            bloc = array.array(type_colonne, valeurs).tobytes()
+        f.write(TAILLE_BLOC.pack(len(bloc)))
+        f.write(bloc)
+    return len(enregistrements)
+
+
+def lire_collection(f, type_entite):
+    """Relit une collection écrite par ecrire_collection : liste de dicts."""
+    version, petit_boutiste, nombre = _lire_entete(f, MAGIQUE_COLLECTION)
+    colonnes = []
+    for champ, type_colonne in SCHEMAS[type_entite]:
+        taille, = TAILLE_BLOC.unpack(f.read(TAILLE_BLOC.size))
+        bloc = f.read(taille)
+        if len(bloc) < taille:
+            raise FormatInvalide("Fichier tronqué.")
+        if type_colonne == 's':
+            colonnes.append(_separer(bloc, nombre, version))
+        else:
+            valeurs = array.array(type_colonne)
+            valeurs.frombytes(bloc)
+            if petit_boutiste != (sys.byteorder == "little"):
+                valeurs.byteswap()
+            colonnes.append(valeurs.tolist())
+        if len(colonnes[-1]) != nombre:
+            raise FormatInvalide(f"Colonne {champ} incomplète.")
+    champs = [champ for champ, _ in SCHEMAS[type_entite]]
+    return [dict(zip(champs, valeurs)) for valeurs in zip(*colonnes)]
+
+
+def ecrire_commandes(f, commandes):
+    """Ecrit les commandes (dicts) une à une dans f. Retourne la position de chacune."""
+    f.write(ENTETE_FICHIER.pack(MAGIQUE_COMMANDES, VERSION, True, 0))
+    positions = []
+    for cmd in commandes:
+        positions.append(f.tell())
+        lignes = cmd.get('produits_commandes', [])
+        textes = _joindre([cmd['numero_commande'], cmd['date_creation'], cmd['id_client'],
+                           cmd.get('statut', "En Cours")] + [item['ref_produit'] for item in lignes])
+        f.write(ENTETE_COMMANDE.pack(len(textes), len(lignes), cmd.get('total', 0.0)))
+        f.write(textes)
+        f.write(b"".join([LIGNE.pack(item['quantite'], item['prix_vente']) for item in lignes]))
+    return positions
+
+
+def _decoder_commande(entete, corps):
+    # Un seul décodage pour tous les textes de la commande
+    taille_textes, _, total = entete
+    textes = corps[:taille_textes].decode('utf-8').split(SEPARATEUR)
+    return {"numero_commande": textes[0], "date_creation": textes[1], "id_client": textes[2],
+            "produits_commandes": [{"ref_produit": ref, "quantite": quantite, "prix_vente": prix_vente}
+                                   for ref, (quantite, prix_vente)
+                                   in zip(textes[4:], LIGNE.iter_unpack(corps[taille_textes:]))],
+            "total": total, "statut": textes[3]}
+
+
+def _lire_commande_suivante(f, format_entete):
+    entete = f.read(format_entete.size)
+    if not entete:
+        return None
+    if len(entete) < format_entete.size:
+        raise FormatInvalide("Commande tronquée.")
+    entete = format_entete.unpack(entete)
+    taille = entete[0] + entete[1] * LIGNE.size
+    corps = f.read(taille)
+    if len(corps) < taille:
+        raise FormatInvalide("Commande tronquée.")
+    return _decoder_commande(entete, corps)
+
+
+def lire_commande(f, position):
+    """Relit la commande écrite à la position donnée (f ouvert en binaire)."""
+    f.seek(0)
+    version, _, _ = _lire_entete(f, MAGIQUE_COMMANDES)
+    f.seek(position)
+    return _lire_commande_suivante(f, ENTETES_COMMANDE[version])
+
+
+def iter_commandes(f):
+    """Relit toutes les commandes du fichier, dans l'ordre."""
+    version, _, _ = _lire_entete(f, MAGIQUE_COMMANDES)
+    format_entete = ENTETES_COMMANDE[version]
+    while True:
+        cmd = _lire_commande_suivante(f, format_entete)
+        if cmd is None:
+            return
+        yield cmd
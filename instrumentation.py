@@ -0,0 +1,194 @@
+# instrumentation.py
+# Mesure des durées des opérations (chargement/sauvegarde des données, opérations
+# métier du service, sérialisation des modèles) et export des métriques.
+#
+# Désactivée par défaut : une fonction décorée par @mesure ne fait alors qu'un test
+# de booléen avant d'appeler la fonction d'origine. Activation :
+#   GESTION_METRIQUES=data/metriques.prom python main_app.py serveur   (ou .json)
+#   python main_app.py --metriques data/metriques.json importer-commandes web.csv
+# Les métriques sont écrites à la fin du programme (format Prometheus si le fichier
+# se termine par .prom, JSON sinon) et servies par GET /metriques.
+# Profilage : GESTION_PROFIL=service.valider,service.sauvegarder (ou --profil)
+# exécute ces opérations sous cProfile et écrit un fichier .prof par opération
+# dans data/profils/ (lisible avec python -m pstats).
+import atexit
+import collections
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+
+# Bornes (en secondes) des intervalles de l'histogramme des durées
+BORNES = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+# Dernières durées conservées par opération pour les percentiles de l'export JSON
+TAILLE_ECHANTILLON = 10000
+DOSSIER_PROFILS = os.path.join("data", "profils")
+
+_actif = False
+_profilees = set()        # Opérations exécutées sous cProfile ("*" : toutes)
+_metriques = {}           # nom -> Mesures
+_verrou = threading.Lock()
+_profils = {}             # nom -> cProfile.Profile cumulé sur les appels
+# Un seul profileur actif à la fois dans le processus : les appels imbriqués ou
+# concurrents pendant un profilage ne sont que chronométrés
+_verrou_profil = threading.Lock()
+
+
+class Mesures:
+    """Durées d'une opération : nombre, somme, maximum, histogramme et derniers échantillons."""
+
+    def __init__(self):
+        self.verrou = threading.Lock()
+        self.nombre = 0
+        self.erreurs = 0
+        self.somme = 0.0
+        self.maximum = 0.0
+        self.intervalles = [0] * (len(BORNES) + 1)  # Le dernier : au-delà de la plus grande borne
+        self.echantillon = collections.deque(maxlen=TAILLE_ECHANTILLON)
+
+    def ajouter(self, duree, erreur=False):
+        with self.verrou:
+            self.nombre += 1
+            self.erreurs += erreur
+            self.somme += duree
+            if duree > self.maximum:
+                self.maximum = duree
+            for i, borne in enumerate(BORNES):
+                if duree <= borne:
+                    self.intervalles[i] += 1
+                    break
+            else:
+                self.intervalles[-1] += 1
+            self.echantillon.append(duree)
+
+    def to_dict(self):
+        with self.verrou:
+            durees = sorted(self.echantillon)
+            resultat = {"nombre": self.nombre, "erreurs": self.erreurs, "somme_s": round(self.somme, 6),
+                        "moyenne_ms": round(self.somme / self.nombre * 1000, 3) if self.nombre else None,
+                        "max_ms": round(self.maximum * 1000, 3)}
+        for nom, rang in (("p50_ms", 0.5), ("p90_ms", 0.9), ("p99_ms", 0.99)):
+            resultat[nom] = round(durees[int(rang * (len(durees) - 1))] * 1000, 3) if durees else None
+        return resultat
+
+
+def activer(profil=()):
+    """Active les mesures ; profil : noms d'opérations à profiler ("*" pour toutes)."""
+    global _actif
+    _actif = True
+    _profilees.update(profil)
+
+
+def desactiver():
+    global _actif
+    _actif = False
+    _profilees.clear()
+
+
+def est_active():
+    return _actif
+
+
+def reinitialiser():
+    with _verrou:
+        _metriques.clear()
+        _profils.clear()
+
+
+def _mesures(nom):
+    mesures = _metriques.get(nom)
+    if mesures is None:
+        with _verrou:
+            mesures = _metriques.setdefault(nom, Mesures())
+    return mesures
+
+
+def enregistrer(nom, duree, erreur=False):
+    """Ajoute une durée mesurée à la main (par exemple une requête HTTP)."""
+    if _actif:
+        _mesures(nom).ajouter(duree, erreur)
+
+
+def mesure(nom):
+    """Décorateur : chronomètre chaque appel sous le nom donné ("service.valider")."""
+    def decorateur(fonction):
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not _actif:
+                return fonction(*args, **kwargs)
+            profileur = None
+            if (nom in _profilees or "*" in _profilees) and _verrou_profil.acquire(blocking=False):
+                with _verrou:
+                    profileur = _profils.setdefault(nom, cProfile.Profile())
+            erreur = True
+            debut = time.perf_counter()
+            try:
+                if profileur is not None:
+                    profileur.enable()
+                resultat = fonction(*args, **kwargs)
+                erreur = False
+                return resultat
+            finally:
+                if profileur is not None:
+                    profileur.disable()
+                    _verrou_profil.release()
+                _mesures(nom).ajouter(time.perf_counter() - debut, erreur)
+        return enveloppe
+    return decorateur
+
+
+def instantane():
+    """{nom: statistiques} de toutes les opérations mesurées."""
+    with _verrou:
+        metriques = dict(_metriques)
+    return {nom: metriques[nom].to_dict() for nom in sorted(metriques)}
+
+
+def format_prometheus():
+    """Métriques au format texte de Prometheus (histogramme des durées par opération)."""
+    with _verrou:
+        metriques = dict(_metriques)
+    lignes = ["# HELP gestion_operation_duree_secondes Durée des opérations.",
+              "# TYPE gestion_operation_duree_secondes histogram"]
+    erreurs = ["# HELP gestion_operation_erreurs_total Opérations terminées par une exception.",
+               "# TYPE gestion_operation_erreurs_total counter"]
+    for nom in sorted(metriques):
+        mesures = metriques[nom]
+        with mesures.verrou:
+            intervalles, nombre, somme, nb_erreurs = list(mesures.intervalles), mesures.nombre, mesures.somme, mesures.erreurs
+        cumul = 0
+        for borne, quantite in zip(BORNES + ("+Inf",), intervalles):
+            cumul += quantite
+            lignes.append(f'gestion_operation_duree_secondes_bucket{{operation="{nom}",le="{borne}"}} {cumul}')
+        lignes.append(f'gestion_operation_duree_secondes_sum{{operation="{nom}"}} {somme}')
+        lignes.append(f'gestion_operation_duree_secondes_count{{operation="{nom}"}} {nombre}')
+        erreurs.append(f'gestion_operation_erreurs_total{{operation="{nom}"}} {nb_erreurs}')
+    return "\n".join(lignes + erreurs) + "\n"
+
+
+def ecrire(chemin):
+    """Ecrit les métriques (Prometheus si chemin se termine par .prom, JSON sinon) et les profils."""
+    os.makedirs(os.path.dirname(chemin) or ".", exist_ok=True)
+    with open(chemin, 'w', encoding='utf-8') as f:
+        if chemin.endswith(".prom"):
+            f.write(format_prometheus())
+        else:
+            json.dump(instantane(), f, indent=4, ensure_ascii=False)
+    with _verrou:
+        profils = dict(_profils)
+    if profils:
+        os.makedirs(DOSSIER_PROFILS, exist_ok=True)
+        for nom, profileur in profils.items():
+            profileur.dump_stats(os.path.join(DOSSIER_PROFILS, f"{nom}.prof"))
+
+
+def configurer(fichier=None, profil=None):
+    """Active les mesures si un fichier de sortie (ou GESTION_METRIQUES) est donné ; écriture à la sortie."""
+    fichier = fichier or os.environ.get("GESTION_METRIQUES")
+    profil = profil or os.environ.get("GESTION_PROFIL")
+    if not fichier and not profil:
+        return
+    activer([nom.strip() for nom in (profil or "").split(",") if nom.strip()])
+    atexit.register(ecrire, fichier or os.path.join("data", "metriques.json"))
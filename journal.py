@@ -0,0 +1,146 @@
+# journal.py
+# Journal des modifications en ajout seul (write-ahead log).
+# Chaque mutation (produit créé, stock ajusté, commande validée...) est écrite
+# sur une ligne JSON dès qu'elle a lieu. Au démarrage, le journal est rejoué
+# par-dessus les fichiers de données ; la compaction réécrit ces fichiers puis
+# vide le journal.
+# Pendant une compaction, les entrées déjà prises en compte sont mises de côté
+# dans un second fichier (journal.log.1) et les nouvelles modifications vont
+# dans un journal neuf : la réécriture des fichiers ne bloque pas les écritures.
+# Le fichier mis de côté n'est supprimé qu'une fois les fichiers réécrits ; en
+# cas d'arrêt entre les deux, il est rejoué au démarrage avant le journal.
+import json
+import os
+import shutil
+import data_manager
+
+
+class Journal:
+    def __init__(self, chemin=None):
+        self.chemin = chemin or data_manager.JOURNAL_FILE
+        self.chemin_detache = self.chemin + ".1"  # Entrées d'une compaction en cours ou interrompue
+        self.nb_entrees = 0
+        self.types_modifies = set()  # Collections à réécrire à la prochaine compaction
+        self.cles_modifiees = {}     # type -> {cle} modifiées depuis la dernière compaction
+        self._detache = (set(), {})  # (types, clés) des entrées mises de côté
+        self._fichier = None
+
+    def _ouvrir(self):
+        if self._fichier is None:
+            data_manager.initialiser_dossiers()
+            self._fichier = open(self.chemin, 'a', encoding='utf-8')
+        return self._fichier
+
+    def enregistrer_lot(self, modifications):
+        """Ajoute des entrées (type, cle, donnees ; donnees=None pour une suppression) avec une seule synchronisation disque."""
+        lignes = [json.dumps({"type": type_entite, "cle": cle, "donnees": donnees}, ensure_ascii=False) + "\n"
+                  for type_entite, cle, donnees in modifications]
+        f = self._ouvrir()
+        taille = os.fstat(f.fileno()).st_size
+        try:
+            f.write("".join(lignes))
+            f.flush()
+            os.fsync(f.fileno())  # Une entrée écrite survit à un arrêt brutal
+        except OSError:
+            self._retirer_lot(taille)
+            raise
+        # Le lot n'est compté comme modifié qu'une fois sur disque (sinon défait par l'appelant)
+        for type_entite, cle, _ in modifications:
+            self.types_modifies.add(type_entite)
+            self.cles_modifiees.setdefault(type_entite, set()).add(cle)
+        self.nb_entrees += len(lignes)
+
+    def _retirer_lot(self, taille):
+        # Lot écrit en partie (disque plein...) : le journal est ramené à sa taille d'avant,
+        # pour que le lot soit enregistré entièrement ou pas du tout
+        try:
+            self._fichier.close()  # Le reste du lot encore en mémoire tampon est abandonné
+        except OSError:
+            pass
+        self._fichier = None
+        try:
+            os.truncate(self.chemin, taille)
+        except OSError:
+            pass  # Une ligne incomplète en fin de journal est ignorée au rejeu
+
+    @staticmethod
+    def _lire(chemin):
+        entrees = []
+        try:
+            with open(chemin, 'r', encoding='utf-8') as f:
+                for numero_ligne, ligne in enumerate(f, 1):
+                    if not ligne.strip():
+                        continue
+                    try:
+                        entrees.append(json.loads(ligne))
+                    except json.JSONDecodeError:
+                        # Typiquement la dernière ligne, interrompue par un arrêt brutal
+                        print(f"Avertissement: Entrée {numero_ligne} de {chemin} illisible, ignorée.")
+        except FileNotFoundError:
+            return []
+        return entrees
+
+    @staticmethod
+    def _modifications(entrees):
+        types, cles = set(), {}
+        for e in entrees:
+            types.add(e['type'])
+            cles.setdefault(e['type'], set()).add(e['cle'])
+        return types, cles
+
+    def relire(self):
+        """Retourne les entrées du journal (celles mises de côté d'abord) dans l'ordre d'écriture."""
+        detachees = self._lire(self.chemin_detache)
+        entrees = self._lire(self.chemin)
+        self.nb_entrees = len(entrees)
+        self.types_modifies, self.cles_modifiees = self._modifications(entrees)
+        self._detache = self._modifications(detachees)
+        return detachees + entrees
+
+    def doit_compacter(self):
+        return self.nb_entrees >= data_manager.JOURNAL_SEUIL_COMPACTION
+
+    def a_des_entrees(self):
+        return self.nb_entrees > 0 or os.path.exists(self.chemin_detache)
+
+    def cles_non_compactees(self, type_entite):
+        """Clés du type modifiées depuis la dernière compaction terminée (entrées mises de côté comprises)."""
+        return self.cles_modifiees.get(type_entite, set()) | self._detache[1].get(type_entite, set())
+
+    def detacher(self):
+        """Met de côté les entrées actuelles avant une compaction ; les suivantes vont dans un journal neuf.
+
+        Retourne (types, {type: clés}) de toutes les entrées mises de côté, y compris celles
+        d'une compaction précédente qui n'a pas abouti.
+        """
+        self.fermer()
+        if os.path.exists(self.chemin):
+            if os.path.exists(self.chemin_detache):
+                # Compaction précédente interrompue : ses entrées restent à prendre en compte
+                with open(self.chemin, 'rb') as source, open(self.chemin_detache, 'ab') as cible:
+                    shutil.copyfileobj(source, cible)
+                    cible.flush()
+                    os.fsync(cible.fileno())
+                os.remove(self.chemin)
+            else:
+                os.replace(self.chemin, self.chemin_detache)
+        types, cles = self._detache
+        types |= self.types_modifies
+        for type_entite, cles_type in self.cles_modifiees.items():
+            cles.setdefault(type_entite, set()).update(cles_type)
+        self.nb_entrees = 0
+        self.types_modifies = set()
+        self.cles_modifiees = {}
+        return set(types), {type_entite: set(cles_type) for type_entite, cles_type in cles.items()}
+
+    def terminer_compaction(self):
+        """A appeler une fois les fichiers de données réécrits : supprime les entrées mises de côté."""
+        if os.path.exists(self.chemin_detache):
+            os.remove(self.chemin_detache)
+        self._detache = (set(), {})
+
+    def fermer(self):
+        if self._fichier is not None:
+            self._fichier.close()
+            self._fichier = None
+
@@ -1,5 +1,13 @@
 # main_app.py
+import argparse
 from business_logic import GestionCommercialeApp # Importer la classe principale
+import instrumentation
+import repartition
+import stockage
+import serveur_http
+import sys
+from services import ServiceCommercial
+from import_commandes import lire_commandes
 
 # --- Fonctions de Menu (restent ici pour la clarté de l'interface utilisateur) ---
 def menu_produits(app_instance):
@@ -40,7 +48,7 @@ def menu_commandes(app_instance):
         print("\n--- Menu Commandes ---")
         print("1. Créer une commande")
         print("2. Ajouter un produit à une commande")
-        print("3. Afficher toutes les commandes")
+        print("3. Afficher les commandes")
         print("4. Valider une commande")
         print("5. Annuler une commande")
         print("6. Générer un reçu de commande")
@@ -57,8 +65,9 @@ def menu_commandes(app_instance):
         else: print("Choix invalide.")
 
 # --- Point d'entrée de l'application ---
-def run_application():
+def run_application(intervalle_sauvegarde=None):
     app = GestionCommercialeApp() # Crée une instance de notre logique principale
+    app.service.demarrer_sauvegarde_auto(intervalle_sauvegarde)
     
     while True:
         print("\n--- Menu Principal (Junior Modifié) ---")
@@ -66,6 +75,7 @@ def run_application():
         print("2. Gestion des Clients")
         print("3. Gestion des Commandes")
         print("4. Sauvegarder les données")
+        print("5. Tableau de bord")
         print("0. Quitter")
 
         choix_principal = input("Votre choix : ")
@@ -78,12 +88,100 @@ def run_application():
             menu_commandes(app)
         elif choix_principal == '4':
             app.sauvegarder_tout()
+        elif choix_principal == '5':
+            app.afficher_statistiques()
         elif choix_principal == '0':
             app.sauvegarder_tout() # Sauvegarde avant de quitter
+            app.service.fermer()
             print("Au revoir !")
             break
         else:
             print("Choix invalide.")
 
+# --- Commandes non interactives ---
+def analyser_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Gestion commerciale en ligne de commande.")
+    parser.add_argument("--metriques", metavar="FICHIER",
+                        help="Mesurer les opérations et écrire les métriques en sortant (.prom : Prometheus, sinon JSON)")
+    parser.add_argument("--profil", metavar="OPERATIONS",
+                        help="Profiler ces opérations avec cProfile (ex. service.valider,service.sauvegarder ; * : toutes)")
+    parser.add_argument("--sauvegarde-auto", metavar="SECONDES", type=float,
+                        help="Intervalle de la sauvegarde en arrière-plan du menu et du serveur "
+                             "(défaut : GESTION_SAUVEGARDE_AUTO ou 60 ; 0 : désactivée)")
+    sous_commandes = parser.add_subparsers(dest="commande")
+    sous_commandes.add_parser("migrer-sqlite", help="Importer data/*.json dans la base SQLite")
+    export = sous_commandes.add_parser("exporter-commandes", help="Exporter les commandes dans un fichier JSON")
+    export.add_argument("chemin")
+    export.add_argument("--statut", choices=["En Cours", "Validée", "Annulée"])
+    import_ = sous_commandes.add_parser("importer-commandes", help="Créer et valider des commandes depuis un fichier CSV ou JSON")
+    import_.add_argument("chemin")
+    recus_ = sous_commandes.add_parser("generer-recus", help="Générer en masse les reçus des commandes (data/recus)")
+    recus_.add_argument("--debut", help="Première date incluse (AAAA-MM-JJ)")
+    recus_.add_argument("--fin", help="Dernière date incluse (AAAA-MM-JJ)")
+    recus_.add_argument("--statut", default="Validée", choices=["En Cours", "Validée", "Annulée"])
+    recus_.add_argument("--client", help="ID du client")
+    recus_.add_argument("--archive", help="Écrire tous les reçus dans une seule archive .zip")
+    recus_.add_argument("--processus", type=int, help="Processus de mise en forme (par défaut : un par cœur)")
+    nettoyage = sous_commandes.add_parser("supprimer-produits",
+                                          help="Supprimer en une fois des produits du catalogue (ceux d'une commande active sont conservés)")
+    nettoyage.add_argument("references", nargs="*", help="Références des produits")
+    nettoyage.add_argument("--fichier", help="Fichier texte de références, une par ligne")
+    nettoyage.add_argument("--inutilises", action="store_true",
+                           help="Tous les produits sans stock qu'aucune commande active n'utilise")
+    rapport = sous_commandes.add_parser("rapport", help="Rapport des ventes (chiffre d'affaires, meilleures ventes, rotation)")
+    rapport.add_argument("--debut", help="Première date incluse (AAAA-MM-JJ)")
+    rapport.add_argument("--fin", help="Dernière date incluse (AAAA-MM-JJ)")
+    rapport.add_argument("--top", type=int, default=10, help="Nombre de produits et de clients affichés")
+    serveur = sous_commandes.add_parser("serveur", help="Lancer l'API HTTP/JSON")
+    serveur.add_argument("--hote", default="127.0.0.1")
+    serveur.add_argument("--port", type=int, default=8080)
+    serveur.add_argument("--threads", type=int, default=8, help="Threads exécutant les opérations du service")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    run_application()
\ No newline at end of file
+    arguments = analyser_arguments()
+    instrumentation.configurer(arguments.metriques, arguments.profil)
+    nb_fragments = repartition.lire_configuration()
+    if nb_fragments is not None:
+        # Les fragments ont divergé de data/ : une instance unique y perdrait ou dupliquerait des modifications
+        print(f"Erreur: Les données ont été réparties en {nb_fragments} fragments ({repartition.dossier_repartition()}) "
+              "et ne sont plus utilisables que par repartition.Routeur. Supprimez ce dossier pour revenir à "
+              "l'instance unique (les modifications faites depuis la répartition seront perdues).")
+        sys.exit(1)
+    if arguments.commande == "migrer-sqlite":
+        stockage.migrer_json_vers_sqlite()
+    elif arguments.commande == "exporter-commandes":
+        app = GestionCommercialeApp()
+        app.exporter_commandes(arguments.chemin, arguments.statut)
+        app.service.fermer()
+    elif arguments.commande == "importer-commandes":
+        app = GestionCommercialeApp()
+        app.importer_commandes(lire_commandes(arguments.chemin))
+        app.sauvegarder_tout()
+        app.service.fermer()
+    elif arguments.commande == "generer-recus":
+        app = GestionCommercialeApp()
+        app.generer_recus(arguments.debut, arguments.fin, arguments.statut, arguments.client,
+                          arguments.archive, arguments.processus)
+        app.service.fermer()
+    elif arguments.commande == "supprimer-produits":
+        app = GestionCommercialeApp()
+        references = list(arguments.references)
+        if arguments.fichier:
+            with open(arguments.fichier, encoding='utf-8') as f:
+                references.extend(ligne.strip() for ligne in f if ligne.strip())
+        if arguments.inutilises:
+            references.extend(app.service.produits_inutilises())
+        app.supprimer_produits(references)
+        app.sauvegarder_tout()
+        app.service.fermer()
+    elif arguments.commande == "rapport":
+        app = GestionCommercialeApp()
+        app.rapport_ventes(arguments.debut, arguments.fin, arguments.top)
+        app.service.fermer()
+    elif arguments.commande == "serveur":
+        service = ServiceCommercial()
+        service.demarrer_sauvegarde_auto(arguments.sauvegarde_auto)
+        serveur_http.lancer(service, arguments.hote, arguments.port, arguments.threads)
+    else:
+        run_application(arguments.sauvegarde_auto)
\ No newline at end of file
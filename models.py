@@ -1,8 +1,13 @@
 # models.py
 import uuid
 import datetime
+import instrumentation
+from exceptions import StockInsuffisant
 
 class Produit:
+    # __slots__ : pas de __dict__ par instance, les objets sont plus compacts en mémoire
+    __slots__ = ("reference", "nom", "prix_unitaire", "stock", "reserve")
+
     def __init__(self, reference, nom, prix_unitaire, stock):
         self.reference = reference
         self.nom = nom
@@ -18,9 +23,17 @@ class Produit:
                 raise ValueError("Le stock ne peut pas être négatif.")
         except ValueError:
             raise ValueError("Le stock doit être un nombre entier.")
+        # Quantité réservée par les commandes "En Cours" (non sauvegardée, recalculée au chargement)
+        self.reserve = 0
 
     def afficher_details(self):
-        return f"Réf: {self.reference}, Nom: {self.nom}, Prix: {self.prix_unitaire:.2f} MAD, Stock: {self.stock}"
+        details = f"Réf: {self.reference}, Nom: {self.nom}, Prix: {self.prix_unitaire:.2f} MAD, Stock: {self.stock}"
+        if self.reserve:
+            details += f" (dont réservé: {self.reserve})"
+        return details
+
+    def disponible(self):
+        return self.stock - self.reserve
 
     def modifier_produit(self, nom=None, prix_unitaire=None):
         if nom:
@@ -49,7 +62,26 @@ class Produit:
             if "Stock insuffisant" in str(e):
                 raise e
             raise ValueError("La quantité pour la mise à jour du stock doit être un nombre entier.")
+
+    # Réservations (utilisées via reservations.GestionnaireReservations)
+    def reserver(self, quantite, forcer=False):
+        if not forcer and quantite > self.disponible():
+            raise StockInsuffisant(f"Stock insuffisant pour {self.nom} (demandé: {quantite}, dispo: {self.disponible()}).")
+        self.reserve += quantite
+
+    def liberer(self, quantite):
+        self.reserve = max(0, self.reserve - quantite)
+
+    def consommer(self, quantite):
+        # Sortie de stock d'une quantité préalablement réservée
+        if quantite > self.stock:
+            raise StockInsuffisant(f"Stock insuffisant pour {self.nom} (demandé: {quantite}, dispo: {self.stock}).")
+        if quantite > self.reserve:
+            raise StockInsuffisant(f"La quantité {quantite} de {self.nom} n'a pas été réservée.")
+        self.stock -= quantite
+        self.reserve -= quantite
             
+    @instrumentation.mesure("modele.produit.to_dict")
     def to_dict(self):
         return {
             "reference": self.reference,
@@ -59,11 +91,25 @@ class Produit:
         }
 
     @classmethod
+    @instrumentation.mesure("modele.produit.from_dict")
     def from_dict(cls, data):
         return cls(data['reference'], data['nom'], data['prix_unitaire'], data['stock'])
 
+    @classmethod
+    def depuis_instantane(cls, data):
+        """Comme from_dict, sans contrôle ni conversion : pour des données écrites par l'application elle-même."""
+        produit = cls.__new__(cls)
+        produit.reference = data['reference']
+        produit.nom = data['nom']
+        produit.prix_unitaire = data['prix_unitaire']
+        produit.stock = data['stock']
+        produit.reserve = 0
+        return produit
+
 
 class Client:
+    __slots__ = ("id_client", "nom", "prenom", "adresse", "telephone", "email")
+
     def __init__(self, id_client, nom, prenom, adresse, telephone=None, email=None):
         self.id_client = id_client
         self.nom = nom
@@ -85,6 +131,7 @@ class Client:
         if telephone is not None: self.telephone = telephone
         if email is not None: self.email = email
             
+    @instrumentation.mesure("modele.client.to_dict")
     def to_dict(self):
         return {
             "id_client": self.id_client,
@@ -96,46 +143,91 @@ class Client:
         }
 
     @classmethod
+    @instrumentation.mesure("modele.client.from_dict")
     def from_dict(cls, data):
         return cls(data['id_client'], data['nom'], data['prenom'], data['adresse'],
                    data.get('telephone'), data.get('email'))
 
 
+class LigneCommande:
+    """Ligne d'une commande : produit, quantité et prix de vente au moment de la commande."""
+    __slots__ = ("ref_produit", "quantite", "prix_vente")
+
+    def __init__(self, ref_produit, quantite, prix_vente):
+        self.ref_produit = ref_produit
+        self.quantite = quantite
+        self.prix_vente = float(prix_vente)
+
+    def to_dict(self):
+        return {
+            "ref_produit": self.ref_produit,
+            "quantite": self.quantite,
+            "prix_vente": self.prix_vente
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['ref_produit'], data['quantite'], data['prix_vente'])
+
+
 class Commande:
+    __slots__ = ("numero_commande", "date_creation", "id_client", "produits_commandes", "total", "statut",
+                 "_lignes_par_ref")
+
     def __init__(self, numero_commande, date_creation, id_client, produits_commandes=None, total=0.0, statut="En Cours"):
         self.numero_commande = numero_commande
         self.date_creation = date_creation
         self.id_client = id_client
-        self.produits_commandes = produits_commandes if produits_commandes is not None else []
+        self.produits_commandes = produits_commandes if produits_commandes is not None else [] # Liste de LigneCommande
         self.total = float(total)
         self.statut = statut
+        self._lignes_par_ref = None  # ref_produit -> LigneCommande, construit au premier ajout
 
     def ajouter_produit(self, ref_produit, quantite, prix_vente):
         if self.statut != "En Cours":
             print("Erreur: Impossible d'ajouter un produit. La commande n'est pas 'En Cours'.")
             return False
-        
-        for item in self.produits_commandes:
-            if item['ref_produit'] == ref_produit:
-                item['quantite'] += quantite
-                self.calculer_total()
-                return True
-
-        self.produits_commandes.append({
-            "ref_produit": ref_produit,
-            "quantite": quantite,
-            "prix_vente": float(prix_vente)
-        })
-        self.calculer_total()
+
+        if self._lignes_par_ref is None:
+            self._lignes_par_ref = {item.ref_produit: item for item in self.produits_commandes}
+        item = self._lignes_par_ref.get(ref_produit)
+        if item is not None:
+            item.quantite += quantite
+        else:
+            item = self._lignes_par_ref[ref_produit] = LigneCommande(ref_produit, quantite, prix_vente)
+            self.produits_commandes.append(item)
+        # Total mis à jour par différence : pas de nouveau parcours des lignes
+        self.total += item.prix_vente * quantite
         return True
 
+    def retirer_produit(self, ref_produit, quantite):
+        """Défait ajouter_produit (enregistrement impossible). Retourne vrai si la ligne a été supprimée."""
+        if self._lignes_par_ref is None:
+            self._lignes_par_ref = {item.ref_produit: item for item in self.produits_commandes}
+        item = self._lignes_par_ref[ref_produit]
+        item.quantite -= quantite
+        self.total -= item.prix_vente * quantite
+        if item.quantite > 0:
+            return False
+        del self._lignes_par_ref[ref_produit]
+        self.produits_commandes.remove(item)
+        return True
+
+    def quantites_par_produit(self):
+        """Quantité totale commandée par référence de produit."""
+        quantites = {}
+        for item in self.produits_commandes:
+            quantites[item.ref_produit] = quantites.get(item.ref_produit, 0) + item.quantite
+        return quantites
+
     def calculer_total(self):
+        """Recalcule le total à partir de toutes les lignes (le total est sinon tenu à jour à chaque ajout)."""
         self.total = 0.0
         for item in self.produits_commandes:
-            self.total += item['prix_vente'] * item['quantite']
+            self.total += item.prix_vente * item.quantite
 
-    def afficher_commande(self, clients_data, produits_data): # Passe les listes de clients et produits
-        client = next((c for c in clients_data if c.id_client == self.id_client), None)
+    def afficher_commande(self, clients_data, produits_data): # Passe les index {id: objet} de clients et produits
+        client = clients_data.get(self.id_client)
         client_nom = f"{client.prenom} {client.nom}" if client else "Client Inconnu"
         
         details = (f"Commande N°: {self.numero_commande} ({self.statut})\n"
@@ -146,24 +238,63 @@ class Commande:
             details += "  Aucun produit.\n"
         else:
             for item in self.produits_commandes:
-                produit = next((p for p in produits_data if p.reference == item['ref_produit']), None)
+                produit = produits_data.get(item.ref_produit)
                 nom_produit = produit.nom if produit else "Produit Inconnu"
-                details += (f"  - {nom_produit} (Réf: {item['ref_produit']}) "
-                            f"x {item['quantite']} @ {item['prix_vente']:.2f} MAD\n")
+                details += (f"  - {nom_produit} (Réf: {item.ref_produit}) "
+                            f"x {item.quantite} @ {item.prix_vente:.2f} MAD\n")
         details += f"Total: {self.total:.2f} MAD\n"
         return details
         
+    @instrumentation.mesure("modele.commande.to_dict")
     def to_dict(self):
         return {
             "numero_commande": self.numero_commande,
             "date_creation": self.date_creation,
             "id_client": self.id_client,
-            "produits_commandes": self.produits_commandes,
+            "produits_commandes": [item.to_dict() for item in self.produits_commandes],
             "total": self.total,
             "statut": self.statut
         }
 
     @classmethod
+    @instrumentation.mesure("modele.commande.from_dict")
     def from_dict(cls, data):
         return cls(data['numero_commande'], data['date_creation'], data['id_client'],
-                   data.get('produits_commandes', []), data.get('total', 0.0), data.get('statut', "En Cours"))
\ No newline at end of file
+                   [LigneCommande.from_dict(item) for item in data.get('produits_commandes', [])],
+                   data.get('total', 0.0), data.get('statut', "En Cours"))
+
+
+class ResumeCommande:
+    """Vue légère d'une commande (sans le détail des lignes), chargée au démarrage."""
+    __slots__ = ("numero_commande", "date_creation", "id_client", "total", "statut", "refs")
+
+    def __init__(self, numero_commande, date_creation, id_client, total, statut, refs=None):
+        # Pas de conversion ici : des centaines de milliers de résumés sont créés au démarrage
+        self.numero_commande = numero_commande
+        self.date_creation = date_creation
+        self.id_client = id_client
+        self.total = total
+        self.statut = statut
+        self.refs = refs if refs is not None else []  # Références des produits commandés
+
+    def to_dict(self):
+        return {
+            "numero_commande": self.numero_commande,
+            "date_creation": self.date_creation,
+            "id_client": self.id_client,
+            "total": self.total,
+            "statut": self.statut,
+            "refs": list(self.refs)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['numero_commande'], data['date_creation'], data['id_client'],
+                   float(data.get('total', 0.0)), data.get('statut', "En Cours"), list(data.get('refs', [])))
+
+    @classmethod
+    def depuis_commande(cls, data):
+        """Construit le résumé à partir du dict complet d'une commande."""
+        return cls(data['numero_commande'], data['date_creation'], data['id_client'],
+                   float(data.get('total', 0.0)), data.get('statut', "En Cours"),
+                   [item['ref_produit'] for item in data.get('produits_commandes', [])])
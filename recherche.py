@@ -0,0 +1,120 @@
+# recherche.py
+# Index inversé en mémoire pour la recherche de produits par nom.
+# Les noms sont découpés en mots normalisés (minuscules, sans accents :
+# "Règle Métallique" -> "regle", "metallique") ; chaque mot pointe vers les
+# références des produits qui le contiennent. La liste triée des mots permet
+# de retrouver par dichotomie tous les mots commençant par un préfixe ("met").
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+
+MOT = re.compile(r"[a-z0-9]+")
+
+# Points attribués par mot de la recherche (plus un mot est complet, mieux le produit est classé)
+SCORE_MOT_EXACT = 3
+SCORE_PREFIXE = 1
+
+
+def normaliser(texte):
+    """Minuscules sans accents : "Écran Léger" -> "ecran leger"."""
+    decompose = unicodedata.normalize("NFKD", texte.casefold())
+    return "".join(c for c in decompose if not unicodedata.combining(c))
+
+
+def decouper(texte):
+    return MOT.findall(normaliser(texte))
+
+
+class IndexRecherche:
+    def __init__(self, produits=()):
+        self._verrou = threading.RLock()
+        self._produits = {}        # reference -> Produit
+        self._mots_produit = {}    # reference -> mots indexés (pour le retrait)
+        self._cle_tri = {}         # reference -> "0012Stylo bleu" (longueur puis nom) : à score égal, les noms courts d'abord
+        self._references = {}      # mot -> {reference}
+        self._mots_tries = None    # Liste triée des mots, reconstruite après un ajout de mot
+        for produit in produits:
+            self.indexer(produit)
+
+    def indexer(self, produit):
+        """Ajoute ou réindexe un produit (après création ou modification du nom)."""
+        with self._verrou:
+            self.retirer(produit.reference)
+            mots = set(decouper(produit.nom))
+            self._produits[produit.reference] = produit
+            self._mots_produit[produit.reference] = mots
+            # Chaîne plutôt que tuple : comparaison plus rapide lors du classement
+            self._cle_tri[produit.reference] = f"{len(produit.nom):04d}{produit.nom}"
+            for mot in mots:
+                references = self._references.get(mot)
+                if references is None:
+                    references = self._references[mot] = set()
+                    self._mots_tries = None
+                references.add(produit.reference)
+
+    def retirer(self, reference):
+        with self._verrou:
+            self._produits.pop(reference, None)
+            self._cle_tri.pop(reference, None)
+            for mot in self._mots_produit.pop(reference, ()):
+                references = self._references[mot]
+                references.discard(reference)
+                if not references:
+                    del self._references[mot]
+                    self._mots_tries = None
+
+    def _mots_commencant_par(self, prefixe):
+        if self._mots_tries is None:
+            self._mots_tries = sorted(self._references)
+        debut = bisect.bisect_left(self._mots_tries, prefixe)
+        # Premier mot qui ne commence plus par le préfixe : dernier caractère incrémenté ("met" -> "meu")
+        fin = bisect.bisect_left(self._mots_tries, prefixe[:-1] + chr(ord(prefixe[-1]) + 1))
+        return self._mots_tries[debut:fin]
+
+    def rechercher(self, terme, limite=20):
+        """Produits dont le nom contient chaque mot du terme (en entier ou en début de mot), les plus pertinents d'abord.
+
+        Une référence exacte ("PROD-1A2B3C4D") est aussi acceptée. limite=None : tous les résultats.
+        """
+        with self._verrou:
+            produit = self._produits.get(terme.strip().upper())
+            if produit is not None:
+                return [produit]
+            mots = set(decouper(terme))
+            if not mots:
+                return []
+            # Les produits sont regroupés par score à l'aide d'opérations sur les ensembles :
+            # chaque mot trouvé en début de mot vaut SCORE_PREFIXE, en mot entier SCORE_MOT_EXACT.
+            paliers = None  # score -> {reference}
+            for mot in mots:
+                mots_trouves = self._mots_commencant_par(mot)
+                if len(mots_trouves) == 1:
+                    trouves = self._references[mots_trouves[0]]  # Lu seulement : pas de copie
+                else:
+                    trouves = set().union(*(self._references[m] for m in mots_trouves))
+                exacts = self._references.get(mot, set())
+                if paliers is None:
+                    paliers = {0: trouves}
+                nouveaux = {}
+                for score, references in paliers.items():
+                    # Tous les mots de la recherche doivent être trouvés
+                    for points, groupe in ((SCORE_MOT_EXACT, references & exacts),
+                                           (SCORE_PREFIXE, (references & trouves) - exacts)):
+                        if groupe:
+                            nouveaux.setdefault(score + points, set()).update(groupe)
+                paliers = nouveaux
+                if not paliers:
+                    return []
+            # Meilleur score d'abord ; à score égal, les noms les plus courts (plus proches de la recherche)
+            classement = []
+            for score in sorted(paliers, reverse=True):
+                if limite is None:
+                    classement.extend(sorted(paliers[score], key=self._cle_tri.__getitem__))
+                    continue
+                # Sans trier tous les résultats du palier
+                classement.extend(heapq.nsmallest(limite - len(classement), paliers[score], key=self._cle_tri.__getitem__))
+                if len(classement) >= limite:
+                    break
+            return [self._produits[ref] for ref in classement]
@@ -0,0 +1,121 @@
+# recus.py
+# Reçus de commande : mise en forme (fonction pure, sans accès au dépôt) et
+# génération en masse, par exemple pour régénérer les reçus du mois.
+# Le processus principal lit les commandes et prépare des tuples légers
+# (noms du client et des produits déjà résolus) ; la mise en forme et
+# l'écriture des fichiers se font par lots dans un pool de processus.
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+TAILLE_LOT = 500            # Reçus envoyés ensemble à un processus
+TAILLE_TAMPON = 1 << 16     # Tampon d'écriture de chaque fichier
+
+
+def rendre_recu(donnees):
+    """Texte du reçu à partir de (numéro, date, nom du client, ID client, statut, [(nom, quantité, prix)], total)."""
+    numero, date_creation, nom_client, id_client, statut, lignes, total = donnees
+    morceaux = ["--- REÇU COMMANDE ---",
+                f"Numéro: {numero}",
+                f"Date: {date_creation}",
+                f"Client: {nom_client} (ID: {id_client})",
+                f"Statut: {statut}",
+                "Produits:"]
+    morceaux.extend(f"  - {nom_produit} x {quantite} @ {prix_vente:.2f} MAD"
+                    for nom_produit, quantite, prix_vente in lignes)
+    morceaux.append(f"TOTAL: {total:.2f} MAD")
+    morceaux.append("-----------------------\n")
+    return "\n".join(morceaux)
+
+
+def nom_fichier_recu(numero_commande):
+    return f"recu_{numero_commande.replace('-', '_')}.txt"
+
+
+def ecrire_recus(lot, dossier):
+    """Met en forme et écrit un lot de reçus dans dossier. Retourne le nombre de reçus écrits."""
+    for donnees in lot:
+        chemin = os.path.join(dossier, nom_fichier_recu(donnees[0]))
+        with open(chemin, 'w', encoding='utf-8', buffering=TAILLE_TAMPON) as f:
+            f.write(rendre_recu(donnees))
+    return len(lot)
+
+
+def rendre_recus(lot):
+    """Met en forme un lot de reçus pour une archive : [(nom du fichier, contenu encodé)]."""
+    return [(nom_fichier_recu(donnees[0]), rendre_recu(donnees).encode('utf-8')) for donnees in lot]
+
+
+def _lots(donnees_recus, taille):
+    lot = []
+    for donnees in donnees_recus:
+        lot.append(donnees)
+        if len(lot) >= taille:
+            yield lot
+            lot = []
+    if lot:
+        yield lot
+
+
+class RapportRecus:
+    def __init__(self, destination):
+        self.destination = destination  # Dossier ou archive
+        self.nombre = 0
+        self.duree = 0.0
+
+    def debit(self):
+        """Reçus générés par seconde."""
+        return self.nombre / self.duree if self.duree else 0.0
+
+    def afficher(self):
+        print(f"{self.nombre} reçu(s) généré(s) dans {self.destination} "
+              f"en {self.duree:.2f} s ({self.debit():.0f} reçus/s).")
+
+
+def generer_recus(donnees_recus, dossier, archive=None, processus=None, taille_lot=TAILLE_LOT):
+    """Génère les reçus d'un itérable de tuples (voir rendre_recu).
+
+    Sans archive, un fichier par reçu dans dossier ; avec archive (chemin .zip), tous
+    les reçus dans ce seul fichier. Par défaut un processus par cœur ; processus=1 :
+    tout dans le processus courant (aussi sur une machine à un seul cœur).
+    """
+    processus = processus or os.cpu_count() or 1
+    rapport = RapportRecus(archive or dossier)
+    debut = time.perf_counter()
+    os.makedirs((os.path.dirname(archive) or ".") if archive else dossier, exist_ok=True)
+    zip_ = zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) if archive else None
+    try:
+        if processus == 1:
+            for lot in _lots(donnees_recus, taille_lot):
+                rapport.nombre += _traiter_resultat(zip_, rendre_recus(lot) if zip_ else ecrire_recus(lot, dossier))
+        else:
+            with ProcessPoolExecutor(max_workers=processus) as executeur:
+                # Nombre limité de lots en attente : les commandes sont lues au fur et à mesure
+                max_en_attente = 2 * processus
+                en_attente = set()
+                for lot in _lots(donnees_recus, taille_lot):
+                    if len(en_attente) >= max_en_attente:
+                        terminees, en_attente = wait(en_attente, return_when=FIRST_COMPLETED)
+                        for futur in terminees:
+                            rapport.nombre += _traiter_resultat(zip_, futur.result())
+                    if zip_:
+                        en_attente.add(executeur.submit(rendre_recus, lot))
+                    else:
+                        en_attente.add(executeur.submit(ecrire_recus, lot, dossier))
+                for futur in en_attente:
+                    rapport.nombre += _traiter_resultat(zip_, futur.result())
+    finally:
+        if zip_:
+            zip_.close()
+    rapport.duree = time.perf_counter() - debut
+    return rapport
+
+
+def _traiter_resultat(zip_, resultat):
+    # Reçus écrits par le processus (nombre) ou à ajouter à l'archive (liste)
+    if zip_ is None:
+        return resultat
+    for nom_fichier, contenu in resultat:
+        zip_.writestr(nom_fichier, contenu)
+    return len(resultat)
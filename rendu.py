@@ -0,0 +1,92 @@
+# rendu.py
+# Textes affichés par les listes du menu (produits, commandes), gardés en cache.
+# Le texte d'une commande dépend aussi du nom de son client et de ses produits :
+# le cache retient ces dépendances pour l'invalider quand l'un d'eux change.
+# Toutes les modifications passant par ServiceCommercial._persister_lot, c'est là
+# que le cache est invalidé (la commande modifiée, et les produits de ses lignes
+# dont la réservation a pu changer).
+# Les listes sont parcourues par itérateurs et découpées en pages : seule la
+# page affichée est chargée et mise en forme.
+import collections
+import itertools
+import threading
+
+TAILLE_CACHE = 10000  # Textes gardés au plus (les moins récemment affichés sont retirés)
+TAILLE_PAGE = 20
+
+
+def decouper_page(elements, page, taille=TAILLE_PAGE):
+    """Eléments de la page (à partir de 1) d'un itérable, et vrai s'il y a une page suivante.
+
+    L'itérable n'est parcouru que jusqu'à la fin de la page demandée.
+    """
+    debut = (max(page, 1) - 1) * taille
+    extraits = list(itertools.islice(elements, debut, debut + taille + 1))
+    return extraits[:taille], len(extraits) > taille
+
+
+class CacheRendu:
+    def __init__(self, taille=TAILLE_CACHE):
+        self._verrou = threading.Lock()
+        self._taille = taille
+        self._textes = collections.OrderedDict()  # (type, clé) -> (texte, dépendances)
+        self._dependants = {}                      # (type, clé) -> {(type, clé) des textes qui l'affichent}
+        # Incrémenté à chaque invalidation : un texte mis en forme pendant une modification n'est pas gardé
+        self._generation = 0
+        self.trouves = 0
+        self.calcules = 0
+
+    def texte(self, cle, rendre):
+        """Texte en cache pour cle ("produit", référence) ou ("commande", numéro).
+
+        rendre() retourne (texte, dépendances) ; il n'est appelé que si le texte n'est pas en cache.
+        """
+        with self._verrou:
+            entree = self._textes.get(cle)
+            if entree is not None:
+                self._textes.move_to_end(cle)
+                self.trouves += 1
+                return entree[0]
+            generation = self._generation
+        texte, dependances = rendre()
+        with self._verrou:
+            self.calcules += 1
+            if generation == self._generation:
+                self._textes[cle] = (texte, dependances)
+                for dependance in dependances:
+                    self._dependants.setdefault(dependance, set()).add(cle)
+                if len(self._textes) > self._taille:
+                    self._retirer(next(iter(self._textes)))
+        return texte
+
+    def _retirer(self, cle):
+        entree = self._textes.pop(cle, None)
+        if entree is None:
+            return
+        for dependance in entree[1]:
+            dependants = self._dependants.get(dependance)
+            if dependants is not None:
+                dependants.discard(cle)
+                if not dependants:
+                    del self._dependants[dependance]
+
+    def invalider(self, type_entite, cle, objet=None):
+        """Retire les textes qui affichent l'entité modifiée (objet : la commande modifiée, None si supprimée)."""
+        with self._verrou:
+            self._generation += 1
+            self._retirer((type_entite, cle))
+            for dependant in list(self._dependants.get((type_entite, cle), ())):
+                self._retirer(dependant)
+            if type_entite == "commande" and objet is not None:
+                # Quantités réservées des produits de la commande
+                for item in objet.produits_commandes:
+                    self._retirer(("produit", item.ref_produit))
+
+    def vider(self):
+        with self._verrou:
+            self._generation += 1
+            self._textes.clear()
+            self._dependants.clear()
+
+    def __len__(self):
+        return len(self._textes)
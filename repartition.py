@@ -0,0 +1,497 @@
+# repartition.py
+# Déploiement réparti sur plusieurs processus : un processus Python n'utilise qu'un cœur.
+# - Les clients et leurs commandes sont répartis par id_client entre N processus
+#   "fragments", chacun avec son ServiceCommercial et ses fichiers (data/fragments/<i>/).
+# - Le stock des produits appartient au coordinateur (data/fragments/stock/), un processus
+#   qui exécute les réservations une à une : pas de survente entre fragments. Les sorties
+#   et retours de stock reçus ensemble sont persistés en un seul lot avant de répondre.
+# - Le Routeur (processus appelant) envoie chaque opération au fragment concerné :
+#   fragment_de(cle) = CRC-32 de la clé modulo N, pour un id_client comme pour un numéro de
+#   commande. Chaque fragment tire ses ID clients et ses numéros de commande de façon à ce
+#   qu'ils lui appartiennent ; seules les commandes réparties depuis une instance unique
+#   (repartir_donnees) sont retrouvées par une table.
+# Chaque processus utilise le support JSON (fichiers + journal) dans son dossier.
+# Une fois les données réparties, data/ n'est plus à jour : main_app.py refuse alors de
+# démarrer une instance unique (voir lire_configuration).
+# Chaque fragment garde une copie du catalogue (noms et prix) pour ses lignes de commande ;
+# le Routeur la met à jour quand un produit est créé ou modifié.
+# Pas de transaction entre processus : un arrêt brutal entre la sortie de stock
+# (coordinateur) et la validation (fragment) peut laisser un écart de stock.
+import itertools
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import shutil
+import threading
+import zlib
+
+import data_manager
+from exceptions import ErreurGestion
+from models import Produit
+from services import ServiceCommercial
+from stockage import StockageJSON
+from verrous import TableVerrous
+
+DOSSIER_REPARTITION = "fragments"      # Sous-dossier de data_manager.DATA_DIR
+FICHIER_CONFIGURATION = "repartition.json"
+OPERATIONS_STOCK = ("reserver", "liberer", "consommer", "restituer", "defaire")
+# Opérations que le Routeur peut demander à chaque processus
+OPERATIONS_COORDINATEUR = ("catalogue", "fiche_produit", "ajouter_produit", "modifier_produit", "statistiques",
+                           "sauvegarder", "reconstruire_reservations")
+OPERATIONS_FRAGMENT = ("ajouter_client", "client", "creer_commande", "ajouter_ligne", "valider", "annuler",
+                       "commande", "statistiques", "sauvegarder", "quantites_reservees", "numeros_deplaces",
+                       "mettre_a_jour_catalogue")
+
+
+def fragment_de(cle, nb_fragments):
+    """Fragment (0 à nb_fragments - 1) d'un id_client ou d'un numéro de commande ; identique dans tous les processus."""
+    return zlib.crc32(cle.encode('utf-8')) % nb_fragments
+
+
+def dossier_repartition():
+    return os.path.join(data_manager.DATA_DIR, DOSSIER_REPARTITION)
+
+
+def _dossier_stock(dossier):
+    return os.path.join(dossier, "stock")
+
+
+def _dossier_fragment(dossier, indice):
+    return os.path.join(dossier, str(indice))
+
+
+def _en_dict(resultat):
+    # Les objets du modèle sont renvoyés en dicts : moins coûteux à transmettre entre processus
+    return resultat.to_dict() if hasattr(resultat, "to_dict") else resultat
+
+
+def _executer(service, operations, message):
+    operation, args = message
+    if operation not in operations:
+        return "erreur", ErreurGestion(f"Opération {operation} inconnue.")
+    try:
+        return "ok", _en_dict(getattr(service, operation)(*args))
+    except ErreurGestion as e:
+        return "erreur", e
+    except Exception as e:  # Erreur inattendue : transmise sans bloquer l'appelant
+        return "erreur", RuntimeError(f"{type(e).__name__}: {e}")
+
+
+# --- Coordinateur du stock ---
+class ServiceStock(ServiceCommercial):
+    """ServiceCommercial du coordinateur : le catalogue et le stock, sans clients ni commandes."""
+
+    def catalogue(self):
+        return [produit.to_dict() for produit in self.depot.produits.values()]
+
+    def fiche_produit(self, reference):
+        """Dict du produit avec sa quantité disponible."""
+        produit = self.produit(reference)
+        donnees = produit.to_dict()
+        donnees['disponible'] = produit.disponible()
+        return donnees
+
+    def reconstruire_reservations(self, quantites):
+        """Réservations des commandes "En Cours" de tous les fragments ({ref_produit: quantite}), au démarrage."""
+        for produit in self.depot.produits.values():
+            produit.reserve = 0
+        for ref_produit, quantite in quantites.items():
+            produit = self.depot.get_produit(ref_produit)
+            if produit:
+                produit.reserver(quantite, forcer=True)
+
+    def executer_lot(self, demandes):
+        """Exécute dans l'ordre des opérations de stock [(opération, arguments)].
+
+        Retourne [("ok", None) ou ("erreur", exception)] ; les produits dont le stock a changé
+        sont persistés en un seul lot. Si ce lot ne peut être enregistré, les opérations qui
+        ont changé le stock sont défaites et reçoivent l'erreur.
+        """
+        resultats, modifies, a_persister = [], {}, []
+        for operation, arguments in demandes:
+            if operation not in OPERATIONS_STOCK:
+                resultats.append(("erreur", ErreurGestion(f"Opération de stock {operation} inconnue.")))
+                continue
+            try:
+                produits = getattr(self.reservations, operation)(*arguments)
+            except ErreurGestion as e:
+                resultats.append(("erreur", e))
+                continue
+            # Les réservations ne sont pas enregistrées (reconstruites au démarrage), seul le stock l'est
+            if operation in ("consommer", "restituer") or (operation == "defaire" and produits):
+                modifies.update((produit.reference, produit) for produit in produits)
+                a_persister.append((len(resultats), operation, arguments))
+            resultats.append(("ok", None))
+        if not modifies:
+            return resultats
+
+        def defaire():
+            for _, operation, arguments in reversed(a_persister):
+                if operation == "defaire":
+                    getattr(self.reservations, arguments[0])(arguments[1])  # Opération défaite refaite
+                else:
+                    self.reservations.defaire(operation, *arguments)
+        try:
+            self._persister_lot([("produit", reference, produit) for reference, produit in modifies.items()], defaire)
+        except Exception as e:
+            erreur = RuntimeError(f"Enregistrement du stock impossible ({type(e).__name__}: {e}).")
+            for indice, _, _ in a_persister:
+                resultats[indice] = ("erreur", erreur)
+        return resultats
+
+
+def _executer_coordinateur(dossier, connexion_routeur, connexions_fragments):
+    data_manager.utiliser_dossier(dossier)
+    service = ServiceStock(StockageJSON())
+    service.demarrer_sauvegarde_auto()
+    actives = list(connexions_fragments)
+    try:
+        while True:
+            demandes = []
+            for connexion in multiprocessing.connection.wait(actives + [connexion_routeur]):
+                try:
+                    message = connexion.recv()
+                except EOFError:  # Fragment arrêté
+                    actives.remove(connexion)
+                    continue
+                if connexion is connexion_routeur:
+                    if message is None:
+                        return
+                    connexion.send(_executer(service, OPERATIONS_COORDINATEUR, message))
+                else:
+                    demandes.append((connexion, message))
+            # Demandes des fragments arrivées ensemble : exécutées une à une, persistées ensemble
+            if demandes:
+                resultats = service.executer_lot([message for _, message in demandes])
+                for (connexion, _), resultat in zip(demandes, resultats):
+                    connexion.send(resultat)
+    finally:
+        service.fermer()
+
+
+# --- Fragments ---
+class ReservationsDistantes:
+    """Même interface que GestionnaireReservations : chaque opération est exécutée par le coordinateur."""
+
+    def __init__(self, connexion):
+        self._connexion = connexion
+        self._verrou_connexion = threading.Lock()
+        self.verrous = TableVerrous()
+
+    def verrouiller(self, refs_produits):
+        return self.verrous.verrouiller(refs_produits)
+
+    def reconstruire(self):
+        pass  # Réservations reconstruites par le coordinateur, à partir de tous les fragments
+
+    def _demander(self, operation, *arguments):
+        with self._verrou_connexion:
+            self._connexion.send((operation, arguments))
+            etat, resultat = self._connexion.recv()
+        if etat == "erreur":
+            raise resultat
+        return []  # Stock persisté par le coordinateur : aucun produit à persister dans le fragment
+
+    def reserver(self, quantites):
+        return self._demander("reserver", quantites)
+
+    def liberer(self, quantites):
+        return self._demander("liberer", quantites)
+
+    def consommer(self, quantites):
+        return self._demander("consommer", quantites)
+
+    def restituer(self, quantites):
+        return self._demander("restituer", quantites)
+
+    def defaire(self, operation, quantites):
+        return self._demander("defaire", operation, quantites)
+
+
+class ServiceFragment(ServiceCommercial):
+    """ServiceCommercial d'un fragment : ses clients et leurs commandes, le stock étant tenu par le coordinateur."""
+
+    def __init__(self, indice, nb_fragments, reservations, catalogue):
+        self.indice = indice
+        self.nb_fragments = nb_fragments
+        super().__init__(StockageJSON(), reservations)
+        for donnees in catalogue:
+            self.depot.ajouter_produit(Produit.from_dict(donnees))
+
+    def _appartient(self, cle):
+        return fragment_de(cle, self.nb_fragments) == self.indice
+
+    def _nouvel_id_client(self):
+        # Tiré jusqu'à appartenir au fragment : le Routeur retrouve le fragment d'après l'ID
+        while True:
+            id_client = super()._nouvel_id_client()
+            if self._appartient(id_client):
+                return id_client
+
+    def _nouveau_numero_commande(self):
+        while True:
+            numero = super()._nouveau_numero_commande()
+            if self._appartient(numero):
+                return numero
+
+    def mettre_a_jour_catalogue(self, donnees):
+        """Produit créé ou modifié par le coordinateur (le stock de la copie n'est pas utilisé)."""
+        with self.depot.verrou:
+            produit = self.depot.get_produit(donnees['reference'])
+            if produit is None:
+                self.depot.ajouter_produit(Produit.from_dict(donnees))
+            else:
+                produit.modifier_produit(nom=donnees['nom'], prix_unitaire=donnees['prix_unitaire'])
+
+    def quantites_reservees(self):
+        """Quantités réservées par les commandes "En Cours" du fragment ({ref_produit: quantite})."""
+        quantites = {}
+        with self.depot.verrou:
+            numeros = [numero for numero, resume in self.depot.resumes.items() if resume.statut == "En Cours"]
+        for numero in numeros:
+            for ref_produit, quantite in self.depot.get_commande(numero).quantites_par_produit().items():
+                quantites[ref_produit] = quantites.get(ref_produit, 0) + quantite
+        return quantites
+
+    def numeros_deplaces(self):
+        """Numéros des commandes du fragment qui ne lui appartiennent pas d'après fragment_de (données réparties)."""
+        with self.depot.verrou:
+            return [numero for numero in self.depot.resumes if not self._appartient(numero)]
+
+
+def _executer_fragment(indice, nb_fragments, dossier, connexion, connexion_stock, catalogue):
+    data_manager.utiliser_dossier(dossier)
+    service = ServiceFragment(indice, nb_fragments, ReservationsDistantes(connexion_stock), catalogue)
+    service.demarrer_sauvegarde_auto()
+    try:
+        while True:
+            try:
+                message = connexion.recv()
+            except EOFError:
+                return
+            if message is None:
+                return
+            connexion.send(_executer(service, OPERATIONS_FRAGMENT, message))
+    finally:
+        service.fermer()
+        connexion_stock.close()
+
+
+# --- Routeur ---
+def lire_configuration(dossier=None):
+    """Nombre de fragments des données réparties, ou None si elles n'ont pas été réparties."""
+    try:
+        with open(os.path.join(dossier or dossier_repartition(), FICHIER_CONFIGURATION), encoding='utf-8') as f:
+            return json.load(f)['fragments']
+    except FileNotFoundError:
+        return None
+
+
+def _ecrire_configuration(dossier, nb_fragments):
+    os.makedirs(dossier, exist_ok=True)
+    data_manager.sauvegarder_donnees_json(os.path.join(dossier, FICHIER_CONFIGURATION), {"fragments": nb_fragments})
+
+
+class _Canal:
+    """Connexion vers un processus : une requête à la fois."""
+
+    def __init__(self, connexion):
+        self.connexion = connexion
+        self.verrou = threading.Lock()
+
+    def appeler(self, operation, *args):
+        with self.verrou:
+            self.connexion.send((operation, args))
+            etat, resultat = self.connexion.recv()
+        if etat == "erreur":
+            raise resultat
+        return resultat
+
+
+class Routeur:
+    """Point d'entrée du déploiement réparti : démarre le coordinateur et les fragments, puis route les opérations.
+
+    Les méthodes reprennent celles de ServiceCommercial et retournent des dicts.
+    Peut être appelé depuis plusieurs threads : les fragments travaillent en parallèle.
+    Les données doivent avoir été réparties avant (repartir_donnees) ; nb_fragments n'est que vérifié.
+    """
+
+    def __init__(self, nb_fragments=None, dossier=None):
+        self.dossier = dossier or dossier_repartition()
+        configure = lire_configuration(self.dossier)
+        if configure is None:
+            # Les fragments démarreraient vides à côté des données de data/
+            raise ValueError(f"Aucune répartition dans {self.dossier} : "
+                             "répartissez d'abord les données avec repartition.repartir_donnees().")
+        if nb_fragments is not None and nb_fragments != configure:
+            # Les clés seraient cherchées dans un autre fragment que le leur
+            raise ValueError(f"Les données sont réparties en {configure} fragments ; "
+                             f"répartissez-les de nouveau pour en utiliser {nb_fragments}.")
+        self.nb_fragments = configure
+        self._tour = itertools.count()  # Fragment des nouveaux clients, à tour de rôle
+        self._processus = []
+        cote_stock, cotes_fragments = [], []
+        for _ in range(self.nb_fragments):
+            pour_stock, pour_fragment = multiprocessing.Pipe()
+            cote_stock.append(pour_stock)
+            cotes_fragments.append(pour_fragment)
+        connexion, connexion_stock = multiprocessing.Pipe()
+        self._demarrer(_executer_coordinateur, _dossier_stock(self.dossier), connexion_stock, cote_stock)
+        self.stock = _Canal(connexion)
+        for extremite in [connexion_stock] + cote_stock:
+            extremite.close()  # Gardées par le coordinateur
+        catalogue = self.stock.appeler("catalogue")
+        self.fragments = []
+        for indice in range(self.nb_fragments):
+            connexion, connexion_fragment = multiprocessing.Pipe()
+            self._demarrer(_executer_fragment, indice, self.nb_fragments, _dossier_fragment(self.dossier, indice),
+                           connexion_fragment, cotes_fragments[indice], catalogue)
+            self.fragments.append(_Canal(connexion))
+            connexion_fragment.close()
+            cotes_fragments[indice].close()
+        # Réservations des commandes "En Cours" de tous les fragments, tenues par le coordinateur
+        quantites = {}
+        for fragment in self.fragments:
+            for ref_produit, quantite in fragment.appeler("quantites_reservees").items():
+                quantites[ref_produit] = quantites.get(ref_produit, 0) + quantite
+        self.stock.appeler("reconstruire_reservations", quantites)
+        self._deplacees = {}  # numero_commande -> fragment, pour les commandes réparties depuis une instance unique
+        for indice, fragment in enumerate(self.fragments):
+            self._deplacees.update(dict.fromkeys(fragment.appeler("numeros_deplaces"), indice))
+
+    def _demarrer(self, cible, *args):
+        processus = multiprocessing.Process(target=cible, args=args, daemon=True)
+        processus.start()
+        self._processus.append(processus)
+
+    def _fragment_client(self, id_client):
+        return self.fragments[fragment_de(id_client, self.nb_fragments)]
+
+    def _fragment_commande(self, numero_commande):
+        indice = self._deplacees.get(numero_commande)
+        if indice is None:
+            indice = fragment_de(numero_commande, self.nb_fragments)
+        return self.fragments[indice]
+
+    # --- Produits (coordinateur) ---
+    def produit(self, reference):
+        return self.stock.appeler("fiche_produit", reference)
+
+    def lister_produits(self):
+        return self.stock.appeler("catalogue")
+
+    def ajouter_produit(self, nom, prix_unitaire, stock):
+        produit = self.stock.appeler("ajouter_produit", nom, prix_unitaire, stock)
+        self._diffuser_catalogue(produit)
+        return produit
+
+    def modifier_produit(self, reference, nom=None, prix_unitaire=None):
+        produit = self.stock.appeler("modifier_produit", reference, nom, prix_unitaire)
+        self._diffuser_catalogue(produit)
+        return produit
+
+    def _diffuser_catalogue(self, produit):
+        for fragment in self.fragments:
+            fragment.appeler("mettre_a_jour_catalogue", produit)
+
+    # --- Clients et commandes (fragments) ---
+    def ajouter_client(self, nom, prenom, adresse, telephone="", email=""):
+        fragment = self.fragments[next(self._tour) % self.nb_fragments]
+        return fragment.appeler("ajouter_client", nom, prenom, adresse, telephone, email)
+
+    def client(self, id_client):
+        return self._fragment_client(id_client).appeler("client", id_client)
+
+    def creer_commande(self, id_client):
+        return self._fragment_client(id_client).appeler("creer_commande", id_client)
+
+    def commande(self, numero_commande):
+        return self._fragment_commande(numero_commande).appeler("commande", numero_commande)
+
+    def ajouter_ligne(self, numero_commande, ref_produit, quantite):
+        return self._fragment_commande(numero_commande).appeler("ajouter_ligne", numero_commande, ref_produit, quantite)
+
+    def valider(self, numero_commande):
+        return self._fragment_commande(numero_commande).appeler("valider", numero_commande)
+
+    def annuler(self, numero_commande):
+        return self._fragment_commande(numero_commande).appeler("annuler", numero_commande)
+
+    # --- Ensemble ---
+    def statistiques(self):
+        """Compteurs de tous les fragments additionnés ; valeur du stock du coordinateur."""
+        resultat = self.stock.appeler("statistiques")
+        resultat.update(commandes_en_cours=0, chiffre_affaires=0.0, commandes={})
+        for fragment in self.fragments:
+            compteurs = fragment.appeler("statistiques")
+            resultat['commandes_en_cours'] += compteurs['commandes_en_cours']
+            resultat['chiffre_affaires'] = round(resultat['chiffre_affaires'] + compteurs['chiffre_affaires'], 2)
+            for statut, valeurs in compteurs['commandes'].items():
+                total = resultat['commandes'].setdefault(statut, {"nombre": 0, "montant": 0.0})
+                total['nombre'] += valeurs['nombre']
+                total['montant'] = round(total['montant'] + valeurs['montant'], 2)
+        return resultat
+
+    def sauvegarder(self):
+        for fragment in self.fragments:
+            fragment.appeler("sauvegarder")
+        self.stock.appeler("sauvegarder")
+
+    def fermer(self):
+        """Arrête les fragments puis le coordinateur (chacun fait une dernière sauvegarde)."""
+        coordinateur, fragments = self._processus[0], self._processus[1:]
+        for canal in self.fragments:
+            with canal.verrou:
+                canal.connexion.send(None)
+        # Le coordinateur sert les fragments jusqu'à leur arrêt
+        for processus in fragments:
+            processus.join()
+        with self.stock.verrou:
+            self.stock.connexion.send(None)
+        coordinateur.join()
+
+
+def repartir_donnees(nb_fragments):
+    """Répartit les données de data/ (instance unique) en nb_fragments fragments et le stock (data/fragments/).
+
+    Les clients et leurs commandes vont dans le fragment de leur id_client, les produits au coordinateur.
+    Retourne le nombre de commandes réparties.
+    """
+    dossier = dossier_repartition()
+    if lire_configuration(dossier) is not None:
+        raise ValueError(f"Les données sont déjà réparties dans {dossier}.")
+    shutil.rmtree(dossier, ignore_errors=True)  # Répartition précédente interrompue
+    source = ServiceCommercial()
+    source.sauvegarder()  # Partitions des commandes à jour (journal compacté)
+    dossier_source = data_manager.DATA_DIR
+    dossiers = [_dossier_fragment(dossier, indice) for indice in range(nb_fragments)]
+    nombre, ecrits = 0, set()
+    try:
+        for mois, commandes in itertools.groupby(source.stockage.iter_commandes(),
+                                                 key=lambda cmd: data_manager.mois_de(cmd['date_creation'])):
+            # Un mois à la fois en mémoire
+            par_fragment = [[] for _ in range(nb_fragments)]
+            for cmd in commandes:
+                par_fragment[fragment_de(cmd['id_client'], nb_fragments)].append(cmd)
+                nombre += 1
+            for indice, liste in enumerate(par_fragment):
+                if not liste:
+                    continue
+                data_manager.utiliser_dossier(dossiers[indice])
+                if (indice, mois) in ecrits:
+                    # Mois déjà rencontré (commandes hors de l'ordre chronologique) : ajoutées à sa partition
+                    liste = list(data_manager.iter_commandes(data_manager.trouver_partition(mois))) + liste
+                data_manager.sauvegarder_partition(mois, liste)
+                ecrits.add((indice, mois))
+        for indice, dossier_fragment in enumerate(dossiers):
+            data_manager.utiliser_dossier(dossier_fragment)
+            data_manager.sauvegarder_collection("client", [client.to_dict() for id_client, client in source.depot.clients.items()
+                                                           if fragment_de(id_client, nb_fragments) == indice])
+        data_manager.utiliser_dossier(_dossier_stock(dossier))
+        data_manager.sauvegarder_collection("produit", [produit.to_dict() for produit in source.depot.produits.values()])
+    finally:
+        data_manager.utiliser_dossier(dossier_source)
+        source.fermer()
+    _ecrire_configuration(dossier, nb_fragments)  # En dernier : une répartition interrompue peut être refaite
+    return nombre
@@ -0,0 +1,334 @@
+# repository.py
+# Dépôt en mémoire des produits, clients et commandes, indexé par leur clé.
+# Toutes les recherches de la logique métier passent par ici pour éviter
+# les parcours complets des listes.
+# Les commandes sont chargées paresseusement : seul un résumé (numéro, client,
+# statut, date, total) est en mémoire au démarrage, l'objet Commande complet
+# est construit à la première demande. Les index secondaires sur les commandes
+# sont eux aussi construits au premier usage.
+# Les modifications de structure (ajouts, suppressions, index) se font sous
+# self.verrou pour permettre l'accès depuis plusieurs threads.
+# Les contrôles avant suppression d'un produit ou d'un client utilisent ces index
+# (nombre de commandes non annulées par produit et par client) sans parcourir
+# les commandes.
+# Les compteurs (valeur du stock, nombre et montant des commandes par statut)
+# sont calculés une fois au premier usage, puis mis à jour par différence à
+# chaque modification.
+import math
+import threading
+from exceptions import EntiteExistante
+from models import Commande, ResumeCommande
+
+
+class Compteurs:
+    """Agrégats de l'application, mis à jour par différence."""
+
+    def __init__(self):
+        self.valeur_stock = 0.0      # Somme de prix_unitaire x stock
+        self.nb_commandes = {}       # statut -> nombre de commandes
+        self.montant_commandes = {}  # statut -> somme des totaux
+
+    def compter_commande(self, statut, total, signe=1):
+        self.nb_commandes[statut] = self.nb_commandes.get(statut, 0) + signe
+        self.ajuster_montant(statut, signe * total)
+
+    def ajuster_montant(self, statut, difference):
+        self.montant_commandes[statut] = self.montant_commandes.get(statut, 0.0) + difference
+
+    def to_dict(self):
+        return {
+            "valeur_stock": round(self.valeur_stock, 2),
+            "commandes_en_cours": self.nb_commandes.get("En Cours", 0),
+            "chiffre_affaires": round(self.montant_commandes.get("Validée", 0.0), 2),
+            "commandes": {statut: {"nombre": nombre, "montant": round(self.montant_commandes[statut], 2)}
+                          for statut, nombre in self.nb_commandes.items() if nombre},
+        }
+
+    def ecarts(self, reference):
+        """Différences avec des compteurs recalculés (liste vide si tout concorde)."""
+        ecarts = []
+        if not math.isclose(self.valeur_stock, reference.valeur_stock, rel_tol=1e-9, abs_tol=1e-6):
+            ecarts.append(f"Valeur du stock : {self.valeur_stock} au lieu de {reference.valeur_stock}.")
+        for statut in set(self.nb_commandes) | set(reference.nb_commandes):
+            if self.nb_commandes.get(statut, 0) != reference.nb_commandes.get(statut, 0):
+                ecarts.append(f"Commandes '{statut}' : {self.nb_commandes.get(statut, 0)} "
+                              f"au lieu de {reference.nb_commandes.get(statut, 0)}.")
+            montant, attendu = self.montant_commandes.get(statut, 0.0), reference.montant_commandes.get(statut, 0.0)
+            if not math.isclose(montant, attendu, rel_tol=1e-9, abs_tol=1e-6):
+                ecarts.append(f"Montant des commandes '{statut}' : {montant} au lieu de {attendu}.")
+        return ecarts
+
+
+class Depot:
+    """Conteneur indexé des objets métier (accès en O(1) par clé)."""
+
+    def __init__(self, produits=(), clients=(), resumes=(), chargeur_commande=None):
+        self.verrou = threading.RLock()
+        # Index primaires (les dict Python conservent l'ordre d'insertion)
+        self.produits = {}   # reference -> Produit
+        self.clients = {}    # id_client -> Client
+        # numero_commande -> ResumeCommande (toutes les commandes)
+        self.resumes = {resume.numero_commande: resume for resume in resumes}
+        self._commandes = {} # numero_commande -> Commande (commandes déjà matérialisées)
+        # Fonction numero_commande -> dict complet, fournie par le support de stockage
+        self._chargeur_commande = chargeur_commande
+
+        # Index secondaires (sur les numéros de commande), None tant qu'ils ne sont pas construits
+        self._commandes_par_client = None   # id_client -> {numero_commande: None}
+        self._commandes_par_produit = None  # ref_produit -> {numero_commande: None} (hors commandes annulées)
+        self._nb_actives_par_client = None  # id_client -> nombre de commandes non annulées
+        self._compteurs = None              # Compteurs, None tant qu'ils ne sont pas calculés
+
+        for p in produits:
+            self.ajouter_produit(p)
+        for c in clients:
+            self.ajouter_client(c)
+
+    @property
+    def commandes_par_client(self):
+        with self.verrou:
+            if self._commandes_par_client is None:
+                index = {}
+                for resume in self.resumes.values():
+                    index.setdefault(resume.id_client, {})[resume.numero_commande] = None
+                self._commandes_par_client = index
+            return self._commandes_par_client
+
+    @property
+    def commandes_par_produit(self):
+        with self.verrou:
+            if self._commandes_par_produit is None:
+                index = {}
+                for resume in self.resumes.values():
+                    if resume.statut != "Annulée":
+                        for ref in resume.refs:
+                            index.setdefault(ref, {})[resume.numero_commande] = None
+                self._commandes_par_produit = index
+            return self._commandes_par_produit
+
+    @property
+    def nb_actives_par_client(self):
+        with self.verrou:
+            if self._nb_actives_par_client is None:
+                compte = {}
+                for resume in self.resumes.values():
+                    if resume.statut != "Annulée":
+                        compte[resume.id_client] = compte.get(resume.id_client, 0) + 1
+                self._nb_actives_par_client = compte
+            return self._nb_actives_par_client
+
+    @property
+    def compteurs(self):
+        with self.verrou:
+            if self._compteurs is None:
+                self._compteurs = self.recalculer_compteurs()
+            return self._compteurs
+
+    def recalculer_compteurs(self):
+        """Compteurs obtenus par un parcours complet des produits et des résumés de commandes."""
+        with self.verrou:
+            compteurs = Compteurs()
+            compteurs.valeur_stock = math.fsum(p.prix_unitaire * p.stock for p in self.produits.values())
+            for resume in self.resumes.values():
+                compteurs.compter_commande(resume.statut, resume.total)
+            return compteurs
+
+    def ajuster_valeur_stock(self, difference):
+        """A appeler après un changement de stock ou de prix (difference = variation de prix x stock)."""
+        with self.verrou:
+            if self._compteurs is not None:
+                self._compteurs.valeur_stock += difference
+
+    # --- Produits ---
+    def get_produit(self, reference):
+        return self.produits.get(reference)
+
+    def ajouter_produit(self, produit):
+        with self.verrou:
+            if produit.reference in self.produits:
+                raise EntiteExistante(f"Un produit avec la référence {produit.reference} existe déjà.")
+            self.produits[produit.reference] = produit
+            self.ajuster_valeur_stock(produit.prix_unitaire * produit.stock)
+
+    def supprimer_produit(self, reference):
+        """Retire le produit de l'index et le retourne (None s'il n'existe pas)."""
+        with self.verrou:
+            if self._commandes_par_produit is not None:
+                self._commandes_par_produit.pop(reference, None)
+            produit = self.produits.pop(reference, None)
+            if produit is not None:
+                self.ajuster_valeur_stock(-produit.prix_unitaire * produit.stock)
+            return produit
+
+    # --- Clients ---
+    def get_client(self, id_client):
+        return self.clients.get(id_client)
+
+    def ajouter_client(self, client):
+        with self.verrou:
+            if client.id_client in self.clients:
+                raise EntiteExistante(f"Un client avec l'ID {client.id_client} existe déjà.")
+            self.clients[client.id_client] = client
+
+    def supprimer_client(self, id_client):
+        """Retire le client de l'index et le retourne (None s'il n'existe pas)."""
+        with self.verrou:
+            return self.clients.pop(id_client, None)
+
+    # --- Commandes ---
+    def _indexer_resume(self, resume):
+        numero = resume.numero_commande
+        self.resumes[numero] = resume
+        if self._compteurs is not None:
+            self._compteurs.compter_commande(resume.statut, resume.total)
+        if self._commandes_par_client is not None:
+            self._commandes_par_client.setdefault(resume.id_client, {})[numero] = None
+        if resume.statut != "Annulée":
+            if self._nb_actives_par_client is not None:
+                self._nb_actives_par_client[resume.id_client] = self._nb_actives_par_client.get(resume.id_client, 0) + 1
+            if self._commandes_par_produit is not None:
+                for ref in resume.refs:
+                    self._commandes_par_produit.setdefault(ref, {})[numero] = None
+
+    def get_commande(self, numero_commande):
+        """Retourne la Commande complète, en la chargeant si besoin (None si inconnue)."""
+        commande = self._commandes.get(numero_commande)
+        if commande is None and numero_commande in self.resumes and self._chargeur_commande:
+            with self.verrou:
+                # Revérifier : un autre thread a pu la charger entre-temps
+                commande = self._commandes.get(numero_commande)
+                if commande is None:
+                    commande = Commande.from_dict(self._chargeur_commande(numero_commande))
+                    self._commandes[numero_commande] = commande
+        return commande
+
+    def iter_commandes(self):
+        """Parcourt toutes les commandes dans l'ordre de création (les charge au passage)."""
+        with self.verrou:
+            numeros = list(self.resumes)
+        for numero in numeros:
+            yield self.get_commande(numero)
+
+    def ajouter_commande(self, commande):
+        with self.verrou:
+            if commande.numero_commande in self.resumes:
+                raise EntiteExistante(f"Une commande avec le numéro {commande.numero_commande} existe déjà.")
+            self._commandes[commande.numero_commande] = commande
+            self._indexer_resume(ResumeCommande.depuis_commande(commande.to_dict()))
+
+    def supprimer_commande(self, numero_commande):
+        """Retire une commande qui vient d'être ajoutée (enregistrement impossible). Retourne son résumé."""
+        with self.verrou:
+            resume = self.resumes.pop(numero_commande, None)
+            if resume is None:
+                return None
+            self._commandes.pop(numero_commande, None)
+            if self._compteurs is not None:
+                self._compteurs.compter_commande(resume.statut, resume.total, -1)
+            if self._commandes_par_client is not None:
+                numeros = self._commandes_par_client.get(resume.id_client, {})
+                numeros.pop(numero_commande, None)
+                if not numeros:
+                    self._commandes_par_client.pop(resume.id_client, None)
+            if resume.statut != "Annulée":
+                if self._nb_actives_par_client is not None:
+                    restantes = self._nb_actives_par_client.get(resume.id_client, 0) - 1
+                    if restantes > 0:
+                        self._nb_actives_par_client[resume.id_client] = restantes
+                    else:
+                        self._nb_actives_par_client.pop(resume.id_client, None)
+                if self._commandes_par_produit is not None:
+                    for ref in resume.refs:
+                        numeros = self._commandes_par_produit.get(ref)
+                        if numeros is not None:
+                            numeros.pop(numero_commande, None)
+                            if not numeros:
+                                del self._commandes_par_produit[ref]
+            return resume
+
+    def indexer_ligne(self, commande, ref_produit):
+        """A appeler après l'ajout d'un produit à une commande."""
+        with self.verrou:
+            resume = self.resumes[commande.numero_commande]
+            if self._compteurs is not None:
+                self._compteurs.ajuster_montant(resume.statut, commande.total - resume.total)
+            resume.total = commande.total
+            if ref_produit not in resume.refs:
+                resume.refs.append(ref_produit)
+            if self._commandes_par_produit is not None and commande.statut != "Annulée":
+                self._commandes_par_produit.setdefault(ref_produit, {})[commande.numero_commande] = None
+
+    def desindexer_ligne(self, commande, ref_produit, ligne_retiree):
+        """A appeler après Commande.retirer_produit (ligne_retiree : sa valeur de retour)."""
+        with self.verrou:
+            resume = self.resumes[commande.numero_commande]
+            if self._compteurs is not None:
+                self._compteurs.ajuster_montant(resume.statut, commande.total - resume.total)
+            resume.total = commande.total
+            if ligne_retiree:
+                resume.refs.remove(ref_produit)
+                numeros = self._commandes_par_produit.get(ref_produit) if self._commandes_par_produit is not None else None
+                if numeros is not None:
+                    numeros.pop(commande.numero_commande, None)
+                    if not numeros:
+                        del self._commandes_par_produit[ref_produit]
+
+    def changer_statut(self, commande, statut):
+        """Change le statut d'une commande en tenant les index à jour."""
+        with self.verrou:
+            statut_precedent = commande.statut
+            commande.statut = statut
+            resume = self.resumes[commande.numero_commande]
+            resume.statut = statut
+            if self._compteurs is not None:
+                self._compteurs.compter_commande(statut_precedent, resume.total, -1)
+                self._compteurs.compter_commande(statut, resume.total)
+            if statut == "Annulée" and statut_precedent != "Annulée" and self._nb_actives_par_client is not None:
+                restantes = self._nb_actives_par_client.get(resume.id_client, 0) - 1
+                if restantes > 0:
+                    self._nb_actives_par_client[resume.id_client] = restantes
+                else:
+                    self._nb_actives_par_client.pop(resume.id_client, None)
+            if statut == "Annulée" and statut_precedent != "Annulée" and self._commandes_par_produit is not None:
+                for ref in resume.refs:
+                    numeros = self._commandes_par_produit.get(ref)
+                    if numeros is not None:
+                        numeros.pop(commande.numero_commande, None)
+                        if not numeros:
+                            del self._commandes_par_produit[ref]
+            if statut_precedent == "Annulée" and statut != "Annulée":
+                # Annulation défaite (enregistrement impossible) : la commande redevient active
+                if self._nb_actives_par_client is not None:
+                    self._nb_actives_par_client[resume.id_client] = self._nb_actives_par_client.get(resume.id_client, 0) + 1
+                if self._commandes_par_produit is not None:
+                    for ref in resume.refs:
+                        self._commandes_par_produit.setdefault(ref, {})[commande.numero_commande] = None
+
+    def commandes_client(self, id_client):
+        """Résumés des commandes du client."""
+        with self.verrou:
+            return [self.resumes[num] for num in self.commandes_par_client.get(id_client, {})]
+
+    def commandes_actives_client(self, id_client):
+        """Résumés des commandes non annulées du client."""
+        return [resume for resume in self.commandes_client(id_client) if resume.statut != "Annulée"]
+
+    # Contrôles avant suppression : comptes tenus à jour, sans parcourir les commandes
+    def nb_commandes_actives_client(self, id_client):
+        return self.nb_actives_par_client.get(id_client, 0)
+
+    def nb_commandes_actives_produit(self, ref_produit):
+        with self.verrou:
+            return len(self.commandes_par_produit.get(ref_produit, ()))
+
+    def commande_active_produit(self, ref_produit):
+        """Numéro d'une commande non annulée contenant le produit (None s'il n'est pas utilisé)."""
+        with self.verrou:
+            return next(iter(self.commandes_par_produit.get(ref_produit, ())), None)
+
+    def commande_en_dict(self, numero_commande):
+        """Dict complet d'une commande sans forcer la construction de l'objet Commande."""
+        commande = self._commandes.get(numero_commande)
+        if commande is not None:
+            return commande.to_dict()
+        return self._chargeur_commande(numero_commande)
@@ -0,0 +1,124 @@
+# reservations.py
+# Réservation du stock pour les commandes "En Cours".
+# Cycle de vie : le stock est réservé quand une ligne est ajoutée à la commande,
+# consommé (retiré du stock) à la validation et libéré à l'annulation.
+# Chaque opération porte sur toutes les lignes concernées et s'applique
+# entièrement ou pas du tout : en cas d'erreur, les lignes déjà traitées
+# sont remises dans leur état initial.
+# defaire() remet les produits dans leur état d'avant une opération dont
+# l'enregistrement a échoué.
+# Chaque opération verrouille les produits concernés (verrous par référence) :
+# plusieurs threads peuvent réserver et valider en parallèle sans survendre.
+from exceptions import EntiteIntrouvable
+from verrous import TableVerrous
+
+
+class GestionnaireReservations:
+    def __init__(self, depot):
+        self.depot = depot
+        self.verrous = TableVerrous()
+
+    def verrouiller(self, refs_produits):
+        """Verrouille des produits pour enchaîner plusieurs opérations (et leur sauvegarde) de façon atomique."""
+        return self.verrous.verrouiller(refs_produits)
+
+    def reconstruire(self):
+        """Recalcule les réservations à partir des commandes "En Cours" (au démarrage)."""
+        for produit in self.depot.produits.values():
+            produit.reserve = 0
+        for numero, resume in self.depot.resumes.items():
+            if resume.statut == "En Cours":
+                for ref_produit, quantite in self.depot.get_commande(numero).quantites_par_produit().items():
+                    produit = self.depot.get_produit(ref_produit)
+                    if produit:
+                        # Données existantes : on réserve même si le stock ne suffit plus
+                        produit.reserver(quantite, forcer=True)
+
+    def _lignes(self, quantites):
+        """[(Produit, quantite)] pour un dict {ref_produit: quantite}."""
+        lignes = []
+        for ref_produit, quantite in quantites.items():
+            produit = self.depot.get_produit(ref_produit)
+            if not produit:
+                raise EntiteIntrouvable(f"Produit {ref_produit} de la commande n'existe plus.")
+            lignes.append((produit, quantite))
+        return lignes
+
+    def _ajuster_valeur_stock(self, lignes, signe):
+        # Le stock a changé : compteur de valeur du stock du dépôt mis à jour par différence
+        self.depot.ajuster_valeur_stock(signe * sum(produit.prix_unitaire * quantite for produit, quantite in lignes))
+
+    @staticmethod
+    def _annuler_consommation(produit, quantite):
+        produit.stock += quantite
+        produit.reserve += quantite
+
+    @staticmethod
+    def _appliquer(lignes, operation, inverse):
+        # Tout ou rien : si une ligne échoue, on défait les précédentes
+        faites = []
+        try:
+            for produit, quantite in lignes:
+                operation(produit, quantite)
+                faites.append((produit, quantite))
+        except Exception:
+            for produit, quantite in reversed(faites):
+                inverse(produit, quantite)
+            raise
+        return [produit for produit, _ in lignes]
+
+    def reserver(self, quantites):
+        """Réserve les quantités {ref_produit: quantite} ; StockInsuffisant si une seule ne peut l'être."""
+        with self.verrouiller(quantites):
+            return self._appliquer(self._lignes(quantites),
+                                   lambda p, q: p.reserver(q),
+                                   lambda p, q: p.liberer(q))
+
+    def liberer(self, quantites):
+        """Rend disponibles les quantités réservées (annulation d'une commande "En Cours")."""
+        with self.verrouiller(quantites):
+            return self._appliquer(self._lignes(quantites),
+                                   lambda p, q: p.liberer(q),
+                                   lambda p, q: p.reserver(q, forcer=True))
+
+    def consommer(self, quantites):
+        """Retire du stock les quantités réservées (validation). Retourne les produits modifiés."""
+        with self.verrouiller(quantites):
+            lignes = self._lignes(quantites)
+            produits = self._appliquer(lignes, lambda p, q: p.consommer(q), self._annuler_consommation)
+            self._ajuster_valeur_stock(lignes, -1)
+            return produits
+
+    def restituer(self, quantites):
+        """Remet en stock les quantités d'une commande validée puis annulée."""
+        with self.verrouiller(quantites):
+            lignes = self._lignes(quantites)
+            produits = self._appliquer(lignes,
+                                       lambda p, q: p.mettre_a_jour_stock(q),
+                                       lambda p, q: p.mettre_a_jour_stock(-q))
+            self._ajuster_valeur_stock(lignes, 1)
+            return produits
+
+    def defaire(self, operation, quantites):
+        """Défait reserver, liberer, consommer ou restituer. Retourne les produits dont le stock a changé."""
+        with self.verrouiller(quantites):
+            lignes = self._lignes(quantites)
+            if operation == "reserver":
+                for produit, quantite in lignes:
+                    produit.liberer(quantite)
+                return []
+            if operation == "liberer":
+                for produit, quantite in lignes:
+                    produit.reserver(quantite, forcer=True)
+                return []
+            if operation == "consommer":
+                for produit, quantite in lignes:
+                    self._annuler_consommation(produit, quantite)
+                self._ajuster_valeur_stock(lignes, 1)
+            elif operation == "restituer":
+                for produit, quantite in lignes:
+                    produit.stock -= quantite
+                self._ajuster_valeur_stock(lignes, -1)
+            else:
+                raise ValueError(f"Opération de stock {operation} inconnue.")
+            return [produit for produit, _ in lignes]
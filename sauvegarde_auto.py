@@ -0,0 +1,62 @@
+# sauvegarde_auto.py
+# Sauvegarde en arrière-plan pour le menu interactif et le serveur HTTP.
+# Chaque modification est déjà écrite dans le journal ; ce thread compacte
+# régulièrement le journal dans les fichiers de données (seulement les
+# collections modifiées) pour que le démarrage suivant n'ait presque rien à
+# rejouer. Les fichiers sont écrits hors des verrous du dépôt (voir
+# StockageJSON.compacter) : les menus ne sont pas bloqués pendant l'écriture.
+# A l'arrêt (fermeture du service ou fin du programme), une dernière
+# sauvegarde est faite.
+import atexit
+import threading
+import time
+
+
+class SauvegardeAuto:
+    def __init__(self, service, intervalle):
+        self.service = service
+        self.intervalle = intervalle   # Secondes entre deux sauvegardes
+        self.nb_sauvegardes = 0
+        self.duree_derniere = None     # Durée (s) de la dernière sauvegarde
+        self.derniere_erreur = None
+        self._reveil = threading.Event()
+        self._arret = False
+        self._thread = threading.Thread(target=self._boucle, name="sauvegarde-auto", daemon=True)
+
+    def demarrer(self):
+        self._thread.start()
+        # Même si le programme s'arrête sur une exception, sans passer par fermer()
+        atexit.register(self.arreter)
+
+    def demander(self):
+        """Sauvegarde sans attendre la fin de l'intervalle (journal plein...)."""
+        self._reveil.set()
+
+    def _boucle(self):
+        while True:
+            self._reveil.wait(self.intervalle)
+            self._reveil.clear()
+            if self._arret:
+                return
+            self._sauvegarder()
+
+    def _sauvegarder(self):
+        try:
+            if self.service.stockage.a_des_modifications():
+                debut = time.perf_counter()
+                self.service.sauvegarder()
+                self.duree_derniere = time.perf_counter() - debut
+                self.nb_sauvegardes += 1
+        except Exception as e:  # Le thread continue : nouvel essai à l'intervalle suivant
+            self.derniere_erreur = e
+            print(f"Erreur: Sauvegarde automatique impossible ({e}).")
+
+    def arreter(self):
+        """Arrête le thread puis fait une dernière sauvegarde."""
+        if self._arret:
+            return
+        self._arret = True
+        self._reveil.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._sauvegarder()
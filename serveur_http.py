@@ -0,0 +1,290 @@
+# serveur_http.py
+# API HTTP/JSON (asyncio, bibliothèque standard uniquement) au-dessus de ServiceCommercial.
+# Plusieurs caisses ou la boutique en ligne peuvent créer, remplir et valider des
+# commandes en parallèle. Les appels au service (qui peuvent lire ou écrire sur le
+# disque, prendre les verrous du dépôt ou parcourir une collection entière) et la
+# mise en forme des pages sont exécutés dans un pool de threads : la boucle
+# d'événements ne fait que lire les requêtes et écrire les réponses.
+#
+# Routes :
+#   GET  /produits[?page=&taille=&q=]          GET  /produits/{ref}        POST /produits
+#   GET  /clients[?page=&taille=]              GET  /clients/{id}          POST /clients
+#   GET  /commandes[?page=&taille=&statut=&client=&debut=&fin=]            POST /commandes
+#   GET  /commandes/{num}                      GET  /commandes/{num}/recu  (texte)
+#   POST /commandes/{num}/lignes               {"ref_produit": ..., "quantite": ...}
+#   POST /commandes/{num}/validation           POST /commandes/{num}/annulation
+#   GET  /statistiques                         (valeur du stock, commandes par statut)
+#   GET  /metriques                            (durées des opérations, format Prometheus ; voir instrumentation.py)
+# Lancement : python main_app.py serveur --port 8080
+import asyncio
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import instrumentation
+from exceptions import (ErreurGestion, EntiteIntrouvable, EntiteExistante, DonneeInvalide,
+                        StockInsuffisant, StatutInvalide, EntiteUtilisee)
+
+TAILLE_PAGE_DEFAUT = 50
+TAILLE_PAGE_MAX = 500
+TAILLE_CORPS_MAX = 1 << 20  # 1 Mo
+
+# Code HTTP de chaque erreur métier (les autres ErreurGestion donnent 400)
+CODES_ERREUR = {
+    EntiteIntrouvable: 404,
+    EntiteExistante: 409,
+    EntiteUtilisee: 409,
+    StatutInvalide: 409,
+    StockInsuffisant: 409,
+    DonneeInvalide: 400,
+}
+
+MESSAGES_HTTP = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+                 405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+                 500: "Internal Server Error"}
+
+
+class ErreurRequete(Exception):
+    """Requête HTTP incorrecte (route inconnue, JSON invalide...)."""
+
+    def __init__(self, statut, message):
+        super().__init__(message)
+        self.statut = statut
+
+
+def paginer(elements, parametres, en_dict=lambda e: e.to_dict()):
+    """Découpe une liste selon ?page= (à partir de 1) et ?taille=."""
+    try:
+        page = max(1, int(parametres.get('page', 1)))
+        taille = min(TAILLE_PAGE_MAX, max(1, int(parametres.get('taille', TAILLE_PAGE_DEFAUT))))
+    except ValueError:
+        raise ErreurRequete(400, "Les paramètres page et taille doivent être des entiers.")
+    debut = (page - 1) * taille
+    return {"page": page, "taille": taille, "total": len(elements),
+            "elements": [en_dict(e) for e in elements[debut:debut + taille]]}
+
+
+def produit_en_dict(produit):
+    donnees = produit.to_dict()
+    donnees['disponible'] = produit.disponible()
+    return donnees
+
+
+class ServeurHTTP:
+    def __init__(self, service, nb_threads=8):
+        self.service = service
+        self.executeur = ThreadPoolExecutor(max_workers=nb_threads, thread_name_prefix="service")
+        # (méthode, motif du chemin, traitement) ; les groupes nommés sont passés au traitement
+        self.routes = [
+            ("GET", r"/produits", self.lister_produits),
+            ("POST", r"/produits", self.creer_produit),
+            ("GET", r"/produits/(?P<reference>[^/]+)", self.lire_produit),
+            ("GET", r"/clients", self.lister_clients),
+            ("POST", r"/clients", self.creer_client),
+            ("GET", r"/clients/(?P<id_client>[^/]+)", self.lire_client),
+            ("GET", r"/commandes", self.lister_commandes),
+            ("POST", r"/commandes", self.creer_commande),
+            ("GET", r"/commandes/(?P<numero>[^/]+)", self.lire_commande),
+            ("GET", r"/commandes/(?P<numero>[^/]+)/recu", self.lire_recu),
+            ("POST", r"/commandes/(?P<numero>[^/]+)/lignes", self.ajouter_ligne),
+            ("POST", r"/commandes/(?P<numero>[^/]+)/validation", self.valider),
+            ("POST", r"/commandes/(?P<numero>[^/]+)/annulation", self.annuler),
+            ("GET", r"/statistiques", self.statistiques),
+            ("GET", r"/metriques", self.metriques),
+        ]
+        self.routes = [(methode, re.compile(motif + "$"), traitement) for methode, motif, traitement in self.routes]
+
+    async def _executer(self, fonction, *args):
+        # Hors de la boucle d'événements : verrous, journal, lecture des commandes sur disque
+        return await asyncio.get_running_loop().run_in_executor(self.executeur, fonction, *args)
+
+    # --- Produits ---
+    async def lister_produits(self, parametres, corps):
+        if parametres.get('q'):
+            # Recherche : résultats classés par pertinence (index construit au premier appel)
+            produits = await self._executer(self.service.rechercher_produits, parametres['q'], None)
+        else:
+            produits = await self._executer(self.service.lister_produits)
+        return 200, await self._executer(paginer, produits, parametres, produit_en_dict)
+
+    async def lire_produit(self, parametres, corps, reference):
+        return 200, produit_en_dict(await self._executer(self.service.produit, reference))
+
+    async def creer_produit(self, parametres, corps):
+        produit = await self._executer(self.service.ajouter_produit, corps.get('nom'),
+                                       corps.get('prix_unitaire'), corps.get('stock', 0))
+        return 201, produit_en_dict(produit)
+
+    # --- Clients ---
+    async def lister_clients(self, parametres, corps):
+        clients = await self._executer(self.service.lister_clients)
+        return 200, await self._executer(paginer, clients, parametres)
+
+    async def lire_client(self, parametres, corps, id_client):
+        return 200, (await self._executer(self.service.client, id_client)).to_dict()
+
+    async def creer_client(self, parametres, corps):
+        client = await self._executer(self.service.ajouter_client, corps.get('nom', ""), corps.get('prenom', ""),
+                                      corps.get('adresse', ""), corps.get('telephone', ""), corps.get('email', ""))
+        return 201, client.to_dict()
+
+    # --- Commandes ---
+    async def lister_commandes(self, parametres, corps):
+        resumes = await self._executer(self.service.resumes_commandes, parametres.get('client'),
+                                       parametres.get('statut'), parametres.get('debut'), parametres.get('fin'))
+        return 200, await self._executer(paginer, resumes, parametres)
+
+    async def lire_commande(self, parametres, corps, numero):
+        return 200, (await self._executer(self.service.commande, numero)).to_dict()
+
+    async def lire_recu(self, parametres, corps, numero):
+        return 200, await self._executer(self.service.texte_recu, numero)
+
+    async def creer_commande(self, parametres, corps):
+        commande = await self._executer(self.service.creer_commande, corps.get('id_client'))
+        return 201, commande.to_dict()
+
+    async def ajouter_ligne(self, parametres, corps, numero):
+        try:
+            quantite = int(corps.get('quantite'))
+        except (TypeError, ValueError):
+            raise DonneeInvalide("La quantité doit être un nombre entier.")
+        commande = await self._executer(self.service.ajouter_ligne, numero, corps.get('ref_produit'), quantite)
+        return 200, commande.to_dict()
+
+    async def valider(self, parametres, corps, numero):
+        return 200, (await self._executer(self.service.valider, numero)).to_dict()
+
+    async def annuler(self, parametres, corps, numero):
+        statut_precedent = await self._executer(self.service.annuler, numero)
+        return 200, {"numero_commande": numero, "statut": "Annulée", "statut_precedent": statut_precedent}
+
+    async def statistiques(self, parametres, corps):
+        # Le premier appel recalcule tous les compteurs
+        return 200, await self._executer(self.service.statistiques)
+
+    async def metriques(self, parametres, corps):
+        return 200, instrumentation.format_prometheus()
+
+    # --- HTTP ---
+    async def traiter(self, methode, cible, corps):
+        """Exécute une requête et retourne (code HTTP, dict ou texte)."""
+        url = urlsplit(cible)
+        chemin = url.path.rstrip("/") or "/"
+        parametres = {cle: valeurs[-1] for cle, valeurs in parse_qs(url.query).items()}
+        try:
+            methode_existe = False
+            for methode_route, motif, traitement in self.routes:
+                correspondance = motif.match(chemin)
+                if correspondance is None:
+                    continue
+                methode_existe = True
+                if methode_route == methode:
+                    donnees = json.loads(corps) if corps else {}
+                    if not isinstance(donnees, dict):
+                        raise ErreurRequete(400, "Le corps de la requête doit être un objet JSON.")
+                    arguments = {cle: unquote(valeur) for cle, valeur in correspondance.groupdict().items()}
+                    debut, erreur = time.perf_counter(), True
+                    try:
+                        reponse = await traitement(parametres, donnees, **arguments)
+                        erreur = False
+                        return reponse
+                    finally:
+                        instrumentation.enregistrer(f"http.{traitement.__name__}", time.perf_counter() - debut, erreur)
+            if methode_existe:
+                raise ErreurRequete(405, f"Méthode {methode} non autorisée sur {chemin}.")
+            raise ErreurRequete(404, f"Route inconnue : {chemin}.")
+        except ErreurRequete as e:
+            return e.statut, {"erreur": str(e)}
+        except json.JSONDecodeError:
+            return 400, {"erreur": "Corps JSON invalide."}
+        except ErreurGestion as e:
+            statut = next((code for classe, code in CODES_ERREUR.items() if isinstance(e, classe)), 400)
+            return statut, {"erreur": str(e), "type": type(e).__name__}
+
+    async def traiter_connexion(self, lecteur, ecrivain):
+        # HTTP/1.1 avec connexions persistantes (keep-alive) : une requête après l'autre
+        try:
+            while True:
+                ligne = await lecteur.readline()
+                if not ligne:
+                    break
+                try:
+                    methode, cible, version = ligne.decode('latin-1').split()
+                except ValueError:
+                    await self._repondre(ecrivain, 400, {"erreur": "Ligne de requête invalide."}, False)
+                    break
+                entetes = {}
+                while True:
+                    ligne = await lecteur.readline()
+                    if ligne in (b"\r\n", b"\n", b""):
+                        break
+                    nom, _, valeur = ligne.decode('latin-1').partition(":")
+                    entetes[nom.strip().lower()] = valeur.strip()
+                garder = version == "HTTP/1.1" and entetes.get('connection', "").lower() != "close"
+                try:
+                    longueur = int(entetes.get('content-length') or 0)
+                except ValueError:
+                    longueur = -1
+                if longueur < 0:
+                    # Fin du corps inconnue : la connexion ne peut pas être réutilisée
+                    await self._repondre(ecrivain, 400, {"erreur": "En-tête Content-Length invalide."}, False)
+                    break
+                if longueur > TAILLE_CORPS_MAX:
+                    await self._repondre(ecrivain, 413, {"erreur": "Corps de requête trop volumineux."}, False)
+                    break
+                corps = await lecteur.readexactly(longueur) if longueur else b""
+                try:
+                    statut, donnees = await self.traiter(methode.upper(), cible, corps)
+                except Exception as e:  # Erreur inattendue : la connexion reste utilisable
+                    statut, donnees = 500, {"erreur": f"Erreur interne : {e}"}
+                await self._repondre(ecrivain, statut, donnees, garder)
+                if not garder:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            ecrivain.close()
+
+    async def _repondre(self, ecrivain, statut, donnees, garder):
+        if isinstance(donnees, str):
+            contenu, type_contenu = donnees.encode('utf-8'), "text/plain; charset=utf-8"
+        else:
+            contenu, type_contenu = json.dumps(donnees, ensure_ascii=False).encode('utf-8'), "application/json"
+        entete = (f"HTTP/1.1 {statut} {MESSAGES_HTTP.get(statut, '')}\r\n"
+                  f"Content-Type: {type_contenu}\r\n"
+                  f"Content-Length: {len(contenu)}\r\n"
+                  f"Connection: {'keep-alive' if garder else 'close'}\r\n\r\n")
+        ecrivain.write(entete.encode('latin-1') + contenu)
+        await ecrivain.drain()
+
+    async def demarrer(self, hote="127.0.0.1", port=8080):
+        """Ouvre le port d'écoute et retourne l'asyncio.Server (port=0 : port libre choisi par le système)."""
+        return await asyncio.start_server(self.traiter_connexion, hote, port)
+
+    def fermer(self):
+        self.executeur.shutdown(wait=True)
+
+
+def lancer(service, hote="127.0.0.1", port=8080, nb_threads=8):
+    """Sert l'API jusqu'à Ctrl+C, puis sauvegarde les données."""
+    serveur = ServeurHTTP(service, nb_threads)
+
+    async def servir():
+        ecoute = await serveur.demarrer(hote, port)
+        adresse = ecoute.sockets[0].getsockname()
+        print(f"API disponible sur http://{adresse[0]}:{adresse[1]} (Ctrl+C pour arrêter).")
+        async with ecoute:
+            await ecoute.serve_forever()
+
+    try:
+        asyncio.run(servir())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.fermer()
+        service.sauvegarder()
+        service.fermer()
+        print("Serveur arrêté, données sauvegardées.")
@@ -0,0 +1,509 @@
+# services.py
+# Couche de services : toutes les opérations métier, sans input() ni print().
+# Les méthodes reçoivent leurs paramètres en argument, retournent les objets
+# créés ou modifiés et signalent les refus par les exceptions de exceptions.py.
+# Les menus (business_logic.py) ne font que lire les saisies, appeler ces
+# méthodes et afficher les résultats ; tests, benchmarks et autres interfaces
+# les appellent directement.
+#
+# Accès concurrent : les opérations sur une commande se font sous le verrou de la
+# commande puis sous ceux de ses produits (toujours dans cet ordre), et sont
+# persistées avant de relâcher ces verrous pour que le journal suive l'ordre
+# réel des modifications. Les opérations sur la structure du dépôt (création,
+# suppression) passent par depot.verrou.
+import datetime
+import time
+import uuid
+import analytique
+import data_manager
+import instrumentation
+import recus
+from exceptions import ErreurGestion, EntiteIntrouvable, DonneeInvalide, StatutInvalide, EntiteUtilisee
+from import_commandes import RapportImport, verifier_commande_entrante
+from models import Produit, Client, Commande
+from recherche import IndexRecherche
+from rendu import CacheRendu
+from repository import Depot
+from reservations import GestionnaireReservations
+from sauvegarde_auto import SauvegardeAuto
+from stockage import ouvrir_stockage
+from verrous import TableVerrous
+
+
+class ServiceCommercial:
+    @instrumentation.mesure("service.demarrage")
+    def __init__(self, stockage=None, reservations=None):
+        # Pour les commandes, seuls les résumés sont chargés : le détail est lu à la demande.
+        self.stockage = stockage or ouvrir_stockage()
+        with data_manager.chargement_massif():
+            etat = self.stockage.charger()
+            creer_produit = Produit.depuis_instantane if "produit" in etat.get('confiance', ()) else Produit.from_dict
+            self.depot = Depot(
+                [creer_produit(p) for p in etat['produit'].values()],
+                [Client.from_dict(c) for c in etat['client'].values()],
+                etat['commande'].values(),
+                self.stockage.charger_commande)
+        # Stock tenu par ce service, ou par le coordinateur d'un déploiement réparti (voir repartition.py)
+        self.reservations = reservations or GestionnaireReservations(self.depot)
+        self.reservations.reconstruire()
+        self.verrous_commandes = TableVerrous()
+        self._recherche = None  # Index de recherche des produits, construit à la première recherche
+        self.rendus = CacheRendu()  # Textes des listes du menu, invalidés par _persister_lot
+        self._sauvegarde_auto = None
+
+    # --- Persistance ---
+    def _persister(self, type_entite, cle, objet=None, defaire=None):
+        # Chaque modification est persistée immédiatement (objet=None pour une suppression)
+        self._persister_lot([(type_entite, cle, objet)], defaire)
+
+    def _persister_lot(self, modifications, defaire=None):
+        # Un lot est écrit en une fois (une transaction en SQLite). Si l'écriture échoue, rien n'est
+        # enregistré : defaire() remet la mémoire dans l'état des fichiers avant que l'erreur remonte.
+        try:
+            self.stockage.enregistrer([(type_entite, cle, objet.to_dict() if objet is not None else None)
+                                       for type_entite, cle, objet in modifications])
+        except Exception:
+            if defaire is not None:
+                defaire()
+            for type_entite, cle, objet in modifications:
+                self.rendus.invalider(type_entite, cle, objet)
+            raise
+        for type_entite, cle, objet in modifications:
+            self.rendus.invalider(type_entite, cle, objet)
+        if self.stockage.doit_compacter():
+            if self._sauvegarde_auto is not None:
+                self._sauvegarde_auto.demander()  # Réécriture dans le thread de sauvegarde
+            else:
+                # Sans attendre : l'appelant peut tenir depot.verrou, que la compaction en cours attend
+                self.stockage.compacter(self.depot, attendre=False)
+
+    @instrumentation.mesure("service.sauvegarder")
+    def sauvegarder(self):
+        """Réécrit les fichiers de données si le journal contient des modifications."""
+        if self.stockage.a_des_modifications():
+            self.stockage.compacter(self.depot)
+
+    def demarrer_sauvegarde_auto(self, intervalle=None):
+        """Sauvegarde en arrière-plan toutes les intervalle secondes (data_manager.INTERVALLE_SAUVEGARDE_AUTO par défaut)."""
+        intervalle = data_manager.INTERVALLE_SAUVEGARDE_AUTO if intervalle is None else intervalle
+        if self._sauvegarde_auto is None and intervalle > 0:
+            self._sauvegarde_auto = SauvegardeAuto(self, intervalle)
+            self._sauvegarde_auto.demarrer()
+        return self._sauvegarde_auto
+
+    def fermer(self):
+        if self._sauvegarde_auto is not None:
+            self._sauvegarde_auto.arreter()  # Dernière sauvegarde
+        self.stockage.fermer()
+
+    # --- Produits ---
+    def produit(self, reference):
+        produit = self.depot.get_produit(reference)
+        if not produit:
+            raise EntiteIntrouvable(f"Produit {reference} non trouvé.")
+        return produit
+
+    def lister_produits(self):
+        return list(self.depot.produits.values())
+
+    def texte_produit(self, produit):
+        """Ligne affichée pour le produit dans la liste du menu (en cache)."""
+        return self.rendus.texte(("produit", produit.reference), lambda: (produit.afficher_details(), ()))
+
+    @property
+    def recherche(self):
+        with self.depot.verrou:
+            if self._recherche is None:
+                self._recherche = IndexRecherche(self.depot.produits.values())
+            return self._recherche
+
+    def _reindexer_produit(self, produit=None, reference=None):
+        # Tient l'index de recherche à jour (s'il a déjà été construit)
+        if self._recherche is not None:
+            if produit is not None:
+                self._recherche.indexer(produit)
+            else:
+                self._recherche.retirer(reference)
+
+    @instrumentation.mesure("service.rechercher_produits")
+    def rechercher_produits(self, terme, limite=20):
+        """Produits dont le nom contient les mots du terme (début de mot, sans tenir compte des accents), ou de référence égale au terme."""
+        return self.recherche.rechercher(terme, limite)
+
+    @instrumentation.mesure("service.ajouter_produit")
+    def ajouter_produit(self, nom, prix_unitaire, stock):
+        if not nom:
+            raise DonneeInvalide("Le nom ne peut pas être vide.")
+        reference = "PROD-" + str(uuid.uuid4())[:8].upper()
+        try:
+            produit = Produit(reference, nom, prix_unitaire, stock)
+        except (TypeError, ValueError) as e:
+            raise DonneeInvalide(str(e)) from e
+        with self.reservations.verrouiller([reference]):
+            self.depot.ajouter_produit(produit)
+            self._persister("produit", reference, produit, lambda: self.depot.supprimer_produit(reference))
+            self._reindexer_produit(produit)
+        return produit
+
+    @instrumentation.mesure("service.modifier_produit")
+    def modifier_produit(self, reference, nom=None, prix_unitaire=None):
+        """Change le nom et/ou le prix (None : inchangé)."""
+        if prix_unitaire is not None and prix_unitaire <= 0:
+            raise DonneeInvalide("Le prix doit être positif.")
+        with self.reservations.verrouiller([reference]):
+            produit = self.produit(reference)
+            ancien_nom, ancien_prix = produit.nom, produit.prix_unitaire
+            produit.modifier_produit(nom=nom, prix_unitaire=prix_unitaire)
+            self.depot.ajuster_valeur_stock((produit.prix_unitaire - ancien_prix) * produit.stock)
+
+            def defaire():
+                self.depot.ajuster_valeur_stock((ancien_prix - produit.prix_unitaire) * produit.stock)
+                produit.modifier_produit(nom=ancien_nom, prix_unitaire=ancien_prix)
+            self._persister("produit", reference, produit, defaire)
+            if nom:
+                self._reindexer_produit(produit)
+        return produit
+
+    @instrumentation.mesure("service.supprimer_produit")
+    def supprimer_produit(self, reference):
+        # Sous le verrou du produit : aucune commande ne peut l'ajouter pendant la vérification
+        with self.reservations.verrouiller([reference]):
+            numero = self.depot.commande_active_produit(reference)
+            if numero is not None:
+                raise EntiteUtilisee(f"Produit {reference} est dans la commande {numero}.")
+            produit = self.depot.supprimer_produit(reference)
+            if not produit:
+                raise EntiteIntrouvable(f"Produit {reference} non trouvé.")
+            self._persister("produit", reference, None, lambda: self.depot.ajouter_produit(produit))
+            self._reindexer_produit(reference=reference)
+        return produit
+
+    @instrumentation.mesure("service.supprimer_produits")
+    def supprimer_produits(self, references):
+        """Supprime en une fois (un seul lot persisté) les produits qu'aucune commande active n'utilise.
+
+        Retourne (produits supprimés, [(référence, motif)] des produits conservés).
+        """
+        references = list(dict.fromkeys(references))
+        supprimes, refus = [], []
+        with self.reservations.verrouiller(references):
+            for reference in references:
+                numero = self.depot.commande_active_produit(reference)
+                if numero is not None:
+                    refus.append((reference, f"dans la commande {numero}"))
+                    continue
+                produit = self.depot.supprimer_produit(reference)
+                if not produit:
+                    refus.append((reference, "non trouvé"))
+                    continue
+                supprimes.append(produit)
+            if supprimes:
+                def defaire():
+                    for produit in supprimes:
+                        self.depot.ajouter_produit(produit)
+                self._persister_lot([("produit", produit.reference, None) for produit in supprimes], defaire)
+                for produit in supprimes:
+                    self._reindexer_produit(reference=produit.reference)
+        return supprimes, refus
+
+    def produits_inutilises(self, stock_nul=True):
+        """Références des produits qu'aucune commande active n'utilise (et sans stock si stock_nul)."""
+        with self.depot.verrou:
+            return [p.reference for p in self.depot.produits.values()
+                    if (not stock_nul or p.stock == 0) and not self.depot.nb_commandes_actives_produit(p.reference)]
+
+    # --- Clients ---
+    def client(self, id_client):
+        client = self.depot.get_client(id_client)
+        if not client:
+            raise EntiteIntrouvable(f"Client {id_client} non trouvé.")
+        return client
+
+    def lister_clients(self):
+        return list(self.depot.clients.values())
+
+    def _nouvel_id_client(self):
+        return "CLI-" + str(uuid.uuid4())[:8].upper()
+
+    @instrumentation.mesure("service.ajouter_client")
+    def ajouter_client(self, nom, prenom, adresse, telephone="", email=""):
+        id_client = self._nouvel_id_client()
+        client = Client(id_client, nom, prenom, adresse, telephone, email)
+        with self.depot.verrou:
+            self.depot.ajouter_client(client)
+            self._persister("client", id_client, client, lambda: self.depot.supprimer_client(id_client))
+        return client
+
+    @instrumentation.mesure("service.supprimer_client")
+    def supprimer_client(self, id_client):
+        # Sous le verrou du dépôt : aucune commande ne peut être créée pour ce client entre-temps
+        with self.depot.verrou:
+            if self.depot.nb_commandes_actives_client(id_client):
+                exemple = self.depot.commandes_actives_client(id_client)[0]  # Pour le message seulement
+                raise EntiteUtilisee(f"Client {id_client} a des commandes actives "
+                                     f"(ex: {exemple.numero_commande}).")
+            client = self.depot.supprimer_client(id_client)
+            if not client:
+                raise EntiteIntrouvable(f"Client {id_client} non trouvé.")
+            self._persister("client", id_client, None, lambda: self.depot.ajouter_client(client))
+        return client
+
+    # --- Commandes ---
+    def _nouveau_numero_commande(self):
+        # Le suffixe aléatoire est court : on en tire un autre en cas de collision
+        while True:
+            num_commande = "CMD-" + datetime.datetime.now().strftime("%Y%m%d") + "-" + str(uuid.uuid4())[:4].upper()
+            if num_commande not in self.depot.resumes:
+                return num_commande
+
+    def commande(self, numero_commande):
+        commande = self.depot.get_commande(numero_commande)
+        if not commande:
+            raise EntiteIntrouvable(f"Commande {numero_commande} non trouvée.")
+        return commande
+
+    def lister_commandes(self):
+        """Itère sur les commandes dans l'ordre de création (chargées à la demande)."""
+        return self.depot.iter_commandes()
+
+    def iter_resumes_commandes(self, id_client=None, statut=None, date_debut=None, date_fin=None):
+        """Parcourt les résumés des commandes (sans charger leur détail) dans l'ordre de création.
+
+        Filtres facultatifs : client, statut et période (date_debut / date_fin "AAAA-MM-JJ", incluses).
+        """
+        for date in (date_debut, date_fin):
+            if date is not None:
+                try:
+                    datetime.datetime.strptime(date, "%Y-%m-%d")
+                except ValueError:
+                    raise DonneeInvalide(f"Date {date} invalide (format attendu : AAAA-MM-JJ).")
+        if id_client is not None:
+            resumes = self.depot.commandes_client(id_client)
+        else:
+            with self.depot.verrou:
+                resumes = list(self.depot.resumes.values())
+        for resume in resumes:
+            if ((statut is None or resume.statut == statut)
+                    and (date_debut is None or resume.date_creation[:10] >= date_debut)
+                    and (date_fin is None or resume.date_creation[:10] <= date_fin)):
+                yield resume
+
+    def resumes_commandes(self, id_client=None, statut=None, date_debut=None, date_fin=None):
+        """Résumés des commandes filtrés (voir iter_resumes_commandes), en liste."""
+        return list(self.iter_resumes_commandes(id_client, statut, date_debut, date_fin))
+
+    def texte_commande(self, numero_commande):
+        """Détail affiché pour la commande dans la liste du menu (en cache)."""
+        def rendre():
+            commande = self.commande(numero_commande)
+            dependances = {("client", commande.id_client)}
+            dependances.update(("produit", item.ref_produit) for item in commande.produits_commandes)
+            return commande.afficher_commande(self.depot.clients, self.depot.produits), dependances
+        return self.rendus.texte(("commande", numero_commande), rendre)
+
+    @instrumentation.mesure("service.creer_commande")
+    def creer_commande(self, id_client):
+        date_creation = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.depot.verrou:
+            self.client(id_client)
+            commande = Commande(self._nouveau_numero_commande(), date_creation, id_client)
+            self.depot.ajouter_commande(commande)
+            self._persister("commande", commande.numero_commande, commande,
+                            lambda: self.depot.supprimer_commande(commande.numero_commande))
+        return commande
+
+    @instrumentation.mesure("service.ajouter_ligne")
+    def ajouter_ligne(self, numero_commande, ref_produit, quantite):
+        """Ajoute une quantité d'un produit à une commande "En Cours" en réservant le stock."""
+        if quantite <= 0:
+            raise DonneeInvalide("La quantité doit être positive.")
+        commande = self.commande(numero_commande)
+        with self.verrous_commandes.verrouiller([numero_commande]), self.reservations.verrouiller([ref_produit]):
+            if commande.statut != "En Cours":
+                raise StatutInvalide(f"La commande {numero_commande} n'est pas 'En Cours'.")
+            produit = self.produit(ref_produit)
+            self.reservations.reserver({ref_produit: quantite})
+            commande.ajouter_produit(ref_produit, quantite, produit.prix_unitaire)
+            self.depot.indexer_ligne(commande, ref_produit)
+
+            def defaire():
+                self.depot.desindexer_ligne(commande, ref_produit, commande.retirer_produit(ref_produit, quantite))
+                self.reservations.defaire("reserver", {ref_produit: quantite})
+            self._persister("commande", numero_commande, commande, defaire)
+        return commande
+
+    @instrumentation.mesure("service.valider")
+    def valider(self, numero_commande):
+        """Valide une commande "En Cours" : le stock réservé sort du stock. Retourne la commande."""
+        commande = self.commande(numero_commande)
+        # Les vérifications sont faites sous le verrou : deux validations simultanées
+        # de la même commande ne retirent le stock qu'une fois
+        with self.verrous_commandes.verrouiller([numero_commande]):
+            if commande.statut != "En Cours":
+                raise StatutInvalide(f"La commande est déjà '{commande.statut}'.")
+            if not commande.produits_commandes:
+                raise StatutInvalide("Impossible de valider une commande vide.")
+            quantites = commande.quantites_par_produit()
+            with self.reservations.verrouiller(quantites):
+                # Toutes les lignes ou aucune (les lignes déjà traitées sont remises en cas d'erreur)
+                produits_modifies = self.reservations.consommer(quantites)
+                self.depot.changer_statut(commande, "Validée")
+
+                def defaire():
+                    self.depot.changer_statut(commande, "En Cours")
+                    self.reservations.defaire("consommer", quantites)
+                # Stocks et statut persistés ensemble, ou tous deux défaits
+                modifications = [("produit", produit.reference, produit) for produit in produits_modifies]
+                modifications.append(("commande", numero_commande, commande))
+                self._persister_lot(modifications, defaire)
+        return commande
+
+    @instrumentation.mesure("service.annuler")
+    def annuler(self, numero_commande):
+        """Annule une commande : stock restitué si elle était validée, réservations libérées sinon.
+
+        Retourne le statut qu'avait la commande avant l'annulation.
+        """
+        commande = self.commande(numero_commande)
+        with self.verrous_commandes.verrouiller([numero_commande]):
+            statut_precedent = commande.statut
+            if statut_precedent == "Annulée":
+                raise StatutInvalide(f"La commande {numero_commande} est déjà annulée.")
+            quantites = commande.quantites_par_produit()
+            with self.reservations.verrouiller(quantites):
+                produits_modifies = []
+                if statut_precedent == "Validée":
+                    operation = "restituer"
+                    produits_modifies = self.reservations.restituer(quantites) # Rajouter au stock
+                else:
+                    operation = "liberer"
+                    self.reservations.liberer(quantites) # Libérer les réservations
+                self.depot.changer_statut(commande, "Annulée")
+
+                def defaire():
+                    self.depot.changer_statut(commande, statut_precedent)
+                    self.reservations.defaire(operation, quantites)
+                modifications = [("produit", produit.reference, produit) for produit in produits_modifies]
+                modifications.append(("commande", numero_commande, commande))
+                self._persister_lot(modifications, defaire)
+        return statut_precedent
+
+    def _donnees_recu(self, donnees):
+        # Tuple attendu par recus.rendre_recu, à partir du dict d'une commande
+        client = self.depot.get_client(donnees['id_client'])
+        client_nom = f"{client.prenom} {client.nom}" if client else "Client Inconnu"
+        lignes = []
+        for item in donnees.get('produits_commandes', []):
+            produit = self.depot.get_produit(item['ref_produit'])
+            lignes.append((produit.nom if produit else "Produit Inconnu", item['quantite'], item['prix_vente']))
+        return (donnees['numero_commande'], donnees['date_creation'], client_nom, donnees['id_client'],
+                donnees.get('statut', "En Cours"), lignes, float(donnees.get('total', 0.0)))
+
+    @instrumentation.mesure("service.texte_recu")
+    def texte_recu(self, numero_commande):
+        return recus.rendre_recu(self._donnees_recu(self.commande(numero_commande).to_dict()))
+
+    @instrumentation.mesure("service.generer_recu")
+    def generer_recu(self, numero_commande):
+        """Ecrit le reçu de la commande dans data/recus/ et retourne le chemin du fichier."""
+        contenu_recu = self.texte_recu(numero_commande)
+        nom_fichier = recus.nom_fichier_recu(numero_commande)
+        chemin = data_manager.sauvegarder_recu_txt(nom_fichier, contenu_recu)
+        if chemin is None:
+            raise ErreurGestion(f"Impossible d'écrire le reçu {nom_fichier}.")
+        return chemin
+
+    def selectionner_commandes(self, date_debut=None, date_fin=None, statut=None, id_client=None):
+        """Numéros des commandes filtrées par période, statut et client (voir iter_resumes_commandes)."""
+        return [r.numero_commande for r in self.iter_resumes_commandes(id_client, statut, date_debut, date_fin)]
+
+    @instrumentation.mesure("service.generer_recus")
+    def generer_recus(self, date_debut=None, date_fin=None, statut="Validée", id_client=None,
+                      archive=None, processus=None):
+        """Génère en masse les reçus des commandes filtrées (voir recus.py). Retourne un RapportRecus."""
+        numeros = self.selectionner_commandes(date_debut, date_fin, statut, id_client)
+        # Les commandes non chargées sont lues une à une sans être gardées en mémoire
+        donnees = (self._donnees_recu(self.depot.commande_en_dict(num)) for num in numeros)
+        return recus.generer_recus(donnees, data_manager.RECUS_DIR, archive, processus)
+
+    # --- Statistiques ---
+    @instrumentation.mesure("service.statistiques")
+    def statistiques(self):
+        """Valeur du stock, nombre et montant des commandes par statut (compteurs, sans parcours)."""
+        with self.depot.verrou:
+            return self.depot.compteurs.to_dict()
+
+    def verifier_statistiques(self):
+        """Compare les compteurs à un recalcul complet. Retourne la liste des écarts (vide si tout concorde)."""
+        with self.depot.verrou:
+            return self.depot.compteurs.ecarts(self.depot.recalculer_compteurs())
+
+    @instrumentation.mesure("service.ventes")
+    def ventes(self, date_debut=None, date_fin=None):
+        """Lignes des commandes validées de la période, chargées en colonnes (voir analytique.py)."""
+        # Seules les partitions de la période lues en flux, les commandes du journal prises dans le dépôt :
+        # pas de compaction pour un rapport
+        return analytique.charger_ventes(self.stockage.iter_commandes(date_debut, date_fin, depot=self.depot),
+                                         date_debut, date_fin)
+
+    # --- Import / export ---
+    @instrumentation.mesure("service.importer_commandes")
+    def importer_commandes(self, commandes_entrantes):
+        """Crée et valide en lot des commandes reçues hors menu (voir import_commandes.py).
+
+        Chaque commande est acceptée entièrement ou rejetée avec un motif ; toutes les
+        modifications sont persistées en une seule écriture à la fin.
+        """
+        rapport = RapportImport()
+        debut = time.perf_counter()
+        date_creation = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        modifications = []
+        produits_modifies = {}
+        acceptees = []  # (numero_commande, demandes), pour défaire l'import si l'écriture échoue
+        for entree in commandes_entrantes:
+            reference_externe = entree['reference_externe']
+            motif, demandes = verifier_commande_entrante(self.depot, entree)
+            if motif:
+                rapport.rejetees.append((reference_externe, motif))
+                continue
+            with self.reservations.verrouiller(demandes):
+                # Stock vérifié pour toutes les lignes : réservation puis sortie de stock.
+                # Un autre thread a pu prendre le stock entre la vérification et le verrou.
+                try:
+                    self.reservations.reserver(demandes)
+                except ErreurGestion as e:
+                    rapport.rejetees.append((reference_externe, str(e)))
+                    continue
+                for produit in self.reservations.consommer(demandes):
+                    produits_modifies[produit.reference] = produit
+                commande = Commande(None, date_creation, entree['id_client'])
+                for ref_produit, quantite in entree['lignes']:
+                    commande.ajouter_produit(ref_produit, int(quantite), self.depot.get_produit(ref_produit).prix_unitaire)
+                commande.statut = "Validée"
+                with self.depot.verrou:
+                    commande.numero_commande = self._nouveau_numero_commande()
+                    self.depot.ajouter_commande(commande)
+            modifications.append(("commande", commande.numero_commande, commande))
+            acceptees.append((commande.numero_commande, demandes))
+            rapport.acceptees.append((reference_externe, commande.numero_commande))
+        modifications.extend(("produit", ref, produit) for ref, produit in produits_modifies.items())
+
+        def defaire():
+            # Commandes retirées du dépôt, stock remis et réservations libérées
+            for numero, demandes in reversed(acceptees):
+                self.depot.supprimer_commande(numero)
+                self.reservations.defaire("consommer", demandes)
+                self.reservations.defaire("reserver", demandes)
+        if modifications:
+            # Les stocks sont écrits sous le verrou de leurs produits (état courant, dans l'ordre)
+            with self.reservations.verrouiller(produits_modifies):
+                self._persister_lot(modifications, defaire)
+        rapport.duree = time.perf_counter() - debut
+        return rapport
+
+    @instrumentation.mesure("service.exporter_commandes")
+    def exporter_commandes(self, chemin, statut=None):
+        """Exporte en flux les commandes (d'un statut donné) dans un fichier JSON. Retourne leur nombre."""
+        numeros = [num for num, resume in self.depot.resumes.items() if statut is None or resume.statut == statut]
+        data_manager.sauvegarder_donnees_json_flux(chemin, (self.depot.commande_en_dict(num) for num in numeros))
+        return len(numeros)
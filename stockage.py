@@ -0,0 +1,547 @@
+# stockage.py
+# Supports de stockage interchangeables pour GestionCommercialeApp.
+# Les deux implémentations exposent la même interface :
+#   charger()                -> {"produit": {cle: dict}, "client": {cle: dict}, "commande": {cle: ResumeCommande},
+#                                "confiance": types dont les dicts peuvent être utilisés sans contrôle}
+#   charger_commande(numero) -> dict complet d'une commande, lu à la demande
+#   iter_commandes(date_debut=None, date_fin=None) -> commandes de la période ("AAAA-MM-JJ"), en flux
+#   enregistrer(modifs)      -> persiste une liste de (type, cle, dict ou None pour une suppression)
+#   a_des_modifications()    -> True s'il reste des modifications à compacter
+#   doit_compacter()
+#   compacter(depot, attendre=True) -> écrit l'état complet du dépôt (prend lui-même depot.verrou) ;
+#                                attendre=False : rien si une compaction est déjà en cours
+#   fermer()
+# Le support utilisé est choisi par data_manager.BACKEND_STOCKAGE.
+# Les méthodes peuvent être appelées depuis plusieurs threads : chaque support
+# sérialise ses accès au disque (ou à la connexion) avec son propre verrou.
+import collections
+import contextlib
+import itertools
+import os
+import sqlite3
+import threading
+import data_manager
+import instrumentation
+from journal import Journal
+from models import ResumeCommande
+
+LECTEURS_OUVERTS = 4  # Partitions gardées ouvertes (ou décompressées) pour relire des commandes
+
+
+class StockageJSON:
+    """Fichiers de données complets (JSON ou binaire, voir data_manager.FORMAT_INSTANTANE) + journal des modifications.
+
+    Les commandes sont réparties en partitions mensuelles (data_manager.COMMANDES_DIR) : une
+    sauvegarde ne réécrit que les mois modifiés, et les mois anciens sont archivés compressés.
+    """
+
+    def __init__(self, journal=None):
+        self.journal = journal or Journal()
+        self._verrou = threading.RLock()
+        self._fichiers = {}              # mois -> fichier de la partition décrit par _positions
+        self._positions = {}             # mois -> {numero_commande: position (octets) dans la partition}
+        self._mois_commande = {}         # numero_commande -> mois de sa partition
+        self._lecteurs = collections.OrderedDict()  # mois -> partition ouverte pour relire une commande
+        self._commandes_en_memoire = {}  # Commandes "En Cours" des index et commandes du journal
+        self._a_convertir = set()        # Collections lues dans un autre format que celui configuré
+        self._verrou_compaction = threading.Lock()  # Une seule compaction à la fois
+
+    @instrumentation.mesure("stockage.charger")
+    def charger(self):
+        liste_produits, fichier_produits = data_manager.charger_collection("produit")
+        liste_clients, fichier_clients = data_manager.charger_collection("client")
+        produits = {p['reference']: p for p in liste_produits}
+        clients = {c['id_client']: c for c in liste_clients}
+        # Les fichiers binaires ne sont écrits que par l'application (à partir d'objets déjà
+        # contrôlés), comme le journal : leurs données sont reprises sans nouveau contrôle.
+        confiance = set()
+        for type_entite, fichier in (("produit", fichier_produits), ("client", fichier_clients)):
+            if fichier != data_manager.chemin_collection(type_entite):
+                self._a_convertir.add(type_entite)
+            elif data_manager.est_binaire(fichier):
+                confiance.add(type_entite)
+        resumes = {r.numero_commande: r for r in self._charger_index_commandes()}
+        collections = {"produit": produits, "client": clients}
+        for entree in self.journal.relire():
+            cle, donnees = entree['cle'], entree['donnees']
+            if entree['type'] == "commande":
+                if donnees is None:
+                    resumes.pop(cle, None)
+                    self._commandes_en_memoire.pop(cle, None)
+                else:
+                    resumes[cle] = ResumeCommande.depuis_commande(donnees)
+                    self._commandes_en_memoire[cle] = donnees
+            elif donnees is None:
+                collections[entree['type']].pop(cle, None)
+            else:
+                collections[entree['type']][cle] = donnees
+        return {"produit": produits, "client": clients, "commande": resumes, "confiance": confiance}
+
+    def _charger_index_commandes(self):
+        ancien = data_manager.trouver_fichier("commande")
+        if any(os.path.exists(g) for g in data_manager.generations(ancien)):
+            self._migrer_fichier_unique(ancien)
+        resumes = []
+        for mois in data_manager.partitions():
+            resumes.extend(self._charger_partition(mois))
+        return resumes
+
+    def _charger_partition(self, mois):
+        fichier = data_manager.trouver_partition(mois)
+        index = data_manager.charger_donnees_json(data_manager.chemin_index_partition(mois))
+        # Un index valide reste utilisable si la partition est dans un autre format ou vient d'être
+        # archivée : elle est réécrite à la sauvegarde suivante (voir _partitions_a_reecrire).
+        if (isinstance(index, dict) and index.get('fichier') == os.path.basename(fichier)
+                and index.get('source') == data_manager.signature_fichier(fichier)):
+            colonnes = index['colonnes']
+            numeros = colonnes['numero_commande']
+            self._fichiers[mois] = fichier
+            self._positions[mois] = dict(zip(numeros, colonnes['position']))
+            self._mois_commande.update(dict.fromkeys(numeros, mois))
+            self._commandes_en_memoire.update((d['numero_commande'], d) for d in index['en_cours'])
+            return list(map(ResumeCommande, numeros, colonnes['date_creation'],
+                            colonnes['id_client'], colonnes['total'], colonnes['statut'],
+                            [refs.split(" ") if refs else [] for refs in colonnes['refs']]))
+        # Index absent ou périmé (partition modifiée à la main...) : la partition est relue en
+        # flux et réécrite au format configuré, ce qui reconstruit l'index.
+        # Un fichier corrompu est remplacé par sa génération intacte la plus récente.
+        return self._ecrire_partition(mois, data_manager.iter_commandes(data_manager.fichier_intact(fichier)))[0]
+
+    def _migrer_fichier_unique(self, ancien):
+        """Répartit l'ancien fichier unique des commandes en partitions mensuelles, puis le supprime."""
+        ecrits, retardataires = set(), {}
+        commandes = data_manager.iter_commandes(data_manager.fichier_intact(ancien))
+        for mois, groupe in itertools.groupby(commandes, key=lambda cmd: data_manager.mois_de(cmd['date_creation'])):
+            if mois in ecrits:
+                # Commande hors de l'ordre chronologique : ajoutée ensuite à la partition de son mois
+                retardataires.setdefault(mois, []).extend(groupe)
+                continue
+            if not self._ecrire_partition(mois, groupe)[1]:
+                return  # L'ancien fichier est gardé : nouvel essai au prochain démarrage
+            ecrits.add(mois)
+        for mois, groupe in retardataires.items():
+            dans_partition = data_manager.iter_commandes(self._fichiers[mois])
+            if not self._ecrire_partition(mois, itertools.chain(dans_partition, groupe))[1]:
+                return
+        data_manager.supprimer_fichier_unique_commandes()
+
+    def _ecrire_partition(self, mois, commandes):
+        """Ecrit la partition du mois en flux depuis un itérable de dicts, puis son index.
+
+        Retourne (résumés, True si le fichier a été écrit).
+        """
+        resumes, en_cours = [], []
+
+        def parcourir():
+            for cmd in commandes:
+                resume = ResumeCommande.depuis_commande(cmd)
+                resumes.append(resume)
+                if resume.statut == "En Cours":
+                    en_cours.append(cmd)
+                yield cmd
+
+        fichier, positions = data_manager.sauvegarder_partition(mois, parcourir())
+        if positions is None:
+            return resumes, False
+        numeros = [r.numero_commande for r in resumes]
+        with self._verrou:
+            self._fermer_lecteur(mois)  # L'ancien fichier a été remplacé
+            for num in itertools.chain(self._positions.get(mois, ()), numeros):
+                self._commandes_en_memoire.pop(num, None)
+                self._mois_commande.pop(num, None)
+            self._fichiers[mois] = fichier
+            self._positions[mois] = dict(zip(numeros, positions))
+            self._mois_commande.update(dict.fromkeys(numeros, mois))
+            self._commandes_en_memoire.update((cmd['numero_commande'], cmd) for cmd in en_cours)
+
+        # Stockage en colonnes : bien plus rapide à relire qu'une liste d'objets JSON.
+        # Les références de produits (générées, sans espace) sont jointes par des espaces.
+        colonnes = {
+            "numero_commande": numeros,
+            "date_creation": [r.date_creation for r in resumes],
+            "id_client": [r.id_client for r in resumes],
+            "total": [r.total for r in resumes],
+            "statut": [r.statut for r in resumes],
+            "refs": [" ".join(r.refs) for r in resumes],
+            "position": positions,
+        }
+        data_manager.sauvegarder_donnees_json(data_manager.chemin_index_partition(mois), {
+            "fichier": os.path.basename(fichier),
+            "source": data_manager.signature_fichier(fichier),
+            "colonnes": colonnes,
+            "en_cours": en_cours,
+        }, compact=True)
+        return resumes, True
+
+    def _supprimer_partition(self, mois):
+        """Partition dont toutes les commandes ont été supprimées."""
+        with self._verrou:
+            self._fermer_lecteur(mois)
+            for num in self._positions.pop(mois, ()):
+                self._commandes_en_memoire.pop(num, None)
+                self._mois_commande.pop(num, None)
+            self._fichiers.pop(mois, None)
+        data_manager.supprimer_partition(mois)
+        return True
+
+    def charger_commande(self, numero_commande):
+        with self._verrou:  # Les lecteurs partagés se déplacent dans les fichiers
+            donnees = self._commandes_en_memoire.get(numero_commande)
+            if donnees is None:
+                mois = self._mois_commande[numero_commande]
+                donnees = data_manager.lire_commande(self._lecteur(mois), self._positions[mois][numero_commande])
+            return donnees
+
+    def _lecteur(self, mois):
+        lecteur = self._lecteurs.get(mois)
+        if lecteur is None:
+            lecteur = self._lecteurs[mois] = data_manager.ouvrir_partition(self._fichiers[mois])
+            if len(self._lecteurs) > LECTEURS_OUVERTS:
+                # Partitions archivées décompressées en mémoire : seules les plus récemment lues sont gardées
+                self._lecteurs.popitem(last=False)[1].close()
+        else:
+            self._lecteurs.move_to_end(mois)
+        return lecteur
+
+    def iter_commandes(self, date_debut=None, date_fin=None, depot=None):
+        """Commandes des partitions de la période (toutes par défaut), lues en flux.
+
+        Sans depot, le journal est ignoré : compacter avant. Avec depot, les commandes
+        modifiées depuis la dernière compaction sont prises dans le dépôt (à la fin, hors
+        de l'ordre des partitions) et leur ancienne version est sautée. Seuls les mois de
+        la période sont lus, mais les dates ne sont pas filtrées à l'intérieur d'un mois.
+        """
+        modifiees, copies = set(), []
+        if depot is not None:
+            with depot.verrou, self._verrou:
+                modifiees = self.journal.cles_non_compactees("commande")
+                for num in sorted(modifiees):
+                    resume = depot.resumes.get(num)
+                    if resume is not None and data_manager.mois_dans_periode(
+                            data_manager.mois_de(resume.date_creation), date_debut, date_fin):
+                        copies.append(depot.commande_en_dict(num))
+        with self._verrou:
+            fichiers = [self._fichiers[mois] for mois in sorted(self._fichiers)
+                        if data_manager.mois_dans_periode(mois, date_debut, date_fin)]
+        for fichier in fichiers:
+            for cmd in data_manager.iter_commandes(fichier):
+                if cmd['numero_commande'] not in modifiees:
+                    yield cmd
+        yield from copies
+
+    def _fermer_lecteur(self, mois):
+        lecteur = self._lecteurs.pop(mois, None)
+        if lecteur is not None:
+            lecteur.close()
+
+    @instrumentation.mesure("stockage.enregistrer")
+    def enregistrer(self, modifications):
+        with self._verrou:
+            self.journal.enregistrer_lot(modifications)
+
+    def _partitions_a_reecrire(self):
+        """Mois dont le fichier n'a pas le format ou la compression attendus (format changé, mois archivé)."""
+        with self._verrou:
+            return {mois for mois, fichier in self._fichiers.items() if fichier != data_manager.chemin_partition(mois)}
+
+    def a_des_modifications(self):
+        return self.journal.a_des_entrees() or bool(self._a_convertir) or bool(self._partitions_a_reecrire())
+
+    def doit_compacter(self):
+        return self.journal.doit_compacter()
+
+    @instrumentation.mesure("stockage.compacter")
+    def compacter(self, depot, attendre=True):
+        """Réécrit les fichiers des collections et les partitions modifiées, puis supprime les entrées correspondantes du journal.
+
+        Seule la copie des données modifiées se fait sous depot.verrou et le verrou du journal :
+        les fichiers sont écrits (par renommage) pendant que les opérations continuent.
+        attendre=False (appel sous depot.verrou) : retourne aussitôt si une compaction est en cours.
+        """
+        if not self._verrou_compaction.acquire(blocking=attendre):
+            return
+        try:
+            # Sous les deux verrous, une modification journalisée avant la mise de côté du
+            # journal est visible dans le dépôt, donc dans la copie ; les suivantes vont
+            # dans le nouveau journal (rejouées par-dessus les fichiers si besoin).
+            with depot.verrou, self._verrou:
+                types, cles = self.journal.detacher()
+                modifies = types | self._a_convertir
+                a_convertir, self._a_convertir = self._a_convertir, set()
+                produits = [p.to_dict() for p in depot.produits.values()] if "produit" in modifies else None
+                clients = [c.to_dict() for c in depot.clients.values()] if "client" in modifies else None
+                partitions = self._partitions_modifiees(depot, cles.get("commande", set()))
+            ecrit = False
+            try:
+                resultats = []
+                if produits is not None:
+                    resultats.append(data_manager.sauvegarder_collection("produit", produits) is not None)
+                if clients is not None:
+                    resultats.append(data_manager.sauvegarder_collection("client", clients) is not None)
+                for mois, (numeros, copies, ancien_fichier, positions) in partitions.items():
+                    if not numeros:
+                        resultats.append(self._supprimer_partition(mois))
+                        continue
+                    resultats.append(self._ecrire_partition(
+                        mois, self._commandes_a_ecrire(numeros, copies, ancien_fichier, positions))[1])
+                ecrit = all(resultats)
+            finally:
+                if ecrit:
+                    self.journal.terminer_compaction()
+                else:
+                    # Le journal mis de côté est gardé : nouvel essai à la prochaine compaction
+                    self._a_convertir |= a_convertir
+        finally:
+            self._verrou_compaction.release()
+
+    def _partitions_modifiees(self, depot, modifiees):
+        """Mois à réécrire -> (numéros dans l'ordre, copies des commandes modifiées, ancien fichier, positions).
+
+        Appelé sous depot.verrou : seules les partitions touchées sont parcourues.
+        """
+        nouvelles = {}  # mois -> commandes absentes de sa partition
+        touches = self._partitions_a_reecrire()
+        for num in modifiees:
+            mois = self._mois_commande.get(num)
+            if mois is None:
+                resume = depot.resumes.get(num)
+                if resume is None:
+                    continue  # Créée puis supprimée depuis la dernière sauvegarde
+                mois = data_manager.mois_de(resume.date_creation)
+                nouvelles.setdefault(mois, []).append(resume)
+            touches.add(mois)
+        partitions = {}
+        for mois in sorted(touches):
+            positions = dict(self._positions.get(mois, {}))
+            numeros = [num for num in positions if num in depot.resumes]
+            numeros += [r.numero_commande for r in sorted(nouvelles.get(mois, ()),
+                                                          key=lambda r: (r.date_creation, r.numero_commande))]
+            # Copie des seules commandes modifiées : les autres sont relues dans l'ancien fichier
+            copies = {num: depot.commande_en_dict(num) for num in numeros if num in modifiees}
+            partitions[mois] = (numeros, copies, self._fichiers.get(mois), positions)
+        return partitions
+
+    @staticmethod
+    def _commandes_a_ecrire(numeros, copies, ancien_fichier, positions):
+        with data_manager.ouvrir_partition(ancien_fichier) if positions else contextlib.nullcontext() as lecteur:
+            for num in numeros:
+                donnees = copies.get(num)
+                yield donnees if donnees is not None else data_manager.lire_commande(lecteur, positions[num])
+
+    def fermer(self):
+        with self._verrou:
+            for mois in list(self._lecteurs):
+                self._fermer_lecteur(mois)
+            self.journal.fermer()
+
+
+SCHEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS produits (
+    reference TEXT PRIMARY KEY,
+    nom TEXT NOT NULL,
+    prix_unitaire REAL NOT NULL,
+    stock INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS clients (
+    id_client TEXT PRIMARY KEY,
+    nom TEXT,
+    prenom TEXT,
+    adresse TEXT,
+    telephone TEXT,
+    email TEXT
+);
+CREATE TABLE IF NOT EXISTS commandes (
+    numero_commande TEXT PRIMARY KEY,
+    date_creation TEXT NOT NULL,
+    id_client TEXT NOT NULL,
+    total REAL NOT NULL,
+    statut TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_commandes_client ON commandes (id_client);
+CREATE INDEX IF NOT EXISTS idx_commandes_statut ON commandes (statut);
+CREATE INDEX IF NOT EXISTS idx_commandes_date ON commandes (date_creation);
+CREATE TABLE IF NOT EXISTS lignes_commande (
+    numero_commande TEXT NOT NULL REFERENCES commandes (numero_commande) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    ref_produit TEXT NOT NULL,
+    quantite INTEGER NOT NULL,
+    prix_vente REAL NOT NULL,
+    PRIMARY KEY (numero_commande, position)
+);
+CREATE INDEX IF NOT EXISTS idx_lignes_produit ON lignes_commande (ref_produit);
+"""
+
+
+class StockageSQLite:
+    """Base SQLite : chaque lot de modifications est une transaction."""
+
+    def __init__(self, chemin=None):
+        data_manager.initialiser_dossiers()
+        self.chemin = chemin or data_manager.SQLITE_FILE
+        self.connexion = sqlite3.connect(self.chemin, check_same_thread=False)
+        self._verrou = threading.RLock()  # Une seule connexion, partagée entre les threads
+        self.connexion.row_factory = sqlite3.Row
+        self.connexion.execute("PRAGMA foreign_keys = ON")
+        self.connexion.execute("PRAGMA journal_mode = WAL")
+        self.connexion.executescript(SCHEMA_SQLITE)
+
+    @instrumentation.mesure("stockage.charger")
+    def charger(self):
+        cur = self.connexion.cursor()
+        produits = {r['reference']: dict(r) for r in cur.execute("SELECT * FROM produits")}
+        clients = {r['id_client']: dict(r) for r in cur.execute("SELECT * FROM clients")}
+        # Les lignes ne sont pas chargées : seulement les références des commandes actives
+        refs = {}
+        for r in cur.execute("SELECT l.numero_commande, l.ref_produit FROM lignes_commande l "
+                             "JOIN commandes c ON c.numero_commande = l.numero_commande "
+                             "WHERE c.statut != 'Annulée' ORDER BY l.numero_commande, l.position"):
+            refs.setdefault(r['numero_commande'], []).append(r['ref_produit'])
+        resumes = {}
+        for r in cur.execute("SELECT numero_commande, date_creation, id_client, total, statut FROM commandes ORDER BY rowid"):
+            resumes[r['numero_commande']] = ResumeCommande(
+                r['numero_commande'], r['date_creation'], r['id_client'], r['total'], r['statut'],
+                refs.get(r['numero_commande'], []))
+        return {"produit": produits, "client": clients, "commande": resumes}
+
+    def charger_commande(self, numero_commande):
+        with self._verrou:
+            cur = self.connexion.cursor()
+            cmd = dict(cur.execute("SELECT * FROM commandes WHERE numero_commande = ?", (numero_commande,)).fetchone())
+            cmd['produits_commandes'] = [
+                {"ref_produit": r['ref_produit'], "quantite": r['quantite'], "prix_vente": r['prix_vente']}
+                for r in cur.execute("SELECT ref_produit, quantite, prix_vente FROM lignes_commande "
+                                     "WHERE numero_commande = ? ORDER BY position", (numero_commande,))]
+            return cmd
+
+    def iter_commandes(self, date_debut=None, date_fin=None, depot=None):
+        """Commandes de la période (toutes par défaut), lues en une requête sur l'index des dates.
+
+        depot : ignoré, chaque modification est déjà écrite en base.
+        """
+        conditions, parametres = [], []
+        if date_debut is not None:
+            conditions.append("c.date_creation >= ?")
+            parametres.append(date_debut)
+        if date_fin is not None:
+            conditions.append("c.date_creation < ?")
+            parametres.append(date_fin + "~")  # Toutes les heures du dernier jour
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        with self._verrou:
+            curseur = self.connexion.execute(
+                "SELECT c.numero_commande, c.date_creation, c.id_client, c.total, c.statut, "
+                "l.ref_produit, l.quantite, l.prix_vente FROM commandes c "
+                "LEFT JOIN lignes_commande l ON l.numero_commande = c.numero_commande "
+                f"{where}ORDER BY c.rowid, l.position", parametres)
+        cmd = None
+        for r in self._parcourir(curseur):
+            if cmd is None or cmd['numero_commande'] != r['numero_commande']:
+                if cmd is not None:
+                    yield cmd
+                cmd = {"numero_commande": r['numero_commande'], "date_creation": r['date_creation'],
+                       "id_client": r['id_client'], "produits_commandes": [], "total": r['total'],
+                       "statut": r['statut']}
+            if r['ref_produit'] is not None:
+                cmd['produits_commandes'].append(
+                    {"ref_produit": r['ref_produit'], "quantite": r['quantite'], "prix_vente": r['prix_vente']})
+        if cmd is not None:
+            yield cmd
+
+    def _parcourir(self, curseur, taille_bloc=10000):
+        # Lu par blocs : la connexion n'est pas gardée entre deux blocs
+        while True:
+            with self._verrou:
+                bloc = curseur.fetchmany(taille_bloc)
+            if not bloc:
+                return
+            yield from bloc
+
+    @instrumentation.mesure("stockage.enregistrer")
+    def enregistrer(self, modifications):
+        with self._verrou, self.connexion:  # Tout ou rien : commit à la fin, rollback en cas d'erreur
+            for type_entite, cle, donnees in modifications:
+                if type_entite == "produit":
+                    self._ecrire_produit(cle, donnees)
+                elif type_entite == "client":
+                    self._ecrire_client(cle, donnees)
+                elif type_entite == "commande":
+                    self._ecrire_commande(cle, donnees)
+
+    def _ecrire_produit(self, cle, donnees):
+        if donnees is None:
+            self.connexion.execute("DELETE FROM produits WHERE reference = ?", (cle,))
+            return
+        self.connexion.execute(
+            "INSERT OR REPLACE INTO produits (reference, nom, prix_unitaire, stock) VALUES (?, ?, ?, ?)",
+            (donnees['reference'], donnees['nom'], donnees['prix_unitaire'], donnees['stock']))
+
+    def _ecrire_client(self, cle, donnees):
+        if donnees is None:
+            self.connexion.execute("DELETE FROM clients WHERE id_client = ?", (cle,))
+            return
+        self.connexion.execute(
+            "INSERT OR REPLACE INTO clients (id_client, nom, prenom, adresse, telephone, email) VALUES (?, ?, ?, ?, ?, ?)",
+            (donnees['id_client'], donnees['nom'], donnees['prenom'], donnees['adresse'],
+             donnees.get('telephone'), donnees.get('email')))
+
+    def _ecrire_commande(self, cle, donnees):
+        self.connexion.execute("DELETE FROM lignes_commande WHERE numero_commande = ?", (cle,))
+        if donnees is None:
+            self.connexion.execute("DELETE FROM commandes WHERE numero_commande = ?", (cle,))
+            return
+        # UPSERT plutôt que REPLACE pour conserver le rowid (ordre de création)
+        self.connexion.execute(
+            "INSERT INTO commandes (numero_commande, date_creation, id_client, total, statut) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (numero_commande) DO UPDATE SET date_creation = excluded.date_creation, "
+            "id_client = excluded.id_client, total = excluded.total, statut = excluded.statut",
+            (donnees['numero_commande'], donnees['date_creation'], donnees['id_client'],
+             donnees['total'], donnees['statut']))
+        self.connexion.executemany(
+            "INSERT INTO lignes_commande (numero_commande, position, ref_produit, quantite, prix_vente) VALUES (?, ?, ?, ?, ?)",
+            [(cle, i, item['ref_produit'], item['quantite'], item['prix_vente'])
+             for i, item in enumerate(donnees['produits_commandes'])])
+
+    def a_des_modifications(self):
+        return False  # Chaque lot est déjà validé en base
+
+    def doit_compacter(self):
+        return False
+
+    @instrumentation.mesure("stockage.compacter")
+    def compacter(self, depot, attendre=True):
+        pass
+
+    def importer(self, etat):
+        """Remplace tout le contenu de la base par l'état fourni ({type: {cle: dict complet}})."""
+        with self.connexion:
+            for table in ("lignes_commande", "commandes", "clients", "produits"):
+                self.connexion.execute(f"DELETE FROM {table}")
+            for type_entite in ("produit", "client", "commande"):
+                for cle, donnees in etat[type_entite].items():
+                    getattr(self, f"_ecrire_{type_entite}")(cle, donnees)
+
+    def fermer(self):
+        with self._verrou:
+            self.connexion.close()
+
+
+def ouvrir_stockage(backend=None):
+    """Instancie le support de stockage configuré."""
+    backend = backend or data_manager.BACKEND_STOCKAGE
+    if backend == "json":
+        return StockageJSON()
+    if backend == "sqlite":
+        return StockageSQLite()
+    raise ValueError(f"Support de stockage inconnu : {backend}")
+
+
+def migrer_json_vers_sqlite():
+    """Importe data/*.json (et le journal en attente) dans la base SQLite."""
+    source = StockageJSON()
+    etat = source.charger()
+    etat['commande'] = {num: source.charger_commande(num) for num in etat['commande']}
+    source.fermer()
+    cible = StockageSQLite()
+    cible.importer(etat)
+    cible.fermer()
+    print(f"Migration terminée : {len(etat['produit'])} produits, {len(etat['client'])} clients, "
+          f"{len(etat['commande'])} commandes importés dans {data_manager.SQLITE_FILE}.")
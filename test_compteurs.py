@@ -0,0 +1,98 @@
+# test_compteurs.py
+# Totaux et compteurs tenus à jour par différence : ils doivent rester égaux à un
+# recalcul complet après n'importe quelle suite d'opérations, y compris défaites.
+# Utilisation : python -m unittest test_compteurs (ou python -m pytest)
+import copy
+import random
+import unittest
+from unittest import mock
+
+from benchmark import dossier_temporaire
+from exceptions import ErreurGestion
+from generer_donnees import generer_historique
+from models import Commande
+from services import ServiceCommercial
+
+
+class TestTotalCommande(unittest.TestCase):
+
+    def test_total_egal_au_recalcul(self):
+        alea = random.Random(5)
+        commande = Commande("CMD-TEST", "2025-01-01 00:00:00", "CLI-TEST")
+        ajouts = []
+        for _ in range(300):
+            ligne = (f"PROD-{alea.randint(0, 30):08X}", alea.randint(1, 5), round(alea.uniform(1, 100), 2))
+            # Une référence déjà présente garde son prix de vente
+            ligne = (ligne[0], ligne[1], next((p for r, _, p in ajouts if r == ligne[0]), ligne[2]))
+            commande.ajouter_produit(*ligne)
+            ajouts.append(ligne)
+        for ref, quantite, _ in alea.sample(ajouts, 100):
+            commande.retirer_produit(ref, quantite)
+        total = commande.total
+        commande.calculer_total()
+        self.assertAlmostEqual(total, commande.total, places=6)
+
+
+class TestCompteursService(unittest.TestCase):
+
+    def setUp(self):
+        self._dossier = dossier_temporaire()
+        self._dossier.__enter__()
+        self.addCleanup(self._dossier.__exit__, None, None, None)
+        generer_historique(20, 15, 300, graine=3)
+        self.service = ServiceCommercial()
+        self.addCleanup(self.service.fermer)
+        self.service.statistiques()  # Compteurs calculés une fois, puis tenus à jour
+        self.alea = random.Random(11)
+
+    def operation_aleatoire(self, numeros):
+        service, alea = self.service, self.alea
+        refs, clients = sorted(service.depot.produits), sorted(service.depot.clients)
+        tirage = alea.random()
+        try:
+            if tirage < 0.35:
+                commande = service.creer_commande(alea.choice(clients))
+                numeros.append(commande.numero_commande)
+                for ref in alea.sample(refs, min(len(refs), 3)):
+                    service.ajouter_ligne(commande.numero_commande, ref, alea.randint(1, 3))
+            elif tirage < 0.6:
+                service.valider(alea.choice(numeros))
+            elif tirage < 0.75:
+                service.annuler(alea.choice(numeros))
+            elif tirage < 0.9:
+                service.modifier_produit(alea.choice(refs), prix_unitaire=round(alea.uniform(1, 500), 2))
+            elif tirage < 0.95:
+                service.ajouter_produit(f"Produit {alea.random():.6f}", round(alea.uniform(1, 50), 2), alea.randint(0, 40))
+            else:
+                service.supprimer_produit(alea.choice(refs))
+        except ErreurGestion:
+            pass  # Refus (stock insuffisant, statut, produit utilisé) : les compteurs ne doivent pas bouger
+
+    def test_operations_aleatoires(self):
+        numeros = self.service.selectionner_commandes()
+        for i in range(600):
+            self.operation_aleatoire(numeros)
+            if i % 50 == 49:
+                self.assertEqual(self.service.verifier_statistiques(), [], f"après {i + 1} opérations")
+            if i % 200 == 199:
+                self.service.sauvegarder()
+        self.service.fermer()
+        relu = ServiceCommercial()  # Compteurs recalculés depuis les fichiers et le journal
+        self.addCleanup(relu.fermer)
+        self.assertEqual(relu.depot.compteurs.ecarts(self.service.depot.compteurs), [])
+
+    def test_ecriture_impossible(self):
+        numeros = self.service.selectionner_commandes()
+        avant = copy.deepcopy(self.service.depot.compteurs)
+        with mock.patch.object(self.service.stockage, "enregistrer", side_effect=OSError("disque plein")):
+            for _ in range(100):
+                try:
+                    self.operation_aleatoire(numeros)
+                except OSError:
+                    pass  # Opération défaite : rien n'a changé
+        self.assertEqual(self.service.verifier_statistiques(), [])
+        self.assertEqual(self.service.depot.compteurs.ecarts(avant), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
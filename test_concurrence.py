@@ -0,0 +1,99 @@
+# test_concurrence.py
+# Opérations concurrentes sur le service : pas de blocage entre threads (ordre des verrous)
+# et stock cohérent avec les commandes, en mémoire puis après rechargement du journal.
+# Utilisation : python -m unittest test_concurrence (ou python -m pytest)
+import random
+import sys
+import threading
+import time
+import unittest
+
+from benchmark import dossier_temporaire, verifier_invariants_stock
+from exceptions import ErreurGestion
+from generer_donnees import generer_historique
+from services import ServiceCommercial
+
+DELAI_MAX = 30  # Secondes : au-delà, les threads sont considérés comme bloqués
+
+
+class TestConcurrence(unittest.TestCase):
+
+    def setUp(self):
+        self._dossier = dossier_temporaire()
+        self._dossier.__enter__()
+        self.addCleanup(self._dossier.__exit__, None, None, None)
+        generer_historique(8, 10, 0, graine=7)
+        self.service = ServiceCommercial()
+        self.addCleanup(self.service.fermer)
+        self.stocks_initiaux = {ref: p.stock for ref, p in self.service.depot.produits.items()}
+        self.refs, self.clients = sorted(self.service.depot.produits), sorted(self.service.depot.clients)
+        # Changements de thread fréquents : un mauvais ordre des verrous se bloque presque à coup sûr
+        self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+        sys.setswitchinterval(1e-6)
+
+    def executer(self, cibles):
+        threads = [threading.Thread(target=cible, daemon=True) for cible in cibles]
+        for t in threads:
+            t.start()
+        limite = time.monotonic() + DELAI_MAX
+        for t in threads:
+            t.join(max(0, limite - time.monotonic()))
+        self.assertFalse(any(t.is_alive() for t in threads), "threads bloqués (ordre des verrous ?)")
+
+    def verifier(self):
+        self.assertEqual(verifier_invariants_stock(self.service, self.stocks_initiaux), [])
+        self.assertEqual(self.service.verifier_statistiques(), [])
+        self.service.fermer()
+        relu = ServiceCommercial()  # Rejoue le journal écrit par les threads
+        self.addCleanup(relu.fermer)
+        self.assertEqual(verifier_invariants_stock(relu, self.stocks_initiaux), [])
+
+    def test_lignes_en_ordre_inverse(self):
+        # Mêmes produits ajoutés dans l'ordre inverse par deux threads : les verrous
+        # des produits doivent être pris dans le même ordre des deux côtés
+        premier, second = self.refs[0], self.refs[1]
+
+        def travailleur(refs, id_client):
+            for _ in range(100):
+                numero = self.service.creer_commande(id_client).numero_commande
+                try:
+                    for ref in refs:
+                        self.service.ajouter_ligne(numero, ref, 1)
+                    self.service.valider(numero)
+                except ErreurGestion:
+                    self.service.annuler(numero)
+
+        self.executer([lambda: travailleur([premier, second], self.clients[0]),
+                       lambda: travailleur([second, premier], self.clients[1])])
+        self.verifier()
+
+    def test_validations_et_annulations_concurrentes(self):
+        creees = []  # Numéros partagés : les threads valident et annulent les commandes des autres
+
+        def tenter(operation, *args):
+            try:
+                operation(*args)
+            except ErreurGestion:
+                pass
+
+        def travailleur(graine):
+            alea = random.Random(graine)
+            for _ in range(60):
+                numero = self.service.creer_commande(alea.choice(self.clients)).numero_commande
+                creees.append(numero)
+                for ref in alea.sample(self.refs, alea.randint(1, 3)):
+                    tenter(self.service.ajouter_ligne, numero, ref, alea.randint(1, 20))
+                tirage = alea.random()
+                if tirage < 0.2:
+                    tenter(self.service.annuler, alea.choice(creees))
+                else:
+                    tenter(self.service.valider, numero if tirage < 0.6 else alea.choice(creees))
+                    tenter(self.service.valider, numero)
+
+        self.service.statistiques()  # Compteurs calculés avant la charge, puis tenus à jour par les threads
+        self.executer([lambda graine=graine: travailleur(graine) for graine in range(6)])
+        self.verifier()
+
+
+if __name__ == "__main__":
+    unittest.main()
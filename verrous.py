@@ -0,0 +1,30 @@
+# verrous.py
+# Verrous par clé (référence de produit, numéro de commande) pour l'accès concurrent.
+# Les clés sont réparties sur un nombre fixe de verrous ("lock striping") : la
+# mémoire reste bornée quel que soit le nombre de produits ou de commandes.
+# Plusieurs clés sont toujours verrouillées dans le même ordre, ce qui évite
+# les interblocages entre deux threads.
+import contextlib
+import threading
+
+
+class TableVerrous:
+    def __init__(self, nb_verrous=1024):
+        # RLock : un thread qui détient déjà une clé peut la reverrouiller (appels imbriqués)
+        self._verrous = [threading.RLock() for _ in range(nb_verrous)]
+
+    def _indices(self, cles):
+        return sorted({hash(cle) % len(self._verrous) for cle in cles})
+
+    @contextlib.contextmanager
+    def verrouiller(self, cles):
+        """Verrouille toutes les clés données pour la durée du bloc."""
+        acquis = []
+        try:
+            for indice in self._indices(cles):
+                self._verrous[indice].acquire()
+                acquis.append(indice)
+            yield
+        finally:
+            for indice in reversed(acquis):
+                self._verrous[indice].release()